@@ -0,0 +1 @@
+"""Python side of the infrastructure dashboard: the HTTP server and its helpers."""
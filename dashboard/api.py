@@ -0,0 +1,124 @@
+"""Helpers shared by the JSON API routes: errors, parameters and responses."""
+
+import gzip
+import hashlib
+import json
+import math
+from collections import namedtuple
+from http import HTTPStatus
+
+from .caching import REVALIDATE, etag_matches
+from .compression import SERVABLE_ENCODINGS, negotiate
+
+# Responses smaller than this are not worth compressing on the fly
+MIN_COMPRESS_BYTES = 1024
+
+GZIP = next(e for e in SERVABLE_ENCODINGS if e.name == 'gzip')
+
+# A response body encoded, hashed and compressed ahead of time, for payloads
+# that are served many times between rebuilds
+PreparedJson = namedtuple('PreparedJson', 'body etag gzipped')
+
+
+class ApiError(Exception):
+    """An error reported to the client as a JSON body with ``status``."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def encode_json(payload):
+    return json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def content_etag(body):
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def prepare_json(payload):
+    body = encode_json(payload)
+    return PreparedJson(body, content_etag(body), gzip.compress(body, compresslevel=9, mtime=0))
+
+
+def send_json(handler, payload, status=HTTPStatus.OK):
+    """Send ``payload`` as JSON, with an ETag, 304 support and gzip when accepted.
+
+    ``payload`` may be a PreparedJson to skip encoding and compression.
+    """
+    if isinstance(payload, PreparedJson):
+        body, etag, gzipped = payload
+    else:
+        body, etag, gzipped = encode_json(payload), None, None
+    ok = status == HTTPStatus.OK
+    if ok and etag is None:
+        etag = content_etag(body)
+
+    encoding = None
+    if len(body) >= MIN_COMPRESS_BYTES and negotiate(handler.headers.get('Accept-Encoding'), [GZIP]):
+        # For the compression ratio in the server's metrics
+        handler.identity_length = len(body)
+        body = gzipped if gzipped is not None else gzip.compress(body, compresslevel=6, mtime=0)
+        encoding = 'gzip'
+        if ok:
+            # Each content coding is a different representation
+            etag = etag[:-1] + '-gzip"'
+
+    if ok and not handler.server.no_cache:
+        if_none_match = handler.headers.get('If-None-Match')
+        if if_none_match is not None and etag_matches(if_none_match, etag):
+            handler.send_response(HTTPStatus.NOT_MODIFIED)
+            handler.send_header('ETag', etag)
+            handler.send_header('Cache-Control', REVALIDATE)
+            handler.send_header('Vary', 'Accept-Encoding')
+            handler.end_headers()
+            return
+
+    handler.send_response(status)
+    handler.send_header('Content-Type', 'application/json; charset=utf-8')
+    handler.send_header('Content-Length', str(len(body)))
+    handler.send_header('Vary', 'Accept-Encoding')
+    if encoding:
+        handler.send_header('Content-Encoding', encoding)
+    if ok:
+        handler.send_header('ETag', etag)
+        if not handler.server.no_cache:
+            handler.send_header('Cache-Control', REVALIDATE)
+    handler.end_headers()
+    if handler.command != 'HEAD':
+        handler.wfile.write(body)
+
+
+def param_list(params, name):
+    """Comma-separated and repeated values of a query parameter."""
+    values = []
+    for raw in params.get(name, ()):
+        values.extend(v.strip() for v in raw.split(',') if v.strip())
+    return values
+
+
+def finite_number(text, cast=float):
+    """``text`` as a number, or None if it is not one or not finite.
+
+    float() also parses 'nan' and 'inf', which would pass every bound check.
+    """
+    try:
+        value = cast(text)
+    except ValueError:
+        return None
+    return value if math.isfinite(value) else None
+
+
+def param_number(params, name, default=None, cast=float, minimum=None, maximum=None):
+    values = params.get(name)
+    if not values:
+        return default
+    value = finite_number(values[-1], cast)
+    if value is None:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f'{name} must be a number')
+    if minimum is not None and value < minimum:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f'{name} must be at least {minimum}')
+    if maximum is not None and value > maximum:
+        value = maximum
+    return value
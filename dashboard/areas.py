@@ -0,0 +1,104 @@
+"""Local authority areas by location: which one holds a point, which ones a box covers.
+
+The per-region maps in data/regions/ are read into one spatial index of
+every LAD and council area in the UK, each tagged with the region whose
+map it comes from. The index is built once and rebuilt only when one of
+the maps changes.
+"""
+
+import os
+from http import HTTPStatus
+
+from .api import ApiError, finite_number
+from .geo.spatial import AreaIndex, topology_areas
+
+REGION_MAPS = 'data/regions/*.topojson'
+
+# Points one /api/areas/locate request may look up
+MAX_POINTS = 1000
+
+
+def build_index(store):
+    areas = []
+    for relpath in store.expand([REGION_MAPS]):
+        topology = store.load(relpath)
+        if topology is None:
+            continue
+        region = os.path.splitext(os.path.basename(relpath))[0]
+        areas.extend(topology_areas(topology, {'region': region}))
+    return AreaIndex(areas)
+
+
+def get_index(store):
+    return store.derive('areas', [REGION_MAPS], build_index)
+
+
+def parse_numbers(text, name):
+    values = [finite_number(value) for value in text.split(',')]
+    if None in values:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f'{name} must be comma-separated numbers')
+    return values
+
+
+def parse_points(params):
+    """(lon, lat) pairs from points=lon,lat;lon,lat and repeated point=lon,lat."""
+    pairs = [pair for raw in params.get('points', ()) for pair in raw.split(';') if pair.strip()]
+    pairs.extend(params.get('point', ()))
+    if not pairs:
+        raise ApiError(HTTPStatus.BAD_REQUEST, 'point=lon,lat or points=lon,lat;lon,lat is required')
+    if len(pairs) > MAX_POINTS:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f'At most {MAX_POINTS} points per request')
+    points = []
+    for pair in pairs:
+        values = parse_numbers(pair, 'point')
+        if len(values) != 2:
+            raise ApiError(HTTPStatus.BAD_REQUEST, 'Each point must be lon,lat')
+        points.append(values)
+    return points
+
+
+# Decimal places of the bounding boxes /api/areas returns (about 10 cm)
+BBOX_PRECISION = 6
+
+
+def area_summary(index, area):
+    bbox = [round(value, BBOX_PRECISION) for value in index.bboxes[area]]
+    return {**index.properties[area], 'bbox': bbox}
+
+
+def api_locate(server, params):
+    """GET /api/areas/locate: the area and region at each point.
+
+    Points are given as points=lon,lat;lon,lat;... and/or repeated
+    point=lon,lat, in WGS84 degrees. ``areas`` is in the same order, with
+    null for a point outside every area.
+    """
+    index = get_index(server.data)
+    results = []
+    for lon, lat in parse_points(params):
+        area = index.locate(lon, lat)
+        results.append(None if area is None else index.properties[area])
+    return {'areas': results}
+
+
+def api_areas(server, params):
+    """GET /api/areas?bbox=west,south,east,north: the areas a box covers.
+
+    Returns every area with a polygon whose bounding box overlaps the box,
+    with its id, name, region and bounding box. region=<id> keeps one
+    region's areas. Without a bbox every area is returned.
+    """
+    index = get_index(server.data)
+    raw = (params.get('bbox') or [''])[-1]
+    if raw:
+        bbox = parse_numbers(raw, 'bbox')
+        if len(bbox) != 4 or bbox[0] > bbox[2] or bbox[1] > bbox[3]:
+            raise ApiError(HTTPStatus.BAD_REQUEST, 'bbox must be west,south,east,north')
+        found = index.overlapping(bbox)
+    else:
+        found = range(len(index))
+    region = (params.get('region') or [''])[-1]
+    if region:
+        found = [area for area in found if index.properties[area].get('region') == region]
+    areas = [area_summary(index, area) for area in found]
+    return {'total': len(areas), 'areas': areas}
@@ -0,0 +1,59 @@
+"""One bundled response with every dataset DataLoader.loadAll needs.
+
+The bundle is versioned by a hash of its contents and kept encoded and
+gzipped in memory; it is rebuilt only when one of its source files changes.
+"""
+
+from http import HTTPStatus
+
+from .api import ApiError, content_etag, encode_json, prepare_json
+
+# Bundle key -> data file, in the order DataLoader.loadAll used to fetch them
+BOOTSTRAP_FILES = {
+    'config': 'data/config.json',
+    'regions': 'data/regions.json',
+    'sectors': 'data/sectors.json',
+    'disciplines': 'data/disciplines.json',
+    'clients': 'data/clients.json',
+    'opportunities': 'data/opportunities.json',
+    'budgets': 'data/budgets.json',
+    'projects': 'data/projects.json',
+}
+
+# Stand-ins for optional files that do not exist
+OPTIONAL_DEFAULTS = {
+    'projects': {'projects': []},
+}
+
+
+def build_bundle(store):
+    datasets = {}
+    missing = []
+    for name, relpath in BOOTSTRAP_FILES.items():
+        data = store.load(relpath)
+        if data is None:
+            if name not in OPTIONAL_DEFAULTS:
+                missing.append(relpath)
+                continue
+            data = OPTIONAL_DEFAULTS[name]
+        datasets[name] = data
+    if missing:
+        return None
+
+    # The version is the hash of the datasets alone, so it only changes when
+    # the data does
+    version = content_etag(encode_json(datasets)).strip('"')
+    return prepare_json({'version': version, 'datasets': datasets})
+
+
+def get_bundle(store):
+    return store.derive('bootstrap', BOOTSTRAP_FILES.values(), build_bundle)
+
+
+def api_bootstrap(server, params):
+    """GET /api/bootstrap: config, regions, sectors, disciplines, clients,
+    opportunities, budgets and projects in one response."""
+    bundle = get_bundle(server.data)
+    if bundle is None:
+        raise ApiError(HTTPStatus.SERVICE_UNAVAILABLE, 'Dashboard data files are missing')
+    return bundle
@@ -0,0 +1,93 @@
+"""Cache policy: content-hash ETags, conditional requests and Cache-Control."""
+
+import datetime
+import email.utils
+import hashlib
+import threading
+import urllib.parse
+
+# Fingerprinted URLs (?v=2) change whenever the content does, so they never
+# need revalidating
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# Everything else may be stored but must be revalidated with the ETag; this
+# matches the headers netlify.toml sets in production
+REVALIDATE = 'public, max-age=0, must-revalidate'
+# The old development behaviour, kept behind --no-cache
+NO_STORE = 'no-store, no-cache, must-revalidate, max-age=0'
+
+FINGERPRINT_PARAMS = ('v', 'version', 'hash')
+
+
+def is_fingerprinted(url):
+    """True when the URL carries a version parameter like ``?v=2``."""
+    query = urllib.parse.urlsplit(url).query
+    params = urllib.parse.parse_qs(query)
+    return any(params.get(name) for name in FINGERPRINT_PARAMS)
+
+
+def cache_control_for(url):
+    return IMMUTABLE if is_fingerprinted(url) else REVALIDATE
+
+
+def stat_key(st):
+    """Identity of a file's contents as far as stat() can tell."""
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class ETagCache:
+    """Strong ETags from SHA-256 content hashes, rehashed only when a file changes."""
+
+    def __init__(self):
+        self._etags = {}
+        self._lock = threading.Lock()
+
+    def etag(self, path, st, f):
+        """ETag for the open file ``f``; leaves its position at the start."""
+        key = stat_key(st)
+        with self._lock:
+            cached = self._etags.get(path)
+        if cached and cached[0] == key:
+            return cached[1]
+
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(chunk)
+        f.seek(0)
+        etag = f'"{digest.hexdigest()[:32]}"'
+        with self._lock:
+            self._etags[path] = (key, etag)
+        return etag
+
+
+def etag_matches(if_none_match, etag):
+    """Weak comparison of an If-None-Match header against ``etag``."""
+    if if_none_match.strip() == '*':
+        return True
+    target = etag.removeprefix('W/')
+    for candidate in if_none_match.split(','):
+        if candidate.strip().removeprefix('W/') == target:
+            return True
+    return False
+
+
+def modified_since(if_modified_since, mtime):
+    """False when the file is no newer than an If-Modified-Since date."""
+    try:
+        since = email.utils.parsedate_to_datetime(if_modified_since)
+    except (TypeError, IndexError, OverflowError, ValueError):
+        return True
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=datetime.timezone.utc)
+    last_modified = datetime.datetime.fromtimestamp(mtime, datetime.timezone.utc)
+    return last_modified.replace(microsecond=0) > since
+
+
+def is_not_modified(headers, etag, mtime):
+    """Evaluate conditional request headers; If-None-Match takes precedence."""
+    if_none_match = headers.get('If-None-Match')
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = headers.get('If-Modified-Since')
+    if if_modified_since is not None:
+        return not modified_since(if_modified_since, mtime)
+    return False
@@ -0,0 +1,123 @@
+"""Precompressed asset variants and Accept-Encoding negotiation.
+
+tools/compress-assets.py writes ``<file>.gz`` (and ``.br``/``.zst`` when the
+optional brotli and zstandard packages are installed) next to each text
+asset. The server then picks the best sibling the client accepts.
+"""
+
+import gzip
+import os
+from collections import namedtuple
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+Encoding = namedtuple('Encoding', 'name suffix compress')
+
+# File types worth compressing; everything else is served as-is
+COMPRESSIBLE_EXTENSIONS = ('.json', '.geojson', '.topojson', '.js', '.css', '.html', '.svg')
+
+
+def _gzip(data):
+    # mtime=0 keeps the output reproducible between builds
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _brotli(data):
+    return brotli.compress(data, quality=11)
+
+
+def _zstd(data):
+    return zstandard.ZstdCompressor(level=19).compress(data)
+
+
+def available_encodings():
+    """Encodings this installation can produce, in server preference order."""
+    encodings = []
+    if brotli is not None:
+        encodings.append(Encoding('br', '.br', _brotli))
+    if zstandard is not None:
+        encodings.append(Encoding('zstd', '.zst', _zstd))
+    encodings.append(Encoding('gzip', '.gz', _gzip))
+    return encodings
+
+
+# Every encoding the server can serve from disk, whether or not this
+# installation could have produced it
+SERVABLE_ENCODINGS = [
+    Encoding('br', '.br', None),
+    Encoding('zstd', '.zst', None),
+    Encoding('gzip', '.gz', None),
+]
+
+
+def is_compressible(path):
+    return path.lower().endswith(COMPRESSIBLE_EXTENSIONS)
+
+
+def parse_accept_encoding(header):
+    """Map each coding in an Accept-Encoding header to its q-value."""
+    accepted = {}
+    for item in (header or '').split(','):
+        name, _, params = item.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name] = q
+    if 'x-gzip' in accepted:
+        accepted.setdefault('gzip', accepted['x-gzip'])
+    return accepted
+
+
+def negotiate(header, candidates):
+    """Pick the encoding from ``candidates`` the client prefers.
+
+    Ties in q-value go to the earlier candidate, so ``candidates`` should be
+    in server preference order. Returns None when only identity is acceptable.
+    """
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get('*', 0.0)
+    best, best_q = None, 0.0
+    for encoding in candidates:
+        q = accepted.get(encoding.name, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def fresh_variants(path, st):
+    """Precompressed siblings of ``path`` that are at least as new as it."""
+    variants = []
+    for encoding in SERVABLE_ENCODINGS:
+        try:
+            variant_st = os.stat(path + encoding.suffix)
+        except OSError:
+            continue
+        if variant_st.st_mtime_ns >= st.st_mtime_ns:
+            variants.append(encoding)
+    return variants
+
+
+def select_variant(path, st, accept_encoding):
+    """Return ``(encoding, variant_path)`` to serve, or ``(None, path)``."""
+    if not accept_encoding:
+        return None, path
+    encoding = negotiate(accept_encoding, fresh_variants(path, st))
+    if encoding is None:
+        return None, path
+    return encoding, path + encoding.suffix
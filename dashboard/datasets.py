@@ -0,0 +1,135 @@
+"""Parsed data files and the indexes derived from them.
+
+Every API reads the dashboard's JSON through one DataStore, so each file is
+parsed once and only parsed again when its size or mtime changes. Derived
+structures (indexes, aggregates) are registered with the files they are
+built from and rebuilt only when one of those files changes, either on
+the next request for them or straight away when the data watcher reports
+the change.
+"""
+
+import fnmatch
+import glob
+import json
+import os
+import threading
+from http import HTTPStatus
+
+from .api import ApiError
+
+
+class DataStore:
+    """Parsed JSON files under ``root``, addressed by relative path like 'data/clients.json'."""
+
+    def __init__(self, root):
+        self.root = root
+        self._files = {}
+        self._derived = {}
+        self._lock = threading.RLock()
+
+    def path(self, relpath):
+        return os.path.join(self.root, *relpath.split('/'))
+
+    def signature(self, relpath):
+        """(mtime_ns, size) of a file, or None if it does not exist."""
+        try:
+            st = os.stat(self.path(relpath))
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def expand(self, patterns):
+        """Relative paths matching ``patterns``, in a stable order."""
+        relpaths = []
+        for pattern in patterns:
+            if glob.has_magic(pattern):
+                matches = glob.glob(self.path(pattern))
+                relpaths.extend(sorted(
+                    os.path.relpath(m, self.root).replace(os.sep, '/') for m in matches))
+            else:
+                relpaths.append(pattern)
+        return relpaths
+
+    def load(self, relpath, default=None):
+        """Parsed contents of ``relpath``, or ``default`` if it is missing.
+
+        A file that does not parse (it may be half written) gives its last
+        good contents, and is parsed again on the next call. With none,
+        the request fails with 503 until the file is whole.
+        """
+        signature = self.signature(relpath)
+        if signature is None:
+            return default
+        with self._lock:
+            cached = self._files.get(relpath)
+            if cached is not None and cached[0] == signature:
+                return cached[1]
+            try:
+                return self._parse(relpath, signature)
+            except ValueError:
+                if cached is not None:
+                    return cached[1]
+                raise ApiError(HTTPStatus.SERVICE_UNAVAILABLE,
+                               f'{relpath} is being updated; try again shortly') from None
+
+    def _parse(self, relpath, signature):
+        with open(self.path(relpath), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self._files[relpath] = (signature, data)
+        return data
+
+    def derive(self, name, sources, build, version=None):
+        """Value of ``build(store)``, cached until a file in ``sources`` changes.
+
+        ``sources`` may contain glob patterns; a file appearing or
+        disappearing counts as a change. A different ``version`` (for
+        example today's date, for values that depend on it) also rebuilds.
+        """
+        relpaths = self.expand(sources)
+        signatures = (version, *((p, self.signature(p)) for p in relpaths))
+        with self._lock:
+            cached = self._derived.get(name)
+            if cached is not None and cached[0] == signatures:
+                return cached[1]
+            value = build(self)
+            self._derived[name] = (signatures, value, tuple(sources), build, version)
+            return value
+
+    def reload(self, relpath):
+        """Parse ``relpath`` again if it has been loaded before.
+
+        A file that has gone is forgotten. Raises ValueError if the file is
+        not valid JSON (it may be half written), leaving the old contents.
+        """
+        with self._lock:
+            if relpath not in self._files:
+                return
+            signature = self.signature(relpath)
+            if signature is None:
+                del self._files[relpath]
+            elif self._files[relpath][0] != signature:
+                self._parse(relpath, signature)
+
+    def rebuild(self, relpaths):
+        """Rebuild the derived values built from any of ``relpaths``.
+
+        Only values that have been built before are rebuilt, in the order
+        they were first built, so one built from another (the search index
+        from the opportunity index) sees it fresh. A value whose build fails
+        is dropped, to be rebuilt (and fail visibly) on its next request.
+        Returns the names rebuilt and the names dropped.
+        """
+        rebuilt, failed = [], []
+        with self._lock:
+            for name, (_, _, sources, build, version) in list(self._derived.items()):
+                if not any(fnmatch.fnmatchcase(relpath, pattern)
+                           for relpath in relpaths for pattern in sources):
+                    continue
+                try:
+                    self.derive(name, sources, build, version)
+                except Exception:
+                    del self._derived[name]
+                    failed.append(name)
+                else:
+                    rebuilt.append(name)
+        return rebuilt, failed
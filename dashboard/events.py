@@ -0,0 +1,108 @@
+"""Server-Sent Events: pushing change notices to open dashboards.
+
+A browser opens GET /api/events with an EventSource and keeps the
+connection. The handler answers with the stream's headers and hands the
+socket to the server's ``EventStream``, which owns it from then on, so a
+listening dashboard does not hold a worker thread (or, in single-threaded
+mode, the whole server). Events are written straight to every socket.
+
+The last few events are kept, so a browser that reconnects with
+Last-Event-ID gets the ones it missed. A comment line goes out every
+so often so dead connections are noticed and proxies do not time out
+idle streams.
+"""
+
+import json
+import socket
+import threading
+from collections import deque
+
+EVENTS_PATH = '/api/events'
+
+# Events kept for browsers reconnecting with Last-Event-ID
+HISTORY = 64
+
+# Seconds a write to one client may block before the client is dropped
+SEND_TIMEOUT = 2.0
+
+# Milliseconds a browser waits before reconnecting a dropped stream
+RETRY_MS = 3000
+
+
+def encode_event(event_id, event, data):
+    payload = json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+    return f'id: {event_id}\nevent: {event}\ndata: {payload}\n\n'.encode('utf-8')
+
+
+class EventStream:
+    """The sockets of every open event stream and the recent events."""
+
+    def __init__(self, history=HISTORY):
+        self._clients = []
+        self._history = deque(maxlen=history)
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._clients)
+
+    def subscribe(self, sock, last_event_id=None):
+        """Start streaming to ``sock``, whose response headers have been sent.
+
+        Events after ``last_event_id`` (from a reconnecting browser) are
+        sent first.
+        """
+        sock.settimeout(SEND_TIMEOUT)
+        with self._lock:
+            missed = [body for event_id, body in self._history
+                      if last_event_id is not None and event_id > last_event_id]
+            if self._send(sock, f'retry: {RETRY_MS}\n\n'.encode('ascii') + b''.join(missed)):
+                self._clients.append(sock)
+
+    def publish(self, event, data):
+        """Send ``data`` as JSON to every client as an ``event``; returns the event id."""
+        with self._lock:
+            event_id = self._next_id
+            self._next_id += 1
+            body = encode_event(event_id, event, data)
+            self._history.append((event_id, body))
+            self._broadcast(body)
+            return event_id
+
+    def ping(self):
+        """Send a comment line, dropping clients that have gone away."""
+        with self._lock:
+            self._broadcast(b': ping\n\n')
+
+    def close(self):
+        with self._lock:
+            for sock in self._clients:
+                self._close(sock)
+            self._clients = []
+
+    def _broadcast(self, body):
+        self._clients = [sock for sock in self._clients if self._send(sock, body)]
+
+    def _send(self, sock, body):
+        try:
+            sock.sendall(body)
+            return True
+        except OSError:
+            self._close(sock)
+            return False
+
+    @staticmethod
+    def _close(sock):
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        sock.close()
+
+
+def parse_event_id(value):
+    """The numeric Last-Event-ID a browser sent, or None."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
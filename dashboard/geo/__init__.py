@@ -0,0 +1 @@
+"""Geometry code shared by the geo build tools in tools/ and the server."""
@@ -0,0 +1,134 @@
+"""Dissolving the areas of a topology into one outline.
+
+In a topology a border between two areas is a single arc that both of
+them use, once in each direction. Dissolving them is therefore a matter
+of counting the uses of each arc: interior borders cancel out and are
+dropped, the arcs left make up the outline and are stitched end to start
+into rings. Nothing is dropped for being small, so islands and holes
+survive, and the work is linear in the number of arcs (plus a
+point-in-ring test to place each hole).
+
+The result is a list of polygons as TopoJSON arc indices, so it can be
+resolved against any simplification of the same ArcTable: simplification
+keeps arc endpoints, so the rings still close.
+"""
+
+from collections import defaultdict
+
+from .spatial import ring_contains
+
+
+def polygon_arcs(geometries):
+    """Every polygon of ``geometries`` as a list of rings of arc indices."""
+    for geom in geometries:
+        if geom.get('type') == 'Polygon':
+            yield geom['arcs']
+        elif geom.get('type') == 'MultiPolygon':
+            yield from geom['arcs']
+
+
+def signed_area(points):
+    """Twice the signed planar area of a ring given as (lon, lat) points."""
+    area = 0.0
+    points = list(points)
+    for (x0, y0), (x1, y1) in zip(points, points[1:] + points[:1]):
+        area += x0 * y1 - x1 * y0
+    return area
+
+
+def outline_arcs(geometries):
+    """Arc indices on the outline of ``geometries``, in the direction it runs.
+
+    Each use of an arc counts +1 forwards and -1 backwards. A border between
+    two areas is used once each way and cancels out; an arc left with a
+    non-zero count is on the outline, once, whichever way the count says.
+    That also takes care of areas that repeat a piece of another (the same
+    island in two council areas).
+    """
+    net = {}
+    for polygon in polygon_arcs(geometries):
+        for ring in polygon:
+            for idx in ring:
+                if idx >= 0:
+                    net[idx] = net.get(idx, 0) + 1
+                else:
+                    net[~idx] = net.get(~idx, 0) - 1
+    return [idx if count > 0 else ~idx for idx, count in net.items() if count]
+
+
+def stitch(table, arcs):
+    """Join directed ``arcs`` end to start into closed rings of arc indices.
+
+    Chains that do not close, slivers left by flaws in the source
+    topology, are left out.
+    """
+    starting = defaultdict(list)
+    for idx in arcs:
+        starting[table.endpoints(idx)[0]].append(idx)
+
+    rings = []
+    for first in arcs:
+        start = table.endpoints(first)[0]
+        if first not in starting.get(start, ()):
+            continue
+        starting[start].remove(first)
+        ring = [first]
+        end = table.endpoints(first)[1]
+        while end != start and starting.get(end):
+            idx = starting[end].pop()
+            ring.append(idx)
+            end = table.endpoints(idx)[1]
+        if end == start:
+            rings.append(ring)
+    return rings
+
+
+def dissolve(table, geometries):
+    """The union of ``geometries`` as polygons of arc indices (MultiPolygon ``arcs``).
+
+    ``table`` is the unsimplified ArcTable the geometries' arcs index.
+    Outline rings wound like the input's exterior rings become polygons;
+    the others are holes, each placed in the smallest polygon holding it.
+    """
+    polygons = list(polygon_arcs(geometries))
+    if not polygons:
+        return []
+    exterior_sign = signed_area(table.ring(polygons[0][0]).points()) > 0
+
+    exteriors, holes = [], []
+    for ring in stitch(table, outline_arcs(geometries)):
+        points = list(table.ring(ring).points())
+        area = signed_area(points)
+        if area == 0:
+            continue
+        if (area > 0) == exterior_sign:
+            lons, lats = [lon for lon, _ in points], [lat for _, lat in points]
+            exteriors.append((abs(area), ring, points, (min(lons), min(lats), max(lons), max(lats))))
+        else:
+            holes.append(ring)
+
+    exteriors.sort(key=lambda exterior: -exterior[0])
+    result = [[ring] for _, ring, _, _ in exteriors]
+    for hole in holes:
+        lon, lat = table.endpoints(hole[0])[0]
+        for n in range(len(exteriors) - 1, -1, -1):
+            _, _, points, (west, south, east, north) = exteriors[n]
+            if west <= lon <= east and south <= lat <= north and ring_contains(points, lon, lat):
+                result[n].append(hole)
+                break
+    return result
+
+
+def drop_specks(table, polygons, min_area):
+    """``polygons`` without the rings whose area in ``table`` is under ``min_area``.
+
+    A ring smaller than a level's resolution squared cannot be drawn at
+    that level; a polygon whose exterior is dropped loses its holes too.
+    """
+    kept = []
+    for polygon in polygons:
+        rings = [ring for ring in polygon
+                 if abs(signed_area(table.ring(ring).points())) / 2 >= min_area]
+        if rings and rings[0] is polygon[0]:
+            kept.append(rings)
+    return kept
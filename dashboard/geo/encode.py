@@ -0,0 +1,167 @@
+"""Writing geometry back out as TopoJSON or compact GeoJSON.
+
+``quantize_topology`` builds a TopoJSON topology holding only the arcs a
+set of geometries uses, with positions snapped to an integer grid and
+delta-encoded, so every shared border is stored once as small integers.
+
+``FeatureWriter`` streams a GeoJSON FeatureCollection to a file one
+feature at a time, formatting coordinates straight from an ArcTable's
+buffer, so no feature dicts or coordinate lists are built for the whole
+collection.
+"""
+
+import json
+
+from .topology import Ring
+
+DEFAULT_QUANTIZATION = 10_000
+
+# No whitespace between tokens
+COMPACT_SEPARATORS = (',', ':')
+
+
+def _remap_arcs(arcs, index_of):
+    """Arc indices of a Polygon or MultiPolygon, renumbered through ``index_of``."""
+    if arcs and isinstance(arcs[0], int):
+        return [index_of[idx] if idx >= 0 else ~index_of[~idx] for idx in arcs]
+    return [_remap_arcs(part, index_of) for part in arcs]
+
+
+def _arc_ids(arcs):
+    if arcs and isinstance(arcs[0], int):
+        for idx in arcs:
+            yield idx if idx >= 0 else ~idx
+    else:
+        for part in arcs:
+            yield from _arc_ids(part)
+
+
+def quantize_topology(table, geometries, quantization=DEFAULT_QUANTIZATION,
+                      object_name='areas'):
+    """A quantized, delta-encoded TopoJSON topology of ``geometries``.
+
+    ``geometries`` are TopoJSON geometry objects whose arc indices refer to
+    ``table``; only the arcs they use are written, renumbered in order of
+    first use. Positions are snapped to a grid of ``quantization`` steps
+    across the bounding box. Consecutive positions that snap to the same
+    point are merged, keeping at least two per arc.
+    """
+    index_of = {}
+    for geom in geometries:
+        for arc_id in _arc_ids(geom.get('arcs', [])):
+            index_of.setdefault(arc_id, len(index_of))
+
+    arcs = [table.arc(arc_id) for arc_id in index_of]
+    points = [point for arc in arcs for point in arc]
+    if points:
+        x0 = min(p[0] for p in points)
+        y0 = min(p[1] for p in points)
+        x1 = max(p[0] for p in points)
+        y1 = max(p[1] for p in points)
+    else:
+        x0 = y0 = x1 = y1 = 0
+    sx = (x1 - x0) / (quantization - 1) if x1 > x0 else 1
+    sy = (y1 - y0) / (quantization - 1) if y1 > y0 else 1
+
+    encoded = []
+    for arc in arcs:
+        deltas = []
+        px = py = 0
+        for lon, lat in arc:
+            x = round((lon - x0) / sx)
+            y = round((lat - y0) / sy)
+            if deltas and x == px and y == py:
+                continue
+            deltas.append([x - px, y - py])
+            px, py = x, y
+        if len(deltas) == 1:
+            deltas.append([0, 0])
+        encoded.append(deltas)
+
+    return {
+        'type': 'Topology',
+        'bbox': [x0, y0, x1, y1],
+        'transform': {'scale': [sx, sy], 'translate': [x0, y0]},
+        'objects': {
+            object_name: {
+                'type': 'GeometryCollection',
+                'geometries': [
+                    {
+                        'type': geom['type'],
+                        'arcs': _remap_arcs(geom['arcs'], index_of),
+                        'properties': geom.get('properties', {}),
+                    }
+                    for geom in geometries
+                ],
+            },
+        },
+        'arcs': encoded,
+    }
+
+
+def dump_compact(data, f):
+    """Write ``data`` as JSON without whitespace."""
+    json.dump(data, f, separators=COMPACT_SEPARATORS, ensure_ascii=False)
+
+
+class FeatureWriter:
+    """Writes a compact GeoJSON FeatureCollection to ``f`` one feature at a time.
+
+    Coordinates are rounded to ``precision`` decimal places (with the same
+    arithmetic as ArcTable.rounded) and written as Python writes floats,
+    so the output matches dump_compact of the equivalent dicts. Use as a
+    context manager around the ``write`` calls.
+    """
+
+    def __init__(self, f, precision=None):
+        self.f = f
+        self.factor = None if precision is None else 10 ** precision
+        self.count = 0
+
+    def __enter__(self):
+        self.f.write('{"type":"FeatureCollection","features":[')
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.f.write(']}')
+        return False
+
+    def write(self, properties, geometry_type, coordinates):
+        """Write one feature.
+
+        ``coordinates`` are nested like GeoJSON coordinates, except that
+        any ring may be a Ring of an ArcTable instead of a list of positions.
+        """
+        props = json.dumps(properties, separators=COMPACT_SEPARATORS, ensure_ascii=False)
+        self.f.write(f'{"," if self.count else ""}{{"type":"Feature","properties":{props},'
+                     f'"geometry":{{"type":{json.dumps(geometry_type)},"coordinates":')
+        self._write_nested(coordinates)
+        self.f.write('}}')
+        self.count += 1
+
+    def _write_nested(self, value):
+        if isinstance(value, Ring):
+            self.f.write(self._positions(value.points()))
+        elif value and isinstance(value[0], (int, float)):
+            self.f.write(self._positions([value])[1:-1])
+        elif value and isinstance(value[0], (list, tuple)) and value[0] and \
+                isinstance(value[0][0], (int, float)):
+            self.f.write(self._positions(value))
+        else:
+            self.f.write('[')
+            for n, part in enumerate(value):
+                if n:
+                    self.f.write(',')
+                self._write_nested(part)
+            self.f.write(']')
+
+    def _positions(self, points):
+        """``points`` as a JSON array of [lon,lat] arrays."""
+        factor = self.factor
+        if factor is None:
+            parts = [f'[{x!r},{y!r}]' for x, y, *_ in points]
+        else:
+            parts = [f'[{round(x * factor) / factor!r},{round(y * factor) / factor!r}]'
+                     for x, y, *_ in points]
+        return '[' + ','.join(parts) + ']'
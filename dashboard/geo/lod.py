@@ -0,0 +1,83 @@
+"""Levels of detail: one map simplified at several tolerances.
+
+The geo tools weigh the points of a topology once and cut it at a few
+tolerances, writing one file per level and an index describing them (see
+``lod_index``). The server picks the coarsest level that is still finer
+than a pixel at the size the map is drawn, so overview maps download a
+fraction of the full-detail geometry.
+
+Levels are ordered from coarsest to finest. Each has a ``resolution``: the
+largest error in degrees its simplification allows. For Douglas-Peucker
+that is the tolerance itself; for Visvalingam-Whyatt, whose tolerance is
+an area, it is the side of a square of that area.
+"""
+
+import math
+
+from .simplify import point_weights, simplify_arcs, threshold_for_vertices
+
+# Coarser levels written below the full-detail one, as multiples of its
+# resolution: 10 keeps roughly a fifth of the points, 4 a third
+DEFAULT_FACTORS = (10, 4)
+
+
+def lod_tolerances(method, base, factors=DEFAULT_FACTORS):
+    """Tolerances of the levels coarser than ``base``, coarsest first.
+
+    ``factors`` scale the resolution, so Visvalingam-Whyatt areas scale by
+    their square.
+    """
+    power = 2 if method == 'vw' else 1
+    return [base * factor ** power for factor in sorted(factors, reverse=True) if factor > 1]
+
+
+def resolution(method, tolerance):
+    """The error in degrees a level simplified at ``tolerance`` allows."""
+    return math.sqrt(tolerance) if method == 'vw' else tolerance
+
+
+def build_levels(table, method='dp', tolerance=None, vertices=None, factors=DEFAULT_FACTORS):
+    """``(tolerance, ArcTable)`` for every level of ``table``, coarsest first.
+
+    The full-detail level is simplified at ``tolerance``, or at the
+    tolerance keeping about ``vertices`` points; the others at the coarser
+    ``lod_tolerances``. The points are weighed only once. With neither
+    ``tolerance`` nor ``vertices`` there is one level, ``table`` itself.
+    """
+    if tolerance is None and vertices is None:
+        return [(0.0, table)]
+    weights = point_weights(table, method)
+    if vertices is not None:
+        tolerance = threshold_for_vertices(weights, vertices)
+    return [(t, simplify_arcs(table, weights, t))
+            for t in [*lod_tolerances(method, tolerance, factors), tolerance]]
+
+
+def lod_index(map_id, method, bbox, levels):
+    """The index the server reads to choose between a map's levels.
+
+    ``levels`` are dicts with the level's ``tolerance``, ``file`` (relative
+    to the site root), ``format`` ('topojson' or 'geojson'), ``vertices``
+    and ``bytes``, coarsest first.
+    """
+    return {
+        'map': map_id,
+        'method': method,
+        'bbox': bbox,
+        'levels': [{**level, 'resolution': resolution(method, level['tolerance'])}
+                   for level in levels],
+    }
+
+
+def geometry_bbox(coordinates, bbox=None):
+    """``[minLon, minLat, maxLon, maxLat]`` of nested GeoJSON coordinates, grown from ``bbox``."""
+    if bbox is None:
+        bbox = [math.inf, math.inf, -math.inf, -math.inf]
+    if coordinates and isinstance(coordinates[0], (int, float)):
+        lon, lat = coordinates[0], coordinates[1]
+        bbox[0], bbox[1] = min(bbox[0], lon), min(bbox[1], lat)
+        bbox[2], bbox[3] = max(bbox[2], lon), max(bbox[3], lat)
+    else:
+        for part in coordinates:
+            geometry_bbox(part, bbox)
+    return bbox
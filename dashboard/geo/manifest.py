@@ -0,0 +1,89 @@
+"""The record of what an incremental geo build last produced.
+
+Each build target (a region map, the UK overview) is recorded with the
+content hashes of the files it was built from, the tool arguments it was
+built with, a hash of the code that built it and the hashes of the files
+it wrote. A target is up to date while all of those still match, so a
+rebuild only touches the targets whose inputs, parameters or outputs
+changed.
+"""
+
+import hashlib
+import json
+import os
+
+from .encode import COMPACT_SEPARATORS
+
+# Recorded with each target; a manifest written by a different version
+# is ignored
+MANIFEST_VERSION = 1
+
+
+def file_digest(path):
+    """SHA-256 hex digest of a file's contents, or None if it does not exist."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+def value_digest(value):
+    """SHA-256 hex digest of a JSON-serializable value."""
+    text = json.dumps(value, sort_keys=True, separators=COMPACT_SEPARATORS)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class BuildManifest:
+    """Targets recorded at ``path``, with paths relative to ``root``.
+
+    A target's state is a dict of named JSON values (for example the
+    ``inputs`` digests by path, the tool ``args`` and a ``code`` digest)
+    that must all match for it to be up to date.
+    """
+
+    def __init__(self, path, root):
+        self.path = path
+        self.root = root
+        self.targets = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        if data.get('version') == MANIFEST_VERSION:
+            self.targets = data.get('targets', {})
+
+    def stale_reasons(self, target, state):
+        """Why ``target`` needs rebuilding: the parts of ``state`` that changed,
+        'outputs' if a file it wrote was changed or removed, or 'new'.
+        An empty list means it is up to date.
+        """
+        recorded = self.targets.get(target)
+        if recorded is None:
+            return ['new']
+        reasons = [name for name, value in state.items()
+                   if recorded['state'].get(name) != value]
+        for relpath, digest in recorded['outputs'].items():
+            if file_digest(os.path.join(self.root, relpath)) != digest:
+                reasons.append('outputs')
+                break
+        return reasons
+
+    def record(self, target, state, outputs):
+        """Record ``target`` as built from ``state`` into ``outputs`` (relative paths)."""
+        self.targets[target] = {
+            'state': state,
+            'outputs': {relpath: file_digest(os.path.join(self.root, relpath))
+                        for relpath in sorted(outputs)},
+        }
+
+    def save(self):
+        data = {'version': MANIFEST_VERSION,
+                'targets': dict(sorted(self.targets.items()))}
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+            f.write('\n')
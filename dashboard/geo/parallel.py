@@ -0,0 +1,118 @@
+"""Running the independent steps of a geo build across a process pool.
+
+A ``TaskPool`` runs module-level functions in worker processes. Whatever
+a task prints is captured and replayed in the order tasks were submitted,
+so a build's log reads the same with one worker or sixteen. Each task is
+timed in its worker, and ``report`` prints the times alongside the wall
+clock time of the whole build.
+
+With one worker, tasks run in the calling process as they are submitted.
+"""
+
+import contextlib
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def _run_captured(func, args, kwargs):
+    output = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        value = func(*args, **kwargs)
+    return value, time.perf_counter() - start, output.getvalue()
+
+
+class _Done:
+    """Stands in for a Future when a task ran inline."""
+
+    def __init__(self, result):
+        self._result = result
+
+    def done(self):
+        return True
+
+    def result(self):
+        return self._result
+
+
+class Task:
+    __slots__ = ('name', 'future', 'seconds', 'printed')
+
+    def __init__(self, name, future):
+        self.name = name
+        self.future = future
+        self.seconds = None
+        self.printed = False
+
+
+class TaskPool:
+    """Runs tasks on ``workers`` processes, replaying their output in submission order.
+
+    Use as a context manager; leaving it waits for every task.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = max(1, workers or default_workers())
+        self.executor = ProcessPoolExecutor(self.workers) if self.workers > 1 else None
+        self.tasks = []
+        self.started = time.perf_counter()
+        self.elapsed = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                for task in self.tasks:
+                    self.result(task)
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown(cancel_futures=exc_type is not None)
+            self.elapsed = time.perf_counter() - self.started
+        return False
+
+    def submit(self, name, func, *args, **kwargs):
+        """Run ``func(*args, **kwargs)`` as the task ``name``; returns the Task."""
+        if self.executor is None:
+            future = _Done(_run_captured(func, args, kwargs))
+        else:
+            future = self.executor.submit(_run_captured, func, args, kwargs)
+        task = Task(name, future)
+        self.tasks.append(task)
+        if self.executor is None:
+            self.result(task)
+        return task
+
+    def result(self, task):
+        """Wait for ``task`` and return its value.
+
+        Output is printed in submission order: that of every finished task
+        up to the first one still running.
+        """
+        value = task.future.result()[0]
+        for pending in self.tasks:
+            if pending.printed:
+                continue
+            if not pending.future.done():
+                break
+            _, pending.seconds, output = pending.future.result()
+            print(output, end='', flush=True)
+            pending.printed = True
+        return value
+
+    def report(self):
+        """Print each task's time and the build's wall clock time."""
+        total = sum(task.seconds or 0 for task in self.tasks)
+        width = max([len(task.name) for task in self.tasks] + [4])
+        print(f"\n{'task':<{width}} {'seconds':>8}")
+        for task in self.tasks:
+            print(f"{task.name:<{width}} {task.seconds:>8.2f}")
+        print(f"{len(self.tasks)} tasks, {total:.2f}s of work in {self.elapsed:.2f}s "
+              f"on {self.workers} worker{'s' if self.workers != 1 else ''}")
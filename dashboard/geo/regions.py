@@ -0,0 +1,229 @@
+"""Which dashboard region each English local authority district belongs to.
+
+LADs are matched by code: data/lad-regions.json lists the LAD13CD code
+of every district in the boundary files under its region, and every
+London borough's code starts with E09. A LAD whose code is in neither is
+matched by name against the lists below, and reported, so its code can
+be added to the table. Names are compared whole after normalizing case,
+punctuation and ONS suffixes like ', City of', so 'York' never matches
+'North Yorkshire' nor 'Bury' 'Canterbury'. The lists include districts
+abolished since the boundary files were published, so both old and new
+names match.
+
+``RegionIndex`` holds the lookup tables, built once, and partitions every
+feature into every region in a single pass.
+"""
+
+import json
+import re
+from collections import namedtuple
+
+# Region ids to the LAD13CD codes of their districts, relative to the site root
+LAD_REGIONS_FILE = 'data/lad-regions.json'
+
+# London boroughs are matched by code: every one starts with E09
+LONDON_CODES_PREFIX = 'E09'
+
+# Region to LAD name mapping
+NORTH_WEST_LADS = [
+    'bolton', 'bury', 'manchester', 'oldham', 'rochdale', 'salford', 'stockport',
+    'tameside', 'trafford', 'wigan',  # Greater Manchester
+    'knowsley', 'liverpool', 'st. helens', 'sefton', 'wirral',  # Merseyside
+    'halton', 'warrington',
+    'cheshire east', 'cheshire west and chester',
+    'blackburn with darwen', 'blackpool',
+    'burnley', 'chorley', 'fylde', 'hyndburn', 'lancaster', 'pendle',
+    'preston', 'ribble valley', 'rossendale', 'south ribble', 'west lancashire', 'wyre',
+    'allerdale', 'barrow-in-furness', 'carlisle', 'copeland', 'eden', 'south lakeland',
+    'cumberland', 'westmorland and furness'
+]
+
+NORTH_EAST_LADS = [
+    'hartlepool', 'middlesbrough', 'redcar and cleveland', 'stockton-on-tees',
+    'darlington', 'county durham', 'durham',
+    'gateshead', 'newcastle upon tyne', 'north tyneside', 'south tyneside', 'sunderland',
+    'northumberland'
+]
+
+YORKSHIRE_LADS = [
+    'kingston upon hull', 'east riding of yorkshire', 'north east lincolnshire',
+    'north lincolnshire', 'york',
+    'barnsley', 'doncaster', 'rotherham', 'sheffield',
+    'bradford', 'calderdale', 'kirklees', 'leeds', 'wakefield',
+    'craven', 'hambleton', 'harrogate', 'richmondshire', 'ryedale', 'scarborough', 'selby',
+    'north yorkshire'
+]
+
+EAST_MIDLANDS_LADS = [
+    'derby', 'leicester', 'nottingham', 'rutland',
+    'amber valley', 'bolsover', 'chesterfield', 'derbyshire dales', 'erewash',
+    'high peak', 'north east derbyshire', 'south derbyshire',
+    'blaby', 'charnwood', 'harborough', 'hinckley and bosworth', 'melton',
+    'north west leicestershire', 'oadby and wigston',
+    'boston', 'east lindsey', 'lincoln', 'north kesteven', 'south holland',
+    'south kesteven', 'west lindsey',
+    'corby', 'daventry', 'east northamptonshire', 'kettering', 'northampton',
+    'south northamptonshire', 'wellingborough',
+    'north northamptonshire', 'west northamptonshire',
+    'ashfield', 'bassetlaw', 'broxtowe', 'gedling', 'mansfield', 'newark and sherwood',
+    'rushcliffe'
+]
+
+WEST_MIDLANDS_LADS = [
+    'birmingham', 'coventry', 'dudley', 'sandwell', 'solihull', 'walsall', 'wolverhampton',
+    'herefordshire', 'shropshire', 'stoke-on-trent', 'telford and wrekin',
+    'bromsgrove', 'malvern hills', 'redditch', 'worcester', 'wychavon', 'wyre forest',
+    'cannock chase', 'east staffordshire', 'lichfield', 'newcastle-under-lyme',
+    'south staffordshire', 'stafford', 'staffordshire moorlands', 'tamworth',
+    'north warwickshire', 'nuneaton and bedworth', 'rugby', 'stratford-on-avon', 'warwick'
+]
+
+EASTERN_LADS = [
+    'bedford', 'central bedfordshire', 'luton',
+    'peterborough', 'cambridge', 'east cambridgeshire', 'fenland', 'huntingdonshire',
+    'south cambridgeshire',
+    'basildon', 'braintree', 'brentwood', 'castle point', 'chelmsford', 'colchester',
+    'epping forest', 'harlow', 'maldon', 'rochford', 'southend-on-sea', 'tendring',
+    'thurrock', 'uttlesford',
+    'broxbourne', 'dacorum', 'east hertfordshire', 'hertsmere', 'north hertfordshire',
+    'st albans', 'stevenage', 'three rivers', 'watford', 'welwyn hatfield',
+    'breckland', 'broadland', 'great yarmouth', "king's lynn and west norfolk",
+    'north norfolk', 'norwich', 'south norfolk',
+    'babergh', 'ipswich', 'mid suffolk', 'east suffolk', 'west suffolk',
+    'forest heath', 'st edmundsbury', 'suffolk coastal', 'waveney'  # merged in 2019
+]
+
+SOUTH_EAST_LADS = [
+    'bracknell forest', 'west berkshire', 'reading', 'slough', 'windsor and maidenhead',
+    'wokingham', 'milton keynes', 'brighton and hove', 'portsmouth', 'southampton',
+    'isle of wight', 'medway',
+    'aylesbury vale', 'chiltern', 'south bucks', 'wycombe', 'buckinghamshire',
+    'eastbourne', 'hastings', 'lewes', 'rother', 'wealden',
+    'basingstoke and deane', 'east hampshire', 'eastleigh', 'fareham', 'gosport',
+    'hart', 'havant', 'new forest', 'rushmoor', 'test valley', 'winchester',
+    'ashford', 'canterbury', 'dartford', 'dover', 'gravesham', 'maidstone',
+    'sevenoaks', 'folkestone and hythe', 'shepway', 'swale', 'thanet', 'tonbridge and malling',
+    'tunbridge wells',
+    'cherwell', 'oxford', 'south oxfordshire', 'vale of white horse', 'west oxfordshire',
+    'elmbridge', 'epsom and ewell', 'guildford', 'mole valley', 'reigate and banstead',
+    'runnymede', 'spelthorne', 'surrey heath', 'tandridge', 'waverley', 'woking',
+    'adur', 'arun', 'chichester', 'crawley', 'horsham', 'mid sussex', 'worthing'
+]
+
+SOUTH_WEST_LADS = [
+    'bath and north east somerset', 'bristol', 'north somerset',
+    'south gloucestershire', 'plymouth', 'torbay', 'bournemouth', 'poole',
+    'swindon', 'cornwall', 'isles of scilly', 'wiltshire',
+    'bournemouth, christchurch and poole', 'dorset',
+    'christchurch', 'east dorset', 'north dorset', 'purbeck', 'west dorset',
+    'weymouth and portland',
+    'cheltenham', 'cotswold', 'forest of dean', 'gloucester', 'stroud', 'tewkesbury',
+    'mendip', 'sedgemoor', 'south somerset', 'somerset west and taunton',
+    'taunton deane', 'west somerset',  # merged in 2019
+    'east devon', 'exeter', 'mid devon', 'north devon', 'south hams', 'teignbridge',
+    'torridge', 'west devon'
+]
+
+REGION_LAD_MAPPING = {
+    'north-east': NORTH_EAST_LADS,
+    'north-west': NORTH_WEST_LADS,
+    'yorkshire-humber': YORKSHIRE_LADS,
+    'east-midlands': EAST_MIDLANDS_LADS,
+    'midlands': WEST_MIDLANDS_LADS,
+    'eastern': EASTERN_LADS,
+    'south-east': SOUTH_EAST_LADS,
+    'south-west': SOUTH_WEST_LADS,
+}
+
+ENGLISH_REGIONS = ('london', *REGION_LAD_MAPPING)
+
+# ONS names put a qualifier after a comma: 'Bristol, City of'
+ONS_SUFFIX = re.compile(r',\s*(city|county) of$')
+NON_ALPHANUMERIC = re.compile(r'[^a-z0-9]+')
+
+# regions: region id -> features, in input order; unmatched: features in
+# no region; ambiguous: (feature, region ids) for features matching several;
+# by_name: (feature, region id) for features placed by name, not by code
+Partition = namedtuple('Partition', 'regions unmatched ambiguous by_name')
+
+
+def normalize_name(name):
+    """``name`` lower-cased, without ONS suffixes, apostrophes or other punctuation."""
+    name = ONS_SUFFIX.sub('', name.strip().lower())
+    name = name.replace('&', ' and ').replace("'", '')
+    return NON_ALPHANUMERIC.sub(' ', name).strip()
+
+
+def load_lad_regions(path):
+    """``{LAD code: region id}`` from a file of region ids and their LADs' codes."""
+    with open(path, 'r', encoding='utf-8') as f:
+        table = json.load(f)
+    return {code: region_id for region_id, codes in table.items() for code in codes}
+
+
+class RegionIndex:
+    """Region lookup by LAD code, code prefix and normalized LAD name."""
+
+    def __init__(self, name_lists=REGION_LAD_MAPPING,
+                 code_prefixes=((LONDON_CODES_PREFIX, 'london'),), codes=None):
+        self.codes = dict(codes or {})
+        self.code_prefixes = tuple(code_prefixes)
+        self.names = {}
+        for region_id, names in name_lists.items():
+            for name in names:
+                regions = self.names.setdefault(normalize_name(name), [])
+                if region_id not in regions:
+                    regions.append(region_id)
+        self.regions = list(dict.fromkeys(
+            [*(region for _, region in self.code_prefixes), *self.codes.values(), *name_lists]))
+
+    def lookup_code(self, code):
+        """The region id of LAD ``code``, or None if neither the table nor a prefix has it."""
+        if code in self.codes:
+            return self.codes[code]
+        for prefix, region_id in self.code_prefixes:
+            if code and code.startswith(prefix):
+                return region_id
+        return None
+
+    def lookup_name(self, name):
+        """Region ids whose lists hold LAD ``name``: one, none, or several."""
+        return self.names.get(normalize_name(name or ''), [])
+
+    def lookup(self, code, name):
+        """Region ids a LAD belongs to: one, none, or several for an ambiguous name.
+
+        A code match wins over the name.
+        """
+        region_id = self.lookup_code(code)
+        if region_id is not None:
+            return [region_id]
+        return self.lookup_name(name)
+
+    def partition(self, features, code_keys, name_keys):
+        """Split TopoJSON geometries or GeoJSON features into regions in one pass.
+
+        Codes and names are read from the first of ``code_keys`` and
+        ``name_keys`` present in each feature's properties.
+        """
+        regions = {region_id: [] for region_id in self.regions}
+        unmatched = []
+        ambiguous = []
+        by_name = []
+        for feature in features:
+            props = feature.get('properties') or {}
+            code = next((props[key] for key in code_keys if key in props), None)
+            region_id = self.lookup_code(code)
+            if region_id is not None:
+                regions[region_id].append(feature)
+                continue
+            name = next((props[key] for key in name_keys if key in props), None)
+            matches = self.lookup_name(name)
+            if len(matches) == 1:
+                regions[matches[0]].append(feature)
+                by_name.append((feature, matches[0]))
+            elif matches:
+                ambiguous.append((feature, matches))
+            else:
+                unmatched.append(feature)
+        return Partition(regions, unmatched, ambiguous, by_name)
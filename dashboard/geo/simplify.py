@@ -0,0 +1,172 @@
+"""Line simplification on the shared arcs of a topology.
+
+Simplifying arcs rather than rings means a border shared by two areas is
+simplified once and both sides keep exactly the same points, so no gaps
+or overlaps open up between neighbours.
+
+Simplification is done in two steps. ``point_weights`` gives every point
+of an ArcTable an importance: the Douglas-Peucker distance or the
+Visvalingam-Whyatt effective area at which it would be removed, made
+monotonic so that filtering by a single threshold reproduces the
+algorithm's result at that tolerance. ``simplify_arcs`` then keeps the
+points at or above a threshold, given directly or chosen to hit a target
+vertex count. One set of weights serves any number of thresholds.
+
+Arc endpoints are never removed, and closed arcs (islands) keep at least
+a triangle. Distances are planar, in the units of the coordinates.
+"""
+
+import heapq
+import math
+from array import array
+
+from .topology import ArcTable
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+METHODS = ('dp', 'vw')
+
+
+def point_weights(table, method='dp'):
+    """Importance of every point in ``table``, indexed like its buffer.
+
+    'dp' (Douglas-Peucker) weights are distances, 'vw' (Visvalingam-Whyatt)
+    weights are triangle areas. Arc endpoints weigh infinity. Returns a
+    float64 NumPy array for NumPy tables, otherwise an array('d').
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {', '.join(METHODS)}")
+    if table.uses_numpy:
+        xs, ys = table.coords[:, 0].tolist(), table.coords[:, 1].tolist()
+    else:
+        xs, ys = table.coords[0::2].tolist(), table.coords[1::2].tolist()
+
+    weights = [0.0] * table.point_count
+    for start, stop in zip(table.offsets, table.offsets[1:]):
+        if stop - start < 1:
+            continue
+        weights[start] = weights[stop - 1] = math.inf
+        if method == 'dp':
+            _douglas_peucker(xs, ys, start, stop, weights)
+        else:
+            _visvalingam(xs, ys, start, stop, weights)
+        if stop - start >= 4 and xs[start] == xs[stop - 1] and ys[start] == ys[stop - 1]:
+            # Keep closed arcs from collapsing below a triangle
+            for i in heapq.nlargest(2, range(start + 1, stop - 1), key=weights.__getitem__):
+                weights[i] = math.inf
+
+    if table.uses_numpy:
+        return np.array(weights, dtype=np.float64)
+    return array('d', weights)
+
+
+def _douglas_peucker(xs, ys, start, stop, weights):
+    # Each split point weighs its distance from the chord, capped by the
+    # weight of the split that created the chord
+    stack = [(start, stop - 1, math.inf)]
+    while stack:
+        first, last, parent = stack.pop()
+        if last - first < 2:
+            continue
+        ax, ay = xs[first], ys[first]
+        dx, dy = xs[last] - ax, ys[last] - ay
+        chord = dx * dx + dy * dy
+        best, best_squared = first + 1, -1.0
+        for i in range(first + 1, last):
+            px, py = xs[i] - ax, ys[i] - ay
+            if chord:
+                cross = px * dy - py * dx
+                squared = cross * cross / chord
+            else:
+                squared = px * px + py * py
+            if squared > best_squared:
+                best, best_squared = i, squared
+        weight = min(math.sqrt(best_squared), parent)
+        weights[best] = weight
+        stack.append((first, best, weight))
+        stack.append((best, last, weight))
+
+
+def _visvalingam(xs, ys, start, stop, weights):
+    # Repeatedly remove the point making the smallest triangle with its
+    # neighbours; a point never weighs less than one removed before it
+    n = stop - start
+    if n < 3:
+        return
+    prev = list(range(-1, n - 1))
+    after = list(range(1, n + 1))
+
+    def area(i):
+        a, b, c = start + prev[i], start + i, start + after[i]
+        return abs((xs[b] - xs[a]) * (ys[c] - ys[a]) - (xs[c] - xs[a]) * (ys[b] - ys[a])) / 2
+
+    current = [None] * n
+    for i in range(1, n - 1):
+        current[i] = area(i)
+    heap = [(current[i], i) for i in range(1, n - 1)]
+    heapq.heapify(heap)
+
+    largest = 0.0
+    while heap:
+        size, i = heapq.heappop(heap)
+        if size != current[i]:
+            continue  # superseded by a recomputed area, or already removed
+        current[i] = None
+        largest = max(largest, size)
+        weights[start + i] = largest
+        p, q = prev[i], after[i]
+        after[p], prev[q] = q, p
+        for j in (p, q):
+            if 0 < j < n - 1:
+                current[j] = area(j)
+                heapq.heappush(heap, (current[j], j))
+
+
+def threshold_for_vertices(weights, vertices):
+    """The weight threshold keeping about ``vertices`` points (at least the endpoints)."""
+    if vertices <= 0:
+        return math.inf
+    if vertices >= len(weights):
+        return 0.0
+    if np is not None and isinstance(weights, np.ndarray):
+        return float(np.partition(weights, len(weights) - vertices)[len(weights) - vertices])
+    return heapq.nlargest(vertices, weights)[-1]
+
+
+def simplify_arcs(table, weights, tolerance=None, vertices=None):
+    """A new ArcTable keeping the points of ``table`` weighing at least ``tolerance``.
+
+    With ``vertices`` the tolerance is chosen to keep about that many
+    points in total. With neither, ``table`` is returned unchanged.
+    """
+    if vertices is not None:
+        tolerance = threshold_for_vertices(weights, vertices)
+    if tolerance is None:
+        return table
+
+    offsets = table.offsets
+    if table.uses_numpy:
+        keep = weights >= tolerance
+        kept_before = np.concatenate(([0], np.cumsum(keep)))
+        return ArcTable(table.coords[keep], kept_before[offsets].tolist())
+
+    coords = array('d')
+    new_offsets = [0]
+    source = table.coords
+    for start, stop in zip(offsets, offsets[1:]):
+        for i in range(start, stop):
+            if weights[i] >= tolerance:
+                coords.append(source[2 * i])
+                coords.append(source[2 * i + 1])
+        new_offsets.append(len(coords) // 2)
+    return ArcTable(coords, new_offsets)
+
+
+def simplify(table, method='dp', tolerance=None, vertices=None):
+    """Weigh the points of ``table`` with ``method`` and simplify it."""
+    if tolerance is None and vertices is None:
+        return table
+    return simplify_arcs(table, point_weights(table, method), tolerance, vertices)
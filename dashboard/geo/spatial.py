@@ -0,0 +1,212 @@
+"""Finding the areas of a map at a point or within a box.
+
+An ``AreaIndex`` holds every polygon of a set of areas (LADs, council
+areas), with their bounding boxes packed into an R-tree. A point lookup
+descends the tree to the few polygons whose box holds the point and only
+runs the exact point-in-polygon test on those; a box query returns the
+areas whose polygons' boxes overlap it. Each ring's edges are bucketed
+into horizontal bands, so the test only crosses the edges at the point's
+latitude rather than the whole coastline.
+
+The tree is packed once with Sort-Tile-Recursive (STR): boxes are sorted
+into vertical slices by centre longitude, each slice by centre latitude,
+and consecutive runs become nodes, level by level up to the root. Nodes
+end up full and barely overlapping, which suits an index that is built
+once and never updated.
+"""
+
+import math
+
+from .topology import decode_arcs
+
+# Children per R-tree node
+NODE_CAPACITY = 16
+
+# Average edges per latitude band of a BandedRing
+EDGES_PER_BAND = 8
+
+EMPTY_BBOX = (math.inf, math.inf, -math.inf, -math.inf)
+
+
+def ring_contains(points, lon, lat):
+    """True if (lon, lat) is inside the ring given as a list of points (even-odd rule)."""
+    inside = False
+    x0, y0 = points[-1]
+    for x1, y1 in points:
+        if (y0 > lat) != (y1 > lat) and lon < x0 + (lat - y0) * (x1 - x0) / (y1 - y0):
+            inside = not inside
+        x0, y0 = x1, y1
+    return inside
+
+
+def points_bbox(points):
+    lons = [lon for lon, _ in points]
+    lats = [lat for _, lat in points]
+    return (min(lons), min(lats), max(lons), max(lats))
+
+
+def union_bbox(bboxes):
+    west, south, east, north = EMPTY_BBOX
+    for w, s, e, n in bboxes:
+        west, south = min(west, w), min(south, s)
+        east, north = max(east, e), max(north, n)
+    return (west, south, east, north)
+
+
+def intersects(a, b):
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+class BandedRing:
+    """A ring's edges bucketed by latitude for point-in-ring tests.
+
+    The ring's latitude range is cut into equal bands and each edge is
+    listed in every band it spans, so ``contains`` only looks at the
+    edges of one band.
+    """
+
+    __slots__ = ('south', 'band_height', 'bands')
+
+    def __init__(self, points, edges_per_band=EDGES_PER_BAND):
+        lats = [lat for _, lat in points]
+        self.south = min(lats)
+        count = max(1, len(points) // edges_per_band)
+        self.band_height = (max(lats) - self.south) / count or 1.0
+        self.bands = [[] for _ in range(count)]
+        x0, y0 = points[-1]
+        for x1, y1 in points:
+            first = int((min(y0, y1) - self.south) / self.band_height)
+            last = min(count - 1, int((max(y0, y1) - self.south) / self.band_height))
+            edge = (x0, y0, x1, y1)
+            for band in range(first, last + 1):
+                self.bands[band].append(edge)
+            x0, y0 = x1, y1
+
+    def contains(self, lon, lat):
+        """True if (lon, lat) is inside the ring (even-odd rule)."""
+        band = int((lat - self.south) / self.band_height)
+        if band < 0 or band >= len(self.bands):
+            return False
+        inside = False
+        for x0, y0, x1, y1 in self.bands[band]:
+            if (y0 > lat) != (y1 > lat) and lon < x0 + (lat - y0) * (x1 - x0) / (y1 - y0):
+                inside = not inside
+        return inside
+
+
+class STRTree:
+    """A static R-tree over ``bboxes``, packed with Sort-Tile-Recursive.
+
+    ``query`` yields the indices of the boxes overlapping a box. Each node
+    is a ``(bbox, children, leaf)`` tuple; a leaf's children are indices
+    into ``bboxes``.
+    """
+
+    def __init__(self, bboxes, capacity=NODE_CAPACITY):
+        self.bboxes = list(bboxes)
+        self.capacity = capacity
+        nodes = self._pack([(bbox, n) for n, bbox in enumerate(self.bboxes)], leaf=True)
+        self.depth = 1
+        while len(nodes) > 1:
+            nodes = self._pack([(node[0], node) for node in nodes], leaf=False)
+            self.depth += 1
+        self.root = nodes[0] if nodes else (EMPTY_BBOX, [], True)
+
+    def _pack(self, entries, leaf):
+        """One level of nodes over ``(bbox, child)`` entries."""
+        capacity = self.capacity
+        node_count = math.ceil(len(entries) / capacity)
+        slices = math.ceil(math.sqrt(node_count))
+        slice_size = capacity * math.ceil(node_count / slices) if node_count else 1
+
+        entries.sort(key=lambda entry: entry[0][0] + entry[0][2])
+        nodes = []
+        for start in range(0, len(entries), slice_size):
+            tile = sorted(entries[start:start + slice_size],
+                          key=lambda entry: entry[0][1] + entry[0][3])
+            for first in range(0, len(tile), capacity):
+                group = tile[first:first + capacity]
+                nodes.append((union_bbox(bbox for bbox, _ in group),
+                              [child for _, child in group], leaf))
+        return nodes
+
+    def query(self, bbox):
+        """Indices of the boxes overlapping ``bbox``, in no particular order."""
+        bboxes = self.bboxes
+        stack = [self.root]
+        while stack:
+            node_bbox, children, leaf = stack.pop()
+            if not intersects(node_bbox, bbox):
+                continue
+            if leaf:
+                for n in children:
+                    if intersects(bboxes[n], bbox):
+                        yield n
+            else:
+                stack.extend(children)
+
+
+class AreaIndex:
+    """Areas, given as ``(properties, polygons)``, indexed for spatial lookups.
+
+    A polygon is a list of rings, exterior first, each a list of (lon, lat)
+    points; the index keeps them as BandedRings. Areas are referred to by
+    their position; ``bboxes`` holds each one's bounding box.
+    """
+
+    def __init__(self, areas):
+        self.properties = []
+        self.bboxes = []
+        self.polygons = []
+        self.owners = []
+        polygon_bboxes = []
+        for properties, polygons in areas:
+            first = len(polygon_bboxes)
+            for polygon in polygons:
+                if polygon and len(polygon[0]) >= 3:
+                    self.polygons.append([BandedRing(ring) for ring in polygon if ring])
+                    self.owners.append(len(self.properties))
+                    polygon_bboxes.append(points_bbox(polygon[0]))
+            self.properties.append(properties)
+            self.bboxes.append(union_bbox(polygon_bboxes[first:]))
+        self.tree = STRTree(polygon_bboxes)
+
+    def __len__(self):
+        return len(self.properties)
+
+    def locate(self, lon, lat):
+        """Index of the area holding (lon, lat), or None.
+
+        Where areas overlap, the first one indexed wins.
+        """
+        found = None
+        for n in self.tree.query((lon, lat, lon, lat)):
+            polygon = self.polygons[n]
+            if polygon[0].contains(lon, lat) and \
+                    not any(hole.contains(lon, lat) for hole in polygon[1:]):
+                if found is None or self.owners[n] < found:
+                    found = self.owners[n]
+        return found
+
+    def overlapping(self, bbox):
+        """Indices of the areas with a polygon whose bounding box overlaps ``bbox``, in order."""
+        return sorted({self.owners[n] for n in self.tree.query(bbox)})
+
+
+def topology_areas(topology, extra=None):
+    """``(properties, polygons)`` of every areal geometry in ``topology``.
+
+    ``extra`` is merged into each area's properties.
+    """
+    table = decode_arcs(topology)
+    for obj in topology.get('objects', {}).values():
+        for geom in obj.get('geometries', []):
+            if geom.get('type') == 'Polygon':
+                polygons = [geom['arcs']]
+            elif geom.get('type') == 'MultiPolygon':
+                polygons = geom['arcs']
+            else:
+                continue
+            properties = {**geom.get('properties', {}), **(extra or {})}
+            yield properties, [[list(table.ring(ring).points()) for ring in polygon]
+                               for polygon in polygons]
@@ -0,0 +1,225 @@
+"""Decoding TopoJSON arcs into coordinates.
+
+Every arc of a topology is decoded into one flat coordinate buffer with an
+offsets table (an ArcTable). Rings refer to arcs by point range and are
+only turned into [lon, lat] lists when they are serialized, so shared
+borders are neither copied nor reversed in memory.
+
+With NumPy installed the arcs are decoded in one vectorised pass (a
+cumulative sum over all points, corrected at arc boundaries, then the
+scale/translate transform) into an (n, 2) float64 array. Without it a
+pure-Python loop fills an array('d') with the same numbers bit for bit.
+"""
+
+import itertools
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def have_numpy():
+    return np is not None
+
+
+def get_transform(topology):
+    """``(scale, translate)`` of a topology, or None if it is not quantized."""
+    transform = topology.get('transform')
+    if not transform:
+        return None
+    return transform.get('scale', [1, 1]), transform.get('translate', [0, 0])
+
+
+class ArcTable:
+    """Every arc of a topology in one contiguous coordinate buffer.
+
+    ``coords`` is an (n, 2) float64 array, or an array('d') of interleaved
+    lon/lat values when NumPy is not used. Arc ``i`` holds points
+    ``offsets[i]`` to ``offsets[i + 1]``.
+    """
+
+    def __init__(self, coords, offsets):
+        self.coords = coords
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def point_count(self):
+        return self.offsets[-1]
+
+    @property
+    def uses_numpy(self):
+        return np is not None and isinstance(self.coords, np.ndarray)
+
+    def span(self, idx, skip_first=False):
+        """``(start, stop, reverse)`` point range of arc ``idx``.
+
+        Negative indices give arc ``~idx`` reversed. ``skip_first`` leaves
+        out the first point in traversal order.
+        """
+        reverse = idx < 0
+        if reverse:
+            idx = ~idx
+        start, stop = self.offsets[idx], self.offsets[idx + 1]
+        if skip_first:
+            if reverse:
+                stop -= 1
+            else:
+                start += 1
+        return start, stop, reverse
+
+    def ring(self, arc_indices, skip_junctions=True):
+        """The ring made by joining ``arc_indices``, as point ranges.
+
+        With ``skip_junctions`` the point shared by consecutive arcs
+        appears once.
+        """
+        return Ring(self, [self.span(idx, skip_junctions and n > 0)
+                           for n, idx in enumerate(arc_indices)])
+
+    def endpoints(self, idx):
+        """First and last (lon, lat) of arc ``idx`` in traversal order."""
+        start, stop, reverse = self.span(idx)
+        if self.uses_numpy:
+            first, last = tuple(self.coords[start].tolist()), tuple(self.coords[stop - 1].tolist())
+        else:
+            first = self.coords[2 * start], self.coords[2 * start + 1]
+            last = self.coords[2 * stop - 2], self.coords[2 * stop - 1]
+        return (last, first) if reverse else (first, last)
+
+    def arc(self, idx):
+        """Points of arc ``idx`` as [lon, lat] lists."""
+        return Ring(self, [self.span(idx)]).coordinates()
+
+    def rounded(self, precision):
+        """A copy with every coordinate rounded to ``precision`` decimal places."""
+        factor = 10 ** precision
+        if self.uses_numpy:
+            coords = self.coords * factor
+            np.rint(coords, out=coords)
+            coords /= factor
+        else:
+            coords = array('d', (round(v * factor) / factor for v in self.coords))
+        return ArcTable(coords, self.offsets)
+
+
+class Ring:
+    """A ring as a list of point ranges into an ArcTable's buffer."""
+
+    __slots__ = ('table', 'spans')
+
+    def __init__(self, table, spans):
+        self.table = table
+        self.spans = spans
+
+    def __len__(self):
+        return sum(stop - start for start, stop, _ in self.spans)
+
+    def points(self):
+        """Iterate over the ring's points as (lon, lat) pairs without building the ring."""
+        coords = self.table.coords
+        for start, stop, reverse in self.spans:
+            if self.table.uses_numpy:
+                span = coords[start:stop]
+                yield from (span[::-1] if reverse else span).tolist()
+            else:
+                indices = range(stop - 1, start - 1, -1) if reverse else range(start, stop)
+                for i in indices:
+                    yield coords[2 * i], coords[2 * i + 1]
+
+    def coordinates(self):
+        """The ring's points as a new list of [lon, lat] lists."""
+        coords = self.table.coords
+        if self.table.uses_numpy:
+            parts = [coords[start:stop][::-1] if reverse else coords[start:stop]
+                     for start, stop, reverse in self.spans]
+            return np.concatenate(parts).tolist() if parts else []
+        points = []
+        for start, stop, reverse in self.spans:
+            indices = range(stop - 1, start - 1, -1) if reverse else range(start, stop)
+            points.extend([coords[2 * i], coords[2 * i + 1]] for i in indices)
+        return points
+
+
+def decode_arcs(topology, precision=None, use_numpy=None):
+    """An ArcTable of the absolute coordinates of every arc in ``topology``.
+
+    Quantized topologies (those with a transform) are delta-decoded and
+    transformed; others already hold absolute positions. ``precision``
+    rounds to that many decimal places. NumPy is used when available
+    unless ``use_numpy`` is False.
+    """
+    if use_numpy is None:
+        use_numpy = np is not None
+    arcs = topology.get('arcs', [])
+    transform = get_transform(topology)
+    offsets = [0]
+    for arc in arcs:
+        offsets.append(offsets[-1] + len(arc))
+    if use_numpy:
+        coords = _decode_arcs_numpy(arcs, offsets, transform, precision)
+    else:
+        coords = _decode_arcs_python(arcs, transform, precision)
+    return ArcTable(coords, offsets)
+
+
+def _decode_arcs_python(arcs, transform, precision):
+    coords = array('d')
+    factor = None if precision is None else 10 ** precision
+    if transform is not None:
+        (sx, sy), (tx, ty) = transform
+    for arc in arcs:
+        x, y = 0, 0
+        for point in arc:
+            if transform is None:
+                lon, lat = point[0], point[1]
+            else:
+                x += point[0]
+                y += point[1]
+                lon, lat = x * sx + tx, y * sy + ty
+            if factor is not None:
+                # Same arithmetic as numpy's rint-based rounding, so both backends agree
+                lon, lat = round(lon * factor) / factor, round(lat * factor) / factor
+            coords.append(lon)
+            coords.append(lat)
+    return coords
+
+
+def _decode_arcs_numpy(arcs, offsets, transform, precision):
+    total = offsets[-1]
+    dtype = np.float64 if transform is None else np.int64
+    flat = np.fromiter(itertools.chain.from_iterable(itertools.chain.from_iterable(arcs)),
+                       dtype=dtype)
+    if len(flat) != 2 * total:
+        # Some positions carry more than two values; keep the first two
+        flat = np.fromiter(itertools.chain.from_iterable(
+            (p[0], p[1]) for p in itertools.chain.from_iterable(arcs)), dtype=dtype)
+
+    if transform is None:
+        coords = flat.reshape(total, 2)
+    else:
+        positions = flat.reshape(total, 2)
+        # Subtract each arc's delta total from the first delta of the next
+        # so that one in-place cumulative sum restarts at every arc
+        starts = np.array([start for start, stop in zip(offsets, offsets[1:]) if stop > start],
+                          dtype=np.int64)
+        if len(starts) > 1:
+            positions[starts[1:]] -= np.add.reduceat(positions, starts, axis=0)[:-1]
+        np.cumsum(positions, axis=0, out=positions)
+
+        (sx, sy), (tx, ty) = transform
+        coords = positions.astype(np.float64)
+        del flat, positions
+        coords *= (sx, sy)
+        coords += (tx, ty)
+
+    if precision is not None:
+        factor = 10 ** precision
+        coords *= factor
+        np.rint(coords, out=coords)
+        coords /= factor
+    return coords
@@ -0,0 +1,109 @@
+"""Map geometry at the level of detail a client will actually draw.
+
+The geo tools write each map (the UK overview 'uk' and every region) at
+several levels of detail, indexed by data/lod/<map>.json. Given the size
+the map is drawn at, or a web-map zoom level, the API answers with the
+coarsest level whose simplification error stays under a pixel. Each level
+is encoded and gzipped once and kept until its files change.
+"""
+
+import re
+from http import HTTPStatus
+
+from .api import ApiError, param_number, prepare_json
+
+LOD_INDEX = 'data/lod/{map}.json'
+
+MAP_ID = re.compile(r'^[a-z0-9-]+$')
+
+# Simplification error allowed, in pixels, when the client does not say
+DEFAULT_PIXEL_TOLERANCE = 1.0
+
+# Degrees of longitude per pixel at zoom 0 of a 256-pixel web-map tile
+ZOOM_0_DEGREES_PER_PIXEL = 360 / 256
+
+
+def degrees_per_pixel(params, bbox):
+    """How many degrees one pixel spans as the client will draw the map.
+
+    ``zoom`` is a web-map zoom level. ``width`` and ``height`` are the
+    pixel size the map's bounding box is drawn at; with both, the finer
+    axis wins. Returns None when the request gives no size.
+    """
+    zoom = param_number(params, 'zoom', minimum=0, maximum=30)
+    if zoom is not None:
+        return ZOOM_0_DEGREES_PER_PIXEL / 2 ** zoom
+
+    spans = []
+    for name, extent in (('width', bbox[2] - bbox[0]), ('height', bbox[3] - bbox[1])):
+        pixels = param_number(params, name, minimum=1)
+        if pixels is not None:
+            spans.append(extent / pixels)
+    return min(spans) if spans else None
+
+
+def choose_level(levels, resolution):
+    """Index of the coarsest level at least as fine as ``resolution``.
+
+    ``levels`` run coarsest first; with no ``resolution``, or none fine
+    enough, the finest level is used.
+    """
+    if resolution is not None:
+        for n, level in enumerate(levels):
+            if level['resolution'] <= resolution:
+                return n
+    return len(levels) - 1
+
+
+def build_level(store, map_id, n):
+    index = store.load(LOD_INDEX.format(map=map_id))
+    if index is None or n >= len(index['levels']):
+        return None
+    level = index['levels'][n]
+    data = store.load(level['file'])
+    if data is None:
+        return None
+    return prepare_json({
+        'map': map_id,
+        'level': n,
+        'levels': len(index['levels']),
+        'resolution': level['resolution'],
+        'format': level['format'],
+        'data': data,
+    })
+
+
+def get_level(store, map_id, n, level):
+    relpath = LOD_INDEX.format(map=map_id)
+    return store.derive(f'geometry:{map_id}:{n}', [relpath, level['file']],
+                        lambda s: build_level(s, map_id, n))
+
+
+def api_geometry(server, params):
+    """GET /api/geometry?map=<id>: one precomputed level of detail of a map.
+
+    The level is chosen from zoom=<web-map zoom>, or width=<px> and/or
+    height=<px> of the drawn map, or tolerance=<degrees> directly, with
+    pixels=<error> pixels of simplification error allowed (default 1).
+    Without any of them the finest level is returned. ``data`` holds the
+    geometry as TopoJSON or GeoJSON, as ``format`` says.
+    """
+    map_id = (params.get('map') or [''])[-1]
+    if not MAP_ID.match(map_id):
+        raise ApiError(HTTPStatus.BAD_REQUEST, 'map must be a map id like uk or london')
+    index = server.data.load(LOD_INDEX.format(map=map_id))
+    if index is None or not index.get('levels'):
+        raise ApiError(HTTPStatus.NOT_FOUND, f'No levels of detail for map {map_id}')
+
+    resolution = param_number(params, 'tolerance', minimum=0)
+    if resolution is None:
+        per_pixel = degrees_per_pixel(params, index['bbox'])
+        if per_pixel is not None:
+            pixels = param_number(params, 'pixels', DEFAULT_PIXEL_TOLERANCE, minimum=0)
+            resolution = per_pixel * pixels
+
+    n = choose_level(index['levels'], resolution)
+    payload = get_level(server.data, map_id, n, index['levels'][n])
+    if payload is None:
+        raise ApiError(HTTPStatus.SERVICE_UNAVAILABLE, f'Geometry for map {map_id} is missing')
+    return payload
@@ -0,0 +1,357 @@
+"""Request handlers for the dashboard server."""
+
+import http.server
+import io
+import json
+import os
+import sys
+import time
+import urllib.parse
+from http import HTTPStatus
+
+from . import routes
+from .caching import NO_STORE, cache_control_for, is_not_modified
+from .compression import is_compressible, select_variant
+from .events import EVENTS_PATH, parse_event_id
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .metrics import METRICS_PATH, UNMATCHED, CountingWriter
+from .ranges import (RangeNotSatisfiable, content_range, if_range_matches, multipart_segments,
+                     parse_range, segments_length)
+from .response_cache import Representation
+
+COPY_BUFSIZE = 64 * 1024
+
+CACHE_STATS_PATH = '/_server/cache'
+
+
+class DashboardHandler(http.server.SimpleHTTPRequestHandler):
+    """Static file handler for the dashboard.
+
+    Files are served with a content-hash ETag and Last-Modified so browsers
+    can revalidate with a cheap 304. When the server's ``no_cache`` flag is
+    set it instead tells browsers never to cache anything. Text assets with a
+    precompressed sibling are served compressed to clients that accept it.
+    Single and multi-part Range requests are answered with 206. Small files
+    are served from the server's in-memory response cache; the rest go out
+    through sendfile() unless the server's ``use_sendfile`` flag is off.
+    Paths under /api/ are answered by the JSON API in routes.py, except
+    /api/events, the Server-Sent Events stream of data changes. Every
+    request is recorded in the server's metrics, served at /metrics.
+    """
+
+    extensions_map = {
+        **http.server.SimpleHTTPRequestHandler.extensions_map,
+        '.geojson': 'application/geo+json',
+        '.topojson': 'application/json',
+    }
+
+    def setup(self):
+        super().setup()
+        self.wfile = CountingWriter(self.wfile)
+
+    def handle_one_request(self):
+        self.request_started = None
+        self.response_status = None
+        self.response_length = None
+        self.response_encoding = None
+        # Uncompressed size of a compressed body, set by whoever compressed it
+        self.identity_length = None
+        sent = self.wfile.sent
+        try:
+            super().handle_one_request()
+        finally:
+            # Also when the client went away mid-response
+            if self.request_started is not None:
+                self.record_request(time.perf_counter() - self.request_started,
+                                    self.wfile.sent - sent)
+
+    def parse_request(self):
+        self.request_started = time.perf_counter()
+        self.server.metrics.started()
+        return super().parse_request()
+
+    def record_request(self, seconds, sent):
+        route = self.route_label()
+        status = int(self.response_status or 0)
+        compressed = self.response_encoding is not None and status == HTTPStatus.OK
+        self.server.metrics.finished(
+            route, self.command or '', status, seconds, sent,
+            self.identity_length if compressed else None,
+            self.response_length if compressed else None,
+        )
+        slow_ms = self.server.slow_request_ms
+        if slow_ms is not None and seconds * 1000 >= slow_ms:
+            print(f'Slow request: {self.command} {self.path} {status} in {seconds * 1000:.1f} ms, '
+                  f'{sent / 1024:.1f} KB sent', file=sys.stderr, flush=True)
+
+    def route_label(self):
+        """The route a request is counted under in the metrics."""
+        path = urllib.parse.unquote(urllib.parse.urlsplit(self.path or '').path)
+        if path in (CACHE_STATS_PATH, EVENTS_PATH, METRICS_PATH):
+            return path
+        if routes.is_api_path(path):
+            route = path.rstrip('/')
+            return route if route in routes.ROUTES else UNMATCHED
+        if self.response_status in (HTTPStatus.NOT_FOUND, None) or self.response_status >= 500:
+            return UNMATCHED
+        # The file served, so /data/./x and /js/../data/x count as /data/x
+        relpath = os.path.relpath(self.translate_path(self.path), self.directory)
+        return '/' if relpath == os.curdir else '/' + relpath.replace(os.sep, '/')
+
+    def send_response(self, code, message=None):
+        self.response_status = code
+        super().send_response(code, message)
+
+    def send_header(self, keyword, value):
+        name = keyword.lower()
+        if name == 'content-length':
+            self.response_length = int(value)
+        elif name == 'content-encoding':
+            self.response_encoding = value
+        super().send_header(keyword, value)
+
+    def do_GET(self):
+        path = urllib.parse.urlsplit(self.path).path
+        if path == CACHE_STATS_PATH:
+            self.send_cache_stats()
+            return
+        if path == METRICS_PATH:
+            self.send_metrics()
+            return
+        if path == EVENTS_PATH:
+            self.send_event_stream()
+            return
+        if routes.is_api_path(self.path):
+            routes.handle(self)
+            return
+        super().do_GET()
+
+    def do_HEAD(self):
+        path = urllib.parse.urlsplit(self.path).path
+        if path == CACHE_STATS_PATH:
+            self.send_cache_stats()
+            return
+        if path == METRICS_PATH:
+            self.send_metrics()
+            return
+        if path == EVENTS_PATH:
+            self.send_event_stream()
+            return
+        if routes.is_api_path(self.path):
+            routes.handle(self)
+            return
+        super().do_HEAD()
+
+    def send_head(self):
+        self.body_segments = None
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            index = self.find_index(path)
+            if index is None or not urllib.parse.urlsplit(self.path).path.endswith('/'):
+                # Redirects and directory listings
+                return super().send_head()
+            path = index
+        if path.endswith('/'):
+            self.send_error(HTTPStatus.NOT_FOUND, 'File not found')
+            return None
+
+        cache = self.server.response_cache
+        if cache is not None:
+            entry = cache.get(path, self.guess_type(path))
+            if entry is not None:
+                rep = entry.select(self.headers.get('Accept-Encoding'))
+                self.identity_length = entry.representations[None].size
+                return self.send_representation(rep, io.BytesIO(rep.body))
+
+        try:
+            st = os.stat(path)
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, 'File not found')
+            return None
+        compressible = is_compressible(path)
+        encoding, variant_path = None, path
+        self.identity_length = st.st_size
+        if compressible:
+            encoding, variant_path = select_variant(path, st, self.headers.get('Accept-Encoding'))
+        try:
+            f = open(variant_path, 'rb')
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, 'File not found')
+            return None
+
+        try:
+            st = os.fstat(f.fileno())
+            etag = None if self.server.no_cache else self.server.etags.etag(variant_path, st, f)
+            rep = Representation(None, self.guess_type(path), encoding, etag,
+                                 self.date_time_string(st.st_mtime), st.st_mtime, st.st_size,
+                                 compressible)
+            return self.send_representation(rep, f)
+        except:
+            f.close()
+            raise
+
+    def send_representation(self, rep, source):
+        """Send the status line and headers for ``rep``.
+
+        Returns ``source`` for the caller to copy the body from, or None (with
+        ``source`` closed) when there is no body to send.
+        """
+        etag = None if self.server.no_cache else rep.etag
+        if etag is not None and is_not_modified(self.headers, etag, rep.mtime):
+            source.close()
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_representation_headers(rep, etag)
+            self.end_headers()
+            return None
+
+        try:
+            ranges = self.requested_ranges(rep.size, etag, rep.last_modified)
+        except RangeNotSatisfiable:
+            source.close()
+            self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+            self.send_header('Content-Range', f'bytes */{rep.size}')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return None
+
+        if ranges is None:
+            self.send_response(HTTPStatus.OK)
+            self.send_header('Content-Type', rep.content_type)
+            self.body_segments = [(0, rep.size)]
+        elif len(ranges) == 1:
+            self.send_response(HTTPStatus.PARTIAL_CONTENT)
+            self.send_header('Content-Type', rep.content_type)
+            self.send_header('Content-Range', content_range(*ranges[0], rep.size))
+            self.body_segments = ranges
+        else:
+            boundary, self.body_segments = multipart_segments(ranges, rep.size, rep.content_type)
+            self.send_response(HTTPStatus.PARTIAL_CONTENT)
+            self.send_header('Content-Type', f'multipart/byteranges; boundary={boundary}')
+        self.send_header('Content-Length', str(segments_length(self.body_segments)))
+        self.send_header('Accept-Ranges', 'bytes')
+        if rep.encoding is not None:
+            self.send_header('Content-Encoding', rep.encoding.name)
+        self.send_representation_headers(rep, etag)
+        self.end_headers()
+        return source
+
+    def requested_ranges(self, size, etag, last_modified):
+        """Byte ranges to send, or None for the whole representation."""
+        if not if_range_matches(self.headers.get('If-Range'), etag, last_modified):
+            return None
+        return parse_range(self.headers.get('Range'), size)
+
+    def copyfile(self, source, outputfile):
+        if self.body_segments is None:
+            # Directory listings
+            super().copyfile(source, outputfile)
+            return
+        for segment in self.body_segments:
+            if isinstance(segment, bytes):
+                outputfile.write(segment)
+            elif isinstance(source, io.BytesIO):
+                offset, count = segment
+                outputfile.write(source.getbuffer()[offset:offset + count])
+            else:
+                self.send_file_range(source, *segment)
+
+    def send_file_range(self, f, offset, count):
+        """Send ``count`` bytes of ``f`` from ``offset``, zero-copy when possible."""
+        if self.server.use_sendfile:
+            # socket.sendfile uses os.sendfile where the platform has it and
+            # falls back to plain send() itself where it does not; it
+            # bypasses wfile, so count what it sent here
+            self.wfile.sent += self.connection.sendfile(f, offset, count)
+            return
+        f.seek(offset)
+        while count > 0:
+            chunk = f.read(min(COPY_BUFSIZE, count))
+            if not chunk:
+                break
+            self.wfile.write(chunk)
+            count -= len(chunk)
+
+    def find_index(self, directory):
+        for name in ('index.html', 'index.htm'):
+            index = os.path.join(directory, name)
+            if os.path.isfile(index):
+                return index
+        return None
+
+    def send_representation_headers(self, rep, etag):
+        if rep.compressible:
+            # Caches must key compressible files on the encoding asked for,
+            # including responses that went out uncompressed
+            self.send_header('Vary', 'Accept-Encoding')
+        if etag is not None:
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', rep.last_modified)
+            self.send_header('Cache-Control', cache_control_for(self.path))
+
+    def send_cache_stats(self):
+        cache = self.server.response_cache
+        stats = cache.stats() if cache is not None else {'enabled': False}
+        body = json.dumps(stats).encode('utf-8')
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def send_metrics(self):
+        body = self.server.metrics.render(self.server).encode('utf-8')
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', METRICS_CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def send_event_stream(self):
+        """Start a Server-Sent Events stream and hand the connection to the server's EventStream.
+
+        HEAD gets the stream's headers and nothing more.
+        """
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        if not self.server.no_cache:
+            self.send_header('Cache-Control', 'no-store')
+        # Stop proxies such as nginx holding events back in a buffer
+        self.send_header('X-Accel-Buffering', 'no')
+        self.end_headers()
+        if self.command == 'HEAD':
+            return
+        self.wfile.flush()
+        # The stream ends when the connection does, so nothing can follow it
+        self.close_connection = True
+        self.server.detach(self.request)
+        self.server.events.subscribe(self.request, parse_event_id(self.headers.get('Last-Event-ID')))
+
+    def end_headers(self):
+        if self.server.no_cache:
+            self.send_header('Cache-Control', NO_STORE)
+            self.send_header('Pragma', 'no-cache')
+            self.send_header('Expires', '0')
+        super().end_headers()
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class KeepAliveHandler(DashboardHandler):
+    """HTTP/1.1 handler that keeps connections open between requests.
+
+    Idle connections are closed after the server's ``keep_alive_timeout`` so
+    they do not pin a worker thread forever.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; without this the body
+    # waits on the client's delayed ACK on every keep-alive request
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        self.timeout = self.server.keep_alive_timeout
+        super().setup()
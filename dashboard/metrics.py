@@ -0,0 +1,157 @@
+"""Request metrics, served at /metrics in the Prometheus text format.
+
+Every request is counted by route, method and status, timed into a
+latency histogram per route, and its bytes on the wire are added up. A
+route is an API path (/api/search), a static file's path
+(/data/clients.json) or one of the server's own paths. Requests for
+paths that do not exist all count as ``unmatched``, so a scan of
+random URLs cannot grow the label set without bound. Compressed
+responses also record their identity size, which gives the compression
+ratio per route. The response cache's hit rate, the requests in flight
+and the open event streams are read when /metrics is scraped.
+"""
+
+import threading
+from collections import defaultdict
+
+METRICS_PATH = '/metrics'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Route label of requests that matched no file or API route
+UNMATCHED = 'unmatched'
+
+# Upper bounds in seconds of the latency histogram buckets
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def labels(**values):
+    return '{' + ','.join(f'{name}="{escape_label(value)}"' for name, value in values.items()) + '}'
+
+
+def format_number(value):
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+class Metrics:
+    """Counters and histograms of the requests a server has answered."""
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self.in_flight = 0
+        self._requests = defaultdict(int)
+        # route -> [count per bucket (the last one +Inf), sum of seconds]
+        self._durations = defaultdict(lambda: [[0] * (len(buckets) + 1), 0.0])
+        self._bytes = defaultdict(int)
+        # route -> [identity bytes, bytes sent] of compressed responses
+        self._compression = defaultdict(lambda: [0, 0])
+        self._lock = threading.Lock()
+
+    def started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def finished(self, route, method, status, seconds, sent, identity_bytes=None,
+                 encoded_bytes=None):
+        """Record a request that ``started``; the sizes are given for compressed bodies."""
+        bucket = next((n for n, bound in enumerate(self.buckets) if seconds <= bound),
+                      len(self.buckets))
+        with self._lock:
+            self.in_flight -= 1
+            self._requests[route, method, status] += 1
+            durations = self._durations[route]
+            durations[0][bucket] += 1
+            durations[1] += seconds
+            self._bytes[route] += sent
+            if identity_bytes and encoded_bytes:
+                compression = self._compression[route]
+                compression[0] += identity_bytes
+                compression[1] += encoded_bytes
+
+    def render(self, server):
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for suffix, sample_labels, value in samples:
+                lines.append(f'{name}{suffix}{sample_labels} {format_number(value)}')
+
+        with self._lock:
+            metric('dashboard_http_requests_total', 'counter',
+                   'Requests answered, by route, method and status.',
+                   [('', labels(route=route, method=method, status=status), count)
+                    for (route, method, status), count in sorted(self._requests.items())])
+
+            samples = []
+            for route, (counts, total) in sorted(self._durations.items()):
+                cumulative = 0
+                for bound, count in zip((*self.buckets, '+Inf'), counts):
+                    cumulative += count
+                    samples.append(('_bucket', labels(route=route, le=bound), cumulative))
+                samples.append(('_sum', labels(route=route), total))
+                samples.append(('_count', labels(route=route), cumulative))
+            metric('dashboard_http_request_duration_seconds', 'histogram',
+                   'Time from reading the request line to sending the last byte.', samples)
+
+            metric('dashboard_http_response_bytes_total', 'counter',
+                   'Bytes sent, headers included, by route.',
+                   [('', labels(route=route), sent) for route, sent in sorted(self._bytes.items())])
+
+            compression = sorted(self._compression.items())
+            metric('dashboard_http_compressed_identity_bytes_total', 'counter',
+                   'Uncompressed size of the compressed response bodies sent, by route.',
+                   [('', labels(route=route), identity) for route, (identity, _) in compression])
+            metric('dashboard_http_compressed_bytes_total', 'counter',
+                   'Size as sent of the compressed response bodies, by route.',
+                   [('', labels(route=route), encoded) for route, (_, encoded) in compression])
+            metric('dashboard_http_compression_ratio', 'gauge',
+                   'Compressed over uncompressed size of the compressed bodies sent, by route.',
+                   [('', labels(route=route), encoded / identity)
+                    for route, (identity, encoded) in compression])
+
+            metric('dashboard_http_requests_in_flight', 'gauge',
+                   'Requests being answered right now.', [('', '', self.in_flight)])
+
+        metric('dashboard_event_stream_clients', 'gauge',
+               'Open /api/events streams.', [('', '', len(server.events))])
+
+        cache = server.response_cache
+        if cache is not None:
+            stats = cache.stats()
+            lookups = stats['hits'] + stats['misses']
+            metric('dashboard_response_cache_hits_total', 'counter',
+                   'Static responses served from the in-memory cache.', [('', '', stats['hits'])])
+            metric('dashboard_response_cache_misses_total', 'counter',
+                   'Static responses the in-memory cache had to load.', [('', '', stats['misses'])])
+            metric('dashboard_response_cache_hit_ratio', 'gauge',
+                   'Hits over lookups of the in-memory response cache.',
+                   [('', '', stats['hits'] / lookups if lookups else 0.0)])
+            metric('dashboard_response_cache_evictions_total', 'counter',
+                   'Entries evicted to stay under the cache size.', [('', '', stats['evictions'])])
+            metric('dashboard_response_cache_bytes', 'gauge',
+                   'Bytes of bodies in the in-memory cache.', [('', '', stats['bytes'])])
+
+        return '\n'.join(lines) + '\n'
+
+
+class CountingWriter:
+    """A handler's ``wfile`` that counts the bytes written through it."""
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+        self.sent = 0
+
+    def write(self, data):
+        written = self.wfile.write(data)
+        self.sent += len(data)
+        return written
+
+    def __getattr__(self, name):
+        return getattr(self.wfile, name)
@@ -0,0 +1,218 @@
+"""Indexed queries over every opportunity the dashboard knows about.
+
+The pipeline in data/opportunities.json and the regional scanner files in
+data/regional-opportunities/ are loaded once into a single record list with
+hash indexes on the filterable fields and a value-sorted index for range
+queries. The index is rebuilt only when one of those files changes.
+"""
+
+import bisect
+import os
+from collections import defaultdict
+from http import HTTPStatus
+
+from .api import ApiError, param_list, param_number
+
+PIPELINE_FILE = 'data/opportunities.json'
+SCANNER_FILES = 'data/regional-opportunities/*.json'
+SOURCES = (PIPELINE_FILE, SCANNER_FILES)
+
+# 'dataset' is 'pipeline' or 'scanner' depending on which file a record came from
+INDEXED_FIELDS = ('dataset', 'region', 'sector', 'status', 'readiness')
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 1000
+
+# Regional file keys returned alongside scanner results
+SCANNER_META_KEYS = ('lastUpdated', 'lastResearched', 'regions', 'sectorTrends')
+
+
+class OpportunityIndex:
+    """Opportunity records with hash indexes per field and a value index."""
+
+    def __init__(self, records, datasets, scanner_meta):
+        self.records = records
+        self.datasets = datasets
+        self.scanner_meta = scanner_meta
+        self.values = [record_value(r) for r in records]
+
+        self.indexes = {field: defaultdict(list) for field in INDEXED_FIELDS}
+        for position in range(len(records)):
+            for field in INDEXED_FIELDS:
+                value = self.field(position, field)
+                if value is not None:
+                    self.indexes[field][value].append(position)
+
+        self.by_value = sorted(range(len(records)), key=self.values.__getitem__)
+        self.sorted_values = [self.values[p] for p in self.by_value]
+
+    def field(self, position, field):
+        if field == 'dataset':
+            return self.datasets[position]
+        return self.records[position].get(field)
+
+    def match(self, filters, min_value=None, max_value=None):
+        """Positions of records matching every filter, in file order.
+
+        ``filters`` maps an indexed field to the values it may take.
+        """
+        candidates = []
+        for field, wanted in filters.items():
+            index = self.indexes[field]
+            positions = set()
+            for value in wanted:
+                positions.update(index.get(value, ()))
+            candidates.append(positions)
+        if min_value is not None or max_value is not None:
+            lo = 0 if min_value is None else bisect.bisect_left(self.sorted_values, min_value)
+            hi = len(self.sorted_values) if max_value is None else \
+                bisect.bisect_right(self.sorted_values, max_value)
+            candidates.append(set(self.by_value[lo:hi]))
+
+        if not candidates:
+            return list(range(len(self.records)))
+        candidates.sort(key=len)
+        return sorted(candidates[0].intersection(*candidates[1:]))
+
+    def summarize(self, positions, group_by=None, distinct=()):
+        """Count and value totals for ``positions``, optionally per group.
+
+        ``distinct`` fields get a count of the different values they take.
+        """
+        def empty():
+            return [0, 0, {field: set() for field in distinct}]
+
+        def finish(bucket):
+            count, total_value, seen = bucket
+            summary = {'count': count, 'totalValue': total_value}
+            if distinct:
+                summary['distinct'] = {field: len(values) for field, values in seen.items()}
+            return summary
+
+        total = empty()
+        groups = defaultdict(empty)
+        for position in positions:
+            buckets = [total]
+            if group_by:
+                buckets.append(groups[self.field(position, group_by) or 'unknown'])
+            for bucket in buckets:
+                bucket[0] += 1
+                bucket[1] += self.values[position]
+                for field in distinct:
+                    value = self.field(position, field)
+                    if value is not None:
+                        bucket[2][field].add(value)
+
+        summary = finish(total)
+        if group_by:
+            summary['groups'] = {key: finish(bucket) for key, bucket in sorted(groups.items())}
+        return summary
+
+
+def record_value(record):
+    value = record.get('value')
+    return value if isinstance(value, (int, float)) else 0
+
+
+def build_index(store):
+    records = []
+    datasets = []
+    scanner_meta = {}
+
+    pipeline = store.load(PIPELINE_FILE, default={})
+    for record in pipeline.get('opportunities', []):
+        records.append(record)
+        datasets.append('pipeline')
+
+    for relpath in store.expand([SCANNER_FILES]):
+        data = store.load(relpath, default={})
+        name = os.path.splitext(os.path.basename(relpath))[0]
+        scanner_meta[name] = {key: data[key] for key in SCANNER_META_KEYS if key in data}
+        for record in data.get('opportunities', []):
+            records.append(record)
+            datasets.append('scanner')
+
+    return OpportunityIndex(records, datasets, scanner_meta)
+
+
+def get_index(store):
+    return store.derive('opportunities', SOURCES, build_index)
+
+
+def parse_filters(params):
+    filters = {}
+    for field in INDEXED_FIELDS:
+        values = param_list(params, field)
+        if values:
+            filters[field] = values
+    return filters
+
+
+def api_query(server, params):
+    """GET /api/opportunities: filtered, sorted and paginated records.
+
+    Filters: dataset, region, sector, status, readiness (comma-separated
+    values are OR-ed), minValue, maxValue. Paging: offset, limit. sort=value
+    or sort=-value orders by value; fields=a,b trims each record.
+    meta=1 adds the regional scanner metadata (sector trends and so on) for
+    the requested regions.
+    """
+    index = get_index(server.data)
+    filters = parse_filters(params)
+    positions = index.match(
+        filters,
+        param_number(params, 'minValue'),
+        param_number(params, 'maxValue'),
+    )
+
+    sort = (params.get('sort') or [''])[-1]
+    if sort in ('value', '-value'):
+        positions.sort(key=index.values.__getitem__, reverse=sort == '-value')
+    elif sort:
+        raise ApiError(HTTPStatus.BAD_REQUEST, 'sort must be value or -value')
+
+    offset = param_number(params, 'offset', 0, int, minimum=0)
+    limit = param_number(params, 'limit', DEFAULT_LIMIT, int, minimum=0, maximum=MAX_LIMIT)
+    fields = param_list(params, 'fields')
+
+    page = []
+    for position in positions[offset:offset + limit]:
+        record = index.records[position]
+        if fields:
+            record = {key: record[key] for key in fields if key in record}
+        page.append({'dataset': index.datasets[position], **record})
+
+    payload = {
+        'total': len(positions),
+        'offset': offset,
+        'limit': limit,
+        'opportunities': page,
+    }
+    if (params.get('meta') or [''])[-1] in ('1', 'true'):
+        regions = set(filters.get('region', ()))
+        payload['meta'] = {
+            name: meta for name, meta in index.scanner_meta.items()
+            if not regions or regions.intersection(meta.get('regions', ()))
+        }
+    return payload
+
+
+def api_summary(server, params):
+    """GET /api/opportunities/summary: count and value totals, no records.
+
+    Takes the same filters as /api/opportunities, plus groupBy=<field> for
+    per-group totals and distinct=<field,...> for distinct-value counts.
+    """
+    index = get_index(server.data)
+    group_by = (params.get('groupBy') or [None])[-1]
+    distinct = param_list(params, 'distinct')
+    for field in [group_by, *distinct]:
+        if field is not None and field not in INDEXED_FIELDS:
+            raise ApiError(HTTPStatus.BAD_REQUEST,
+                           f"{field} is not one of {', '.join(INDEXED_FIELDS)}")
+    positions = index.match(
+        parse_filters(params),
+        param_number(params, 'minValue'),
+        param_number(params, 'maxValue'),
+    )
+    return index.summarize(positions, group_by, distinct)
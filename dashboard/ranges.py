@@ -0,0 +1,111 @@
+"""HTTP Range request parsing and multipart/byteranges framing."""
+
+import email.utils
+import uuid
+
+# More ranges than this in one request is treated as abuse and ignored
+MAX_RANGES = 32
+
+
+class RangeNotSatisfiable(Exception):
+    """None of the requested ranges overlap the representation."""
+
+
+def parse_range(header, size):
+    """Parse a Range header against a representation of ``size`` bytes.
+
+    Returns a sorted list of non-overlapping ``(start, length)`` pairs, or
+    None when the header should be ignored and the whole representation
+    sent. Raises RangeNotSatisfiable when every range lies past the end.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes' or not spec.strip():
+        return None
+
+    ranges = []
+    specs = spec.split(',')
+    if len(specs) > MAX_RANGES:
+        return None
+    for item in specs:
+        first, dash, last = item.strip().partition('-')
+        if not dash:
+            return None
+        first, last = first.strip(), last.strip()
+        try:
+            if not first:
+                # Suffix range: the final N bytes
+                suffix = int(last)
+                if suffix <= 0:
+                    continue
+                start, end = max(0, size - suffix), size - 1
+            else:
+                start = int(first)
+                end = int(last) if last else size - 1
+                if last and end < start:
+                    return None
+                end = min(end, size - 1)
+        except ValueError:
+            return None
+        if start < 0:
+            return None
+        if start < size:
+            ranges.append((start, end))
+
+    if not ranges:
+        raise RangeNotSatisfiable()
+
+    # Coalesce overlapping and adjacent ranges so nothing is sent twice
+    ranges.sort()
+    merged = [list(ranges[0])]
+    for start, end in ranges[1:]:
+        if start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end - start + 1) for start, end in merged]
+
+
+def if_range_matches(if_range, etag, last_modified):
+    """True when an If-Range validator still identifies the representation.
+
+    ETags are compared strongly; a date must equal Last-Modified exactly.
+    """
+    if if_range is None:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith(('"', 'W/')):
+        return etag is not None and not if_range.startswith('W/') and if_range == etag
+    try:
+        return email.utils.parsedate_to_datetime(if_range) == \
+            email.utils.parsedate_to_datetime(last_modified)
+    except (TypeError, IndexError, OverflowError, ValueError):
+        return False
+
+
+def content_range(start, length, size):
+    return f'bytes {start}-{start + length - 1}/{size}'
+
+
+def multipart_segments(ranges, size, content_type):
+    """Frame ``ranges`` as a multipart/byteranges body.
+
+    Returns ``(boundary, segments)`` where segments alternate literal bytes
+    with ``(offset, length)`` slices of the representation.
+    """
+    boundary = uuid.uuid4().hex
+    segments = []
+    for start, length in ranges:
+        segments.append(
+            f'--{boundary}\r\n'
+            f'Content-Type: {content_type}\r\n'
+            f'Content-Range: {content_range(start, length, size)}\r\n\r\n'.encode('latin-1'))
+        segments.append((start, length))
+        segments.append(b'\r\n')
+    segments.append(f'--{boundary}--\r\n'.encode('latin-1'))
+    return boundary, segments
+
+
+def segments_length(segments):
+    return sum(len(s) if isinstance(s, bytes) else s[1] for s in segments)
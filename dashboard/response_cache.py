@@ -0,0 +1,144 @@
+"""Bounded in-memory cache of static responses.
+
+Each entry holds a file's bytes, its precompressed siblings and the headers
+that go with them, so a hit costs two stat() calls instead of an open, a
+read and a hash. Entries are dropped when the file's size or mtime changes,
+or when its directory changes (a sibling was written), and the least
+recently used entries are evicted to stay under the byte cap.
+"""
+
+import email.utils
+import hashlib
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+from .compression import SERVABLE_ENCODINGS, fresh_variants, is_compressible, negotiate
+
+# Files bigger than this are left to sendfile(), which serves them without
+# copying; one of them should also not be able to flush the whole cache
+MAX_ENTRY_BYTES = 1024 * 1024
+
+Representation = namedtuple(
+    'Representation', 'body content_type encoding etag last_modified mtime size compressible')
+
+
+def content_etag(data):
+    return f'"{hashlib.sha256(data).hexdigest()[:32]}"'
+
+
+def http_date(timestamp):
+    return email.utils.formatdate(timestamp, usegmt=True)
+
+
+class CacheEntry:
+    """A file's cached representations, keyed by content coding (None for identity)."""
+
+    def __init__(self, signature, representations):
+        self.signature = signature
+        self.representations = representations
+        self.size = sum(rep.size for rep in representations.values())
+
+    def select(self, accept_encoding):
+        candidates = [e for e in SERVABLE_ENCODINGS if e.name in self.representations]
+        encoding = negotiate(accept_encoding, candidates) if accept_encoding else None
+        return self.representations[encoding.name if encoding else None]
+
+
+def file_signature(path):
+    """What has to stay the same for a cached entry to remain valid."""
+    st = os.stat(path)
+    directory = os.stat(os.path.dirname(path))
+    return (st.st_ino, st.st_size, st.st_mtime_ns, directory.st_mtime_ns)
+
+
+def read_representation(path, content_type, encoding, compressible):
+    with open(path, 'rb') as f:
+        st = os.fstat(f.fileno())
+        body = f.read()
+    return Representation(body, content_type, encoding, content_etag(body),
+                          http_date(st.st_mtime), st.st_mtime, len(body), compressible)
+
+
+class ResponseCache:
+    """LRU cache of file responses capped at ``max_bytes`` of bodies."""
+
+    def __init__(self, max_bytes, max_entry_bytes=MAX_ENTRY_BYTES):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = min(max_entry_bytes, max_bytes)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path, content_type):
+        """Return the CacheEntry for ``path``, loading it on a miss.
+
+        Returns None for files that are missing or too big to cache.
+        """
+        try:
+            signature = file_signature(path)
+        except OSError:
+            return None
+        if signature[1] > self.max_entry_bytes:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None:
+                if entry.signature == signature:
+                    self._entries.move_to_end(path)
+                    self.hits += 1
+                    return entry
+                self._remove(path)
+                self.invalidations += 1
+            self.misses += 1
+
+        try:
+            entry = self._load(path, signature, content_type)
+        except OSError:
+            return None
+        if entry.size > self.max_entry_bytes:
+            return entry
+
+        with self._lock:
+            if path in self._entries:
+                self._remove(path)
+            self._entries[path] = entry
+            self.bytes += entry.size
+            while self.bytes > self.max_bytes and self._entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return entry
+
+    def _load(self, path, signature, content_type):
+        compressible = is_compressible(path)
+        representations = {None: read_representation(path, content_type, None, compressible)}
+        if compressible:
+            st = os.stat(path)
+            for encoding in fresh_variants(path, st):
+                representations[encoding.name] = read_representation(
+                    path + encoding.suffix, content_type, encoding, compressible)
+        return CacheEntry(signature, representations)
+
+    def _remove(self, path):
+        entry = self._entries.pop(path)
+        self.bytes -= entry.size
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'maxBytes': self.max_bytes,
+                'maxEntryBytes': self.max_entry_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'hitRate': self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,134 @@
+"""Precomputed totals of clients, budgets and opportunities along every dimension.
+
+Every client, budget allocation and opportunity (pipeline and regional
+scanner) is a fact with a dataset, region, sector, discipline and
+status, and counts towards four measures: a record count, opportunity
+value and the 2026 and 10-year budgets. The cube holds the totals of
+every combination of those dimensions (the full lattice of group-bys),
+so a view asking for, say, pipeline value by status or client budget
+by sector reads a handful of precomputed rows.
+
+Each group-by is totalled from the facts rather than from a finer one. A
+client serving several regions counts towards each of them when totals
+are grouped by region, and once when they are not, so no total counts a
+client twice. The cube is built once, encoded and gzipped, and rebuilt
+only when one of its source files changes.
+"""
+
+import itertools
+from collections import defaultdict
+from http import HTTPStatus
+
+from . import opportunities
+from .api import ApiError, param_list, prepare_json
+
+CLIENTS_FILE = 'data/clients.json'
+BUDGETS_FILE = 'data/budgets.json'
+SOURCES = (CLIENTS_FILE, BUDGETS_FILE, *opportunities.SOURCES)
+
+DIMENSIONS = ('dataset', 'region', 'sector', 'discipline', 'status')
+MEASURES = ('count', 'value', 'budget2026', 'budget10Year')
+
+# Value of a dimension a fact does not have (clients have no status)
+UNKNOWN = 'unknown'
+
+
+def group_key(dimensions):
+    """The name of a group-by in the payload: its dimensions joined by commas."""
+    return ','.join(dimensions)
+
+
+def fact(dataset, record, regions):
+    """``(dimension values, measures)`` of one record; ``regions`` may hold several."""
+    values = {
+        'dataset': (dataset,),
+        'region': tuple(regions) or (UNKNOWN,),
+        'sector': (record.get('sector') or UNKNOWN,),
+        'discipline': (record.get('discipline') or UNKNOWN,),
+        'status': (record.get('status') or UNKNOWN,),
+    }
+    measures = (1,) + tuple(
+        record.get(key) if isinstance(record.get(key), (int, float)) else 0
+        for key in MEASURES[1:])
+    return values, measures
+
+
+def facts(store):
+    clients = store.load(CLIENTS_FILE, default={})
+    for client in clients.get('clients', []):
+        yield fact('clients', client, client.get('regions') or ())
+
+    budgets = store.load(BUDGETS_FILE, default={})
+    for allocation in budgets.get('allocations', []):
+        region = allocation.get('region')
+        yield fact('allocations', allocation, [region] if region else ())
+
+    index = opportunities.get_index(store)
+    for record, dataset in zip(index.records, index.datasets):
+        region = record.get('region')
+        yield fact(dataset, record, [region] if region else ())
+
+
+def build_cube(store):
+    """``{dimensions: {key: [count, value, budget2026, budget10Year]}}`` for every group-by."""
+    groupings = [dims for size in range(len(DIMENSIONS) + 1)
+                 for dims in itertools.combinations(DIMENSIONS, size)]
+    cube = {dims: defaultdict(lambda: [0] * len(MEASURES)) for dims in groupings}
+    for values, measures in facts(store):
+        for dims in groupings:
+            cells = cube[dims]
+            # A fact in several regions adds to each once, but only once
+            # to a group-by without region
+            for key in itertools.product(*(values[dim] for dim in dims)):
+                totals = cells[key]
+                for n, measure in enumerate(measures):
+                    totals[n] += measure
+    return cube
+
+
+def build_payload(store):
+    cube = get_cube(store)
+    budgets = store.load(BUDGETS_FILE, default={})
+    return prepare_json({
+        'dimensions': list(DIMENSIONS),
+        'measures': list(MEASURES),
+        'budgetTotals': budgets.get('totals', {}),
+        'groups': {group_key(dims): [[*key, *totals] for key, totals in sorted(cells.items())]
+                   for dims, cells in cube.items()},
+    })
+
+
+def get_cube(store):
+    return store.derive('rollups:cube', SOURCES, build_cube)
+
+
+def get_payload(store):
+    return store.derive('rollups:payload', SOURCES, build_payload)
+
+
+def api_rollups(server, params):
+    """GET /api/rollups: totals of every group-by of clients, budgets and opportunities.
+
+    ``groups`` maps each combination of dimensions (comma-separated, '' for
+    the grand total) to rows of its dimension values followed by the
+    measures. by=<dimension,...> returns one group-by as objects instead,
+    and dimension parameters (dataset=pipeline, status=planning,delivery)
+    keep the rows with those values. Filtered dimensions are grouped by
+    too, so every row is still one precomputed total.
+    """
+    by = param_list(params, 'by')
+    filters = {dim: set(param_list(params, dim)) for dim in DIMENSIONS if param_list(params, dim)}
+    if not by and not filters:
+        return get_payload(server.data)
+
+    for dim in by:
+        if dim not in DIMENSIONS:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"{dim} is not one of {', '.join(DIMENSIONS)}")
+    dims = tuple(dim for dim in DIMENSIONS if dim in by or dim in filters)
+    cells = get_cube(server.data)[dims]
+    rows = []
+    for key, totals in sorted(cells.items()):
+        values = dict(zip(dims, key))
+        if all(values[dim] in wanted for dim, wanted in filters.items()):
+            rows.append({**values, **dict(zip(MEASURES, totals))})
+    return {'by': list(dims), 'rows': rows}
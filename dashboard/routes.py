@@ -0,0 +1,41 @@
+"""URL routing for the JSON API under /api/."""
+
+import urllib.parse
+from http import HTTPStatus
+
+from . import areas, bootstrap, geometry, opportunities, rollups, scoring, search
+from .api import ApiError, send_json
+
+API_PREFIX = '/api/'
+
+ROUTES = {
+    '/api/areas': areas.api_areas,
+    '/api/areas/locate': areas.api_locate,
+    '/api/bootstrap': bootstrap.api_bootstrap,
+    '/api/geometry': geometry.api_geometry,
+    '/api/opportunities': opportunities.api_query,
+    '/api/opportunities/summary': opportunities.api_summary,
+    '/api/rollups': rollups.api_rollups,
+    '/api/scores': scoring.api_scores,
+    '/api/search': search.api_search,
+}
+
+
+def is_api_path(path):
+    return urllib.parse.urlsplit(path).path.startswith(API_PREFIX)
+
+
+def handle(handler):
+    """Answer the API request on ``handler``."""
+    parts = urllib.parse.urlsplit(handler.path)
+    route = ROUTES.get(parts.path.rstrip('/'))
+    if route is None:
+        send_json(handler, {'error': f'No API route {parts.path}'}, HTTPStatus.NOT_FOUND)
+        return
+    params = urllib.parse.parse_qs(parts.query)
+    try:
+        payload = route(handler.server, params)
+    except ApiError as e:
+        send_json(handler, {'error': e.message}, e.status)
+        return
+    send_json(handler, payload)
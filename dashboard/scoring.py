@@ -0,0 +1,390 @@
+"""Bid scores for every opportunity, computed in one pass and kept until the data changes.
+
+The scoring is the model in js/utils/intelligence.js (calculateBidScore),
+with the same company profile, competitors and weights: each opportunity
+is scored on sector, region, value, competition, client relationship and
+timing, and the weighted total places it in a recommendation band. The
+browser keeps its copy for static hosting; with the server running the
+intelligence view asks /api/scores for everything at once.
+
+Scoring runs over a dataset at a time. Each factor depends on one or two
+fields, so it is worked out once per distinct value (a handful of
+sectors and regions, a few dozen clients) rather than once per record.
+The timing score depends on today's date, so results are kept for the
+day as well as until an input file changes.
+"""
+
+import datetime
+import math
+import re
+from http import HTTPStatus
+
+from . import opportunities
+from .api import ApiError, prepare_json
+
+CLIENTS_FILE = 'data/clients.json'
+SOURCES = (CLIENTS_FILE, *opportunities.SOURCES)
+
+# Gleeds' core strengths and capabilities, as in intelligence.js
+COMPANY_PROFILE = {
+    'name': 'Gleeds',
+    'strongSectors': ['rail', 'aviation', 'highways', 'utilities'],
+    'strongRegions': ['london', 'north-west', 'midlands', 'scotland'],
+    'sweetSpotValue': {'min': 5000000, 'max': 500000000},
+    'expertise': {
+        'rail': {'level': 'expert', 'winRate': 0.35},
+        'aviation': {'level': 'expert', 'winRate': 0.30},
+        'highways': {'level': 'strong', 'winRate': 0.28},
+        'utilities': {'level': 'strong', 'winRate': 0.25},
+        'maritime': {'level': 'moderate', 'winRate': 0.20},
+    },
+    'services': ['cost-management', 'project-management', 'programme-management', 'advisory'],
+}
+
+# Known competitors by sector, as in intelligence.js
+COMPETITORS = {
+    'rail': [
+        {'name': 'Turner & Townsend', 'strength': 'strong', 'focus': ['cost', 'pm']},
+        {'name': 'Mace', 'strength': 'strong', 'focus': ['delivery', 'pm']},
+        {'name': 'Arcadis', 'strength': 'strong', 'focus': ['advisory', 'cost']},
+        {'name': 'AECOM', 'strength': 'moderate', 'focus': ['design', 'pm']},
+        {'name': 'Faithful+Gould', 'strength': 'moderate', 'focus': ['cost']},
+    ],
+    'aviation': [
+        {'name': 'Turner & Townsend', 'strength': 'strong', 'focus': ['cost', 'pm']},
+        {'name': 'Mace', 'strength': 'strong', 'focus': ['delivery']},
+        {'name': 'Arcadis', 'strength': 'moderate', 'focus': ['advisory']},
+        {'name': 'Arup', 'strength': 'moderate', 'focus': ['design', 'advisory']},
+    ],
+    'highways': [
+        {'name': 'Turner & Townsend', 'strength': 'strong', 'focus': ['cost', 'pm']},
+        {'name': 'AECOM', 'strength': 'strong', 'focus': ['design', 'pm']},
+        {'name': 'Jacobs', 'strength': 'strong', 'focus': ['design', 'delivery']},
+        {'name': 'WSP', 'strength': 'moderate', 'focus': ['design']},
+        {'name': 'Atkins', 'strength': 'moderate', 'focus': ['design', 'pm']},
+    ],
+    'utilities': [
+        {'name': 'Mott MacDonald', 'strength': 'strong', 'focus': ['design', 'pm']},
+        {'name': 'Jacobs', 'strength': 'strong', 'focus': ['design']},
+        {'name': 'Arcadis', 'strength': 'moderate', 'focus': ['advisory', 'cost']},
+        {'name': 'Stantec', 'strength': 'moderate', 'focus': ['design']},
+    ],
+    'maritime': [
+        {'name': 'Royal HaskoningDHV', 'strength': 'strong', 'focus': ['design']},
+        {'name': 'Arup', 'strength': 'moderate', 'focus': ['design', 'advisory']},
+        {'name': 'Mott MacDonald', 'strength': 'moderate', 'focus': ['design', 'pm']},
+    ],
+}
+
+# Scoring weights, as in intelligence.js
+WEIGHTS = {
+    'sectorFit': 0.25,
+    'regionFit': 0.15,
+    'valueFit': 0.20,
+    'competitionLevel': 0.15,
+    'clientRelationship': 0.15,
+    'timing': 0.10,
+}
+
+# Band name (as the intelligence view's filter calls it) -> lowest rounded
+# total score in it, highest band first
+BANDS = (('strong', 80), ('pursue', 65), ('selective', 50), ('low', -math.inf))
+
+# Summary key of each band, as getPipelineIntelligence names them
+BAND_SUMMARY_KEYS = {'strong': 'strongPursuits', 'pursue': 'pursuits',
+                     'selective': 'selective', 'low': 'lowPriority'}
+
+RECOMMENDATIONS = (
+    (80, {'action': 'pursue', 'level': 'high', 'label': 'Strong Pursuit', 'color': '#10B981',
+          'reasoning': 'Strong fit across multiple factors. Recommend aggressive pursuit '
+                       'with senior engagement.'}),
+    (65, {'action': 'pursue', 'level': 'medium', 'label': 'Pursue', 'color': '#F59E0B',
+          'reasoning': 'Good potential. Consider pursuing with targeted approach addressing '
+                       'weaker areas.'}),
+    (50, {'action': 'selective', 'level': 'low', 'label': 'Selective', 'color': '#6B7280',
+          'reasoning': 'Mixed signals. Only pursue if strategic value outweighs resource '
+                       'investment.'}),
+    (-math.inf, {'action': 'decline', 'level': 'none', 'label': 'Low Priority',
+                 'color': '#EF4444',
+                 'reasoning': 'Poor fit. Consider declining unless specific strategic '
+                              'reasons exist.'}),
+)
+
+DATASETS = ('pipeline', 'scanner')
+
+DAY_SECONDS = 24 * 60 * 60
+
+
+def js_round(value):
+    """Math.round: halves round up, not to even."""
+    return math.floor(value + 0.5)
+
+
+def score_sector_fit(sector):
+    expertise = COMPANY_PROFILE['expertise'].get(sector)
+    if not expertise:
+        return 40
+    return {'expert': 95, 'strong': 80, 'moderate': 60}.get(expertise['level'], 40)
+
+
+def score_region_fit(region):
+    if not region:
+        return 50
+    normalized = re.sub(r'\s+', '-', region.lower())
+    return 90 if normalized in COMPANY_PROFILE['strongRegions'] else 60
+
+
+def score_value_fit(value):
+    if not value:
+        return 50
+    low, high = COMPANY_PROFILE['sweetSpotValue']['min'], COMPANY_PROFILE['sweetSpotValue']['max']
+    if low <= value <= high:
+        return 95
+    if low * 0.5 <= value <= high * 2:
+        return 75
+    if value < low * 0.5 and value > 1000000:
+        return 55
+    if value > high * 2:
+        return 45
+    return 35
+
+
+def strong_competitors(sector):
+    return [c for c in COMPETITORS.get(sector, []) if c['strength'] == 'strong']
+
+
+def score_competition_level(sector, value):
+    strong = len(strong_competitors(sector))
+    value = value or 0
+    multiplier = 0.8 if value > 100000000 else 0.9 if value > 50000000 else 1
+    if strong >= 3:
+        base = 50
+    elif strong >= 2:
+        base = 65
+    elif strong >= 1:
+        base = 75
+    else:
+        base = 90
+    return js_round(base * multiplier)
+
+
+def score_client_relationship(client, existing_clients):
+    if not client:
+        return 50
+    client = client.lower()
+    existing = any(client in name or name in client for name in existing_clients)
+    return 90 if existing else 55
+
+
+def parse_deadline(text):
+    """A date-only ISO string (YYYY, YYYY-MM or YYYY-MM-DD) as UTC midnight, as JS
+    Date parses it, or None."""
+    match = re.fullmatch(r'(\d{4})(?:-(\d{2})(?:-(\d{2}))?)?', text.strip()) if text else None
+    if not match:
+        return None
+    year, month, day = (int(part) if part else 1 for part in match.groups())
+    try:
+        return datetime.datetime(year, month, day, tzinfo=datetime.timezone.utc)
+    except ValueError:
+        return None
+
+
+def score_timing(bid_deadline, now):
+    if not bid_deadline:
+        return 50
+    deadline = parse_deadline(bid_deadline)
+    if deadline is None:
+        # new Date() of anything else is invalid, and every comparison fails
+        return 30
+    days = math.floor((deadline - now).total_seconds() / DAY_SECONDS)
+    if 30 <= days <= 90:
+        return 95
+    if 14 <= days < 30:
+        return 75
+    if 90 < days <= 180:
+        return 80
+    if 0 < days < 14:
+        return 50
+    if days > 180:
+        return 60
+    return 30
+
+
+def win_probability(total, sector):
+    expertise = COMPANY_PROFILE['expertise'].get(sector)
+    rate = expertise['winRate'] if expertise else 0.15
+    if total >= 85:
+        probability = rate * 1.5
+    elif total >= 70:
+        probability = rate * 1.2
+    elif total >= 55:
+        probability = rate
+    else:
+        probability = rate * 0.7
+    return min(js_round(probability * 100), 45)
+
+
+def recommendation(total):
+    return next(rec for threshold, rec in RECOMMENDATIONS if total >= threshold)
+
+
+def competitor_analysis(sector):
+    competitors = COMPETITORS.get(sector, [])
+    strong = strong_competitors(sector)
+    return {
+        'sector': sector,
+        'totalCompetitors': len(competitors),
+        'strongCompetitors': strong,
+        'moderateCompetitors': [c for c in competitors if c['strength'] == 'moderate'],
+        'competitiveIntensity': 'high' if len(strong) >= 3 else 'medium' if len(strong) >= 2
+                                else 'low',
+        'topThreats': strong[:3],
+    }
+
+
+def strategic_insights(scores, record):
+    insights = []
+
+    def add(kind, icon, text):
+        insights.append({'type': kind, 'icon': icon, 'text': text})
+
+    if scores['sectorFit'] >= 80:
+        add('strength', '✓', f"Strong sector expertise in {record.get('sector')}. "
+                             'Leverage track record.')
+    elif scores['sectorFit'] < 60:
+        add('weakness', '!', f"Limited {record.get('sector')} sector experience. "
+                             'Consider teaming arrangement.')
+
+    if scores['regionFit'] >= 80:
+        add('strength', '✓', f"Strong regional presence in {record.get('region')}. "
+                             'Local relationships are an asset.')
+    elif scores['regionFit'] < 70:
+        add('action', '→', 'Consider local partner or highlight transferable regional experience.')
+
+    if scores['valueFit'] >= 80:
+        add('strength', '✓', 'Contract value within ideal range. Right-sized for team capabilities.')
+    elif scores['valueFit'] < 50:
+        large = (record.get('value') or 0) > COMPANY_PROFILE['sweetSpotValue']['max'] * 2
+        add('warning', '!', 'Large contract - expect intense competition. Differentiation critical.'
+            if large else 'Smaller contract - ensure margin viability before pursuing.')
+
+    if scores['competitionLevel'] < 60:
+        add('warning', '!', 'High competition expected. Need strong differentiation strategy.')
+
+    if scores['timing'] < 60:
+        add('action', '→', 'Tight timeline - assess resource availability before committing.'
+            if scores['timing'] < 50 else
+            'Long lead time - use for early engagement and relationship building.')
+
+    if scores['clientRelationship'] >= 80:
+        add('strength', '✓', 'Existing client relationship provides competitive advantage.')
+    else:
+        add('action', '→', 'New client - prioritise early engagement and references.')
+    return insights
+
+
+def memoized(func):
+    """``func`` with a cache, for one scoring pass over a dataset."""
+    cache = {}
+
+    def lookup(*key):
+        if key not in cache:
+            cache[key] = func(*key)
+        return cache[key]
+    return lookup
+
+
+def score_records(records, existing_clients, now):
+    """``calculateBidScore`` of every record, less its competitor analysis, in record order."""
+    existing_clients = [name.lower() for name in existing_clients]
+    sector_fit = memoized(score_sector_fit)
+    region_fit = memoized(score_region_fit)
+    value_fit = memoized(score_value_fit)
+    competition = memoized(score_competition_level)
+    client_fit = memoized(lambda client: score_client_relationship(client, existing_clients))
+    timing = memoized(lambda deadline: score_timing(deadline, now))
+
+    results = []
+    for record in records:
+        sector, value = record.get('sector'), record.get('value')
+        if not isinstance(value, (int, float)):
+            value = None
+        scores = {
+            'sectorFit': sector_fit(sector),
+            'regionFit': region_fit(record.get('region')),
+            'valueFit': value_fit(value),
+            'competitionLevel': competition(sector, value),
+            'clientRelationship': client_fit(record.get('client')),
+            'timing': timing(record.get('bidDeadline')),
+        }
+        total = sum(score * WEIGHTS[key] for key, score in scores.items())
+        results.append({
+            'id': record.get('id'),
+            'totalScore': js_round(total),
+            'scores': scores,
+            'recommendation': recommendation(total),
+            'winProbability': win_probability(total, sector),
+            'strategicInsights': strategic_insights(scores, record),
+        })
+    return results
+
+
+def band(total_score):
+    return next(name for name, lowest in BANDS if total_score >= lowest)
+
+
+def build_scores(store, dataset, now):
+    index = opportunities.get_index(store)
+    records = [record for record, record_dataset in zip(index.records, index.datasets)
+               if record_dataset == dataset]
+    clients = store.load(CLIENTS_FILE, default={}).get('clients', [])
+    scored = sorted(zip(score_records(records, [c['name'] for c in clients if c.get('name')], now),
+                        records),
+                    key=lambda pair: -pair[0]['totalScore'])
+
+    bands = {name: [] for name, _ in BANDS}
+    for result, record in scored:
+        bands[band(result['totalScore'])].append((result, record))
+
+    def total_value(pairs):
+        return sum(opportunities.record_value(record) for _, record in pairs)
+
+    def average_win(pairs):
+        return js_round(sum(r['winProbability'] for r, _ in pairs) / len(pairs)) if pairs else 0
+
+    return prepare_json({
+        'dataset': dataset,
+        'scoredAt': now.isoformat(timespec='seconds'),
+        'summary': {'total': len(scored),
+                    **{BAND_SUMMARY_KEYS[name]: len(pairs) for name, pairs in bands.items()}},
+        'totalValue': {BAND_SUMMARY_KEYS[name]: total_value(pairs)
+                       for name, pairs in bands.items()},
+        'avgWinProbability': {BAND_SUMMARY_KEYS[name]: average_win(bands[name])
+                              for name in ('strong', 'pursue')},
+        'bands': {name: [r['id'] for r, _ in pairs] for name, pairs in bands.items()},
+        'competitorAnalysis': {sector or '': competitor_analysis(sector)
+                               for sector in sorted({r.get('sector') or '' for r in records})},
+        'scores': [result for result, _ in scored],
+    })
+
+
+def get_scores(store, dataset):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return store.derive(f'scores:{dataset}', SOURCES, lambda s: build_scores(s, dataset, now),
+                        version=now.date())
+
+
+def api_scores(server, params):
+    """GET /api/scores?dataset=pipeline|scanner: bid scores of every opportunity.
+
+    ``scores`` holds calculateBidScore's result per opportunity (by id),
+    best first, without the competitor analysis, which is given once per
+    sector in ``competitorAnalysis``. ``bands`` lists the ids in each
+    recommendation band (strong, pursue, selective, low) and ``summary``,
+    ``totalValue`` and ``avgWinProbability`` are getPipelineIntelligence's
+    totals. Scores are recomputed when the data changes and once a day.
+    """
+    dataset = (params.get('dataset') or ['pipeline'])[-1]
+    if dataset not in DATASETS:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"dataset must be one of {', '.join(DATASETS)}")
+    return get_scores(server.data, dataset)
@@ -0,0 +1,297 @@
+"""Full-text search over opportunities, clients and regional sector trends.
+
+Every pipeline and scanner opportunity, every client and every region's
+sector trend is a document with a few text fields. Their words are
+tokenized into an inverted index, from each token to the documents that
+contain it and how strongly, so a query only touches the documents
+holding its terms instead of scanning every record.
+
+Each query word also matches the tokens it is a prefix of, which suits
+searching as you type. The sorted vocabulary is bisected to find them,
+and a prefix match counts for less than the whole word. Matches in a
+title weigh more than matches in a description (``FIELD_BOOSTS``), and
+documents must match every query word. The index is built when the
+server starts and rebuilt only when one of its source files changes.
+"""
+
+import bisect
+import math
+import re
+import time
+import unicodedata
+from collections import defaultdict
+from http import HTTPStatus
+
+from . import opportunities
+from .api import ApiError, param_list, param_number
+
+CLIENTS_FILE = 'data/clients.json'
+SOURCES = (CLIENTS_FILE, *opportunities.SOURCES)
+
+KINDS = ('opportunity', 'client', 'trend')
+
+# How much a match in each field counts towards a document's score
+FIELD_BOOSTS = {
+    'title': 3.0,
+    'programmes': 2.0,
+    'insights': 1.5,
+    'description': 1.0,
+    'details': 0.5,
+}
+
+# A token that only starts with the query word counts this much of a whole-word match
+PREFIX_WEIGHT = 0.5
+
+# BM25 term-frequency saturation: repeating a word stops adding much after a few times
+K1 = 1.2
+
+# Bit of each field in the masks recording which fields matched a token
+FIELD_BITS = {field: 1 << n for n, field in enumerate(FIELD_BOOSTS)}
+
+# Query words shorter than this only match whole words, not every token they start
+MIN_PREFIX = 2
+
+FACETS = ('region', 'sector')
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 200
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    """Lowercase words of ``text``, with accents stripped (Ynys Môn -> ynys, mon)."""
+    text = unicodedata.normalize('NFKD', text.lower())
+    return TOKEN_PATTERN.findall(text.encode('ascii', 'ignore').decode('ascii'))
+
+
+def flatten(value):
+    """Every string inside ``value``, however deeply nested in lists and dicts."""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from flatten(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from flatten(item)
+
+
+def join(*values):
+    return ' '.join(text for value in values for text in flatten(value))
+
+
+def opportunity_document(record, dataset):
+    return {
+        'kind': 'opportunity',
+        'dataset': dataset,
+        'id': record.get('id'),
+        'title': record.get('title'),
+        'regions': [record['region']] if record.get('region') else [],
+        'sector': record.get('sector'),
+        'value': opportunities.record_value(record),
+        'fields': {
+            'title': join(record.get('title')),
+            'description': join(record.get('description')),
+            'insights': join(record.get('aiInsights'), record.get('keyDrivers'),
+                             record.get('serviceRelevance')),
+            'details': join(record.get('sector'), record.get('region'),
+                            record.get('client'), record.get('framework'),
+                            record.get('currentConsultants'), record.get('location'),
+                            record.get('fundingStatus')),
+        },
+    }
+
+
+def client_document(client):
+    return {
+        'kind': 'client',
+        'id': client.get('id'),
+        'title': client.get('name'),
+        'regions': list(client.get('regions') or ()),
+        'sector': client.get('sector'),
+        'value': client.get('budget10Year') or 0,
+        'fields': {
+            'title': join(client.get('name')),
+            'programmes': join([p.get('name') for p in client.get('programmes', [])],
+                               client.get('keyProjects')),
+            'description': join(client.get('notes')),
+            'details': join(client.get('sector'), client.get('subSector'),
+                            client.get('regions'), client.get('source')),
+        },
+    }
+
+
+def trend_document(name, regions, sector, trend):
+    return {
+        'kind': 'trend',
+        'id': f'{name}:{sector}',
+        'title': f'{sector} outlook',
+        'regions': list(regions),
+        'sector': sector,
+        'value': 0,
+        'fields': {
+            'description': join(trend.get('outlook')),
+            'insights': join({key: value for key, value in trend.items() if key != 'outlook'}),
+        },
+    }
+
+
+class SearchIndex:
+    """Documents and an inverted index from each token to ``{document: weight}``.
+
+    A document's weight for a token is its boost-weighted term frequency
+    across fields, saturated as in BM25, times the token's inverse document
+    frequency. ``fields`` holds the same documents' masks of the fields the
+    token is in; ``vocabulary`` is every token in sorted order, for prefix
+    lookups.
+    """
+
+    def __init__(self, documents):
+        self.documents = documents
+        postings = defaultdict(lambda: defaultdict(float))
+        fields = defaultdict(lambda: defaultdict(int))
+        for position, document in enumerate(documents):
+            for field, text in document.pop('fields').items():
+                boost, bit = FIELD_BOOSTS[field], FIELD_BITS[field]
+                for token in tokenize(text):
+                    postings[token][position] += boost
+                    fields[token][position] |= bit
+        self.fields = {token: dict(masks) for token, masks in fields.items()}
+
+        self.postings = {}
+        for token, weights in postings.items():
+            idf = math.log(1 + len(documents) / len(weights))
+            self.postings[token] = {position: idf * tf * (K1 + 1) / (tf + K1)
+                                    for position, tf in weights.items()}
+        self.vocabulary = sorted(self.postings)
+
+    def __len__(self):
+        return len(self.documents)
+
+    def expand(self, word):
+        """``(token, weight)`` of every token starting with ``word``."""
+        if len(word) < MIN_PREFIX:
+            if word in self.postings:
+                yield word, 1.0
+            return
+        start = bisect.bisect_left(self.vocabulary, word)
+        for token in self.vocabulary[start:]:
+            if not token.startswith(word):
+                break
+            yield token, 1.0 if token == word else PREFIX_WEIGHT
+
+    def match(self, words):
+        """``{position: score}`` of the documents matching every word, and field masks matched."""
+        scores = None
+        matched = defaultdict(int)
+        for word in words:
+            # A document's best match for the word, so a prefix matching
+            # several tokens does not count several times
+            best = {}
+            for token, weight in self.expand(word):
+                for position, score in self.postings[token].items():
+                    if scores is None or position in scores:
+                        score *= weight
+                        if score > best.get(position, 0):
+                            best[position] = score
+                        matched[position] |= self.fields[token][position]
+            if scores is None:
+                scores = best
+            else:
+                scores = {position: scores[position] + score for position, score in best.items()}
+            if not scores:
+                break
+        return scores or {}, matched
+
+
+def build_index(store):
+    documents = []
+    index = opportunities.get_index(store)
+    for record, dataset in zip(index.records, index.datasets):
+        documents.append(opportunity_document(record, dataset))
+
+    clients = store.load(CLIENTS_FILE, default={})
+    for client in clients.get('clients', []):
+        documents.append(client_document(client))
+
+    for name, meta in sorted(index.scanner_meta.items()):
+        for sector, trend in (meta.get('sectorTrends') or {}).items():
+            documents.append(trend_document(name, meta.get('regions', ()), sector, trend))
+
+    return SearchIndex(documents)
+
+
+def get_index(store):
+    return store.derive('search', SOURCES, build_index)
+
+
+def facet_counts(index, positions, facet):
+    counts = defaultdict(int)
+    for position in positions:
+        document = index.documents[position]
+        values = document['regions'] if facet == 'region' else [document['sector']]
+        for value in values:
+            counts[value or 'unknown'] += 1
+    return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+
+
+def keep(document, filters, skip=None):
+    """True if ``document`` passes every filter but the ``skip`` facet's."""
+    for field, wanted in filters.items():
+        if field == skip:
+            continue
+        if field == 'region':
+            if not wanted.intersection(document['regions']):
+                return False
+        elif document.get(field) not in wanted:
+            return False
+    return True
+
+
+def api_search(server, params):
+    """GET /api/search?q=<words>: ranked opportunities, clients and sector trends.
+
+    Every word must match, as a whole word or the start of one. Filters
+    (comma-separated values are OR-ed): kind (opportunity, client, trend),
+    dataset (pipeline, scanner), region, sector. Paging: offset, limit.
+    ``facets`` counts the matches per region and sector, each ignoring its
+    own filter so the other choices stay visible; ``tookMs`` is how long
+    the query took on the server.
+    """
+    started = time.perf_counter()
+    words = tokenize(' '.join(params.get('q', ())))
+    if not words:
+        raise ApiError(HTTPStatus.BAD_REQUEST, 'q must contain at least one word')
+    filters = {field: set(param_list(params, field))
+               for field in ('kind', 'dataset', *FACETS) if param_list(params, field)}
+    for kind in filters.get('kind', ()):
+        if kind not in KINDS:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"kind must be one of {', '.join(KINDS)}")
+    offset = param_number(params, 'offset', 0, int, minimum=0)
+    limit = param_number(params, 'limit', DEFAULT_LIMIT, int, minimum=0, maximum=MAX_LIMIT)
+
+    index = get_index(server.data)
+    scores, matched = index.match(words)
+    documents = index.documents
+    positions = [p for p in scores if keep(documents[p], filters)]
+    positions.sort(key=lambda p: (-scores[p], p))
+    facets = {facet: facet_counts(index, [p for p in scores if keep(documents[p], filters, facet)],
+                                  facet)
+              for facet in FACETS}
+
+    hits = []
+    for position in positions[offset:offset + limit]:
+        hits.append({**documents[position],
+                     'score': round(scores[position], 3),
+                     'matched': [field for field, bit in FIELD_BITS.items()
+                                 if matched[position] & bit]})
+    return {
+        'query': words,
+        'total': len(positions),
+        'offset': offset,
+        'limit': limit,
+        'hits': hits,
+        'facets': facets,
+        'tookMs': round((time.perf_counter() - started) * 1000, 3),
+    }
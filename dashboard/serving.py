@@ -0,0 +1,99 @@
+"""Server classes used by server.py."""
+
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import HTTPServer
+
+from .caching import ETagCache
+from .datasets import DataStore
+from .events import EventStream
+from .metrics import Metrics
+from .response_cache import ResponseCache
+
+
+class DashboardServer(HTTPServer):
+    """Single-threaded server holding the state shared by every request.
+
+    ``root`` is the directory served; its data files are parsed on demand
+    into ``self.data`` for the API. ``self.events`` holds the open
+    Server-Sent Events streams, whose sockets outlive their requests, and
+    ``self.metrics`` counts and times every request.
+    """
+
+    quiet = False
+    # Requests taking at least this many milliseconds are logged (None: never)
+    slow_request_ms = None
+    no_cache = False
+    use_sendfile = True
+    keep_alive_timeout = None
+
+    def __init__(self, server_address, handler_class, root, cache_bytes=0):
+        super().__init__(server_address, handler_class)
+        self.data = DataStore(root)
+        self.etags = ETagCache()
+        self.response_cache = ResponseCache(cache_bytes) if cache_bytes > 0 else None
+        self.events = EventStream()
+        self.metrics = Metrics()
+        self._detached = set()
+
+    def detach(self, request):
+        """Keep ``request``'s socket open after its handler returns; the caller now owns it."""
+        self._detached.add(request)
+
+    def shutdown_request(self, request):
+        if request in self._detached:
+            self._detached.discard(request)
+            return
+        super().shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.events.close()
+
+
+class ThreadPoolHTTPServer(DashboardServer):
+    """Dashboard server that hands each connection to a bounded pool of worker threads.
+
+    The accept loop waits while every worker is busy, so a burst of clients
+    queues in the listen backlog instead of spawning an unbounded number of
+    threads.
+    """
+
+    request_queue_size = 128
+
+    def __init__(self, server_address, handler_class, root, workers=16, keep_alive_timeout=5.0,
+                 cache_bytes=0):
+        super().__init__(server_address, handler_class, root, cache_bytes=cache_bytes)
+        self.workers = workers
+        self.keep_alive_timeout = keep_alive_timeout
+        self._slots = threading.BoundedSemaphore(workers)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='http-worker')
+
+    def process_request(self, request, client_address):
+        self._slots.acquire()
+        try:
+            self._pool.submit(self._process_request_worker, request, client_address)
+        except RuntimeError:
+            # Pool already shut down
+            self._slots.release()
+            self.shutdown_request(request)
+
+    def _process_request_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def handle_error(self, request, client_address):
+        # Clients going away mid-response is routine, not worth a traceback
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=True)
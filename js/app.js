@@ -10,6 +10,7 @@ import { renderHeader } from './components/header.js';
 import { renderNav } from './components/navigation.js';
 import { renderFilters } from './components/filters.js';
 import { renderFooter } from './components/footer.js';
+import { watchDataChanges } from './utils/live-updates.js';
 
 // Import views
 import { renderRegionsView } from './views/regions.js';
@@ -57,6 +58,13 @@ class App {
       // Listen for filter changes
       this.state.subscribe('filters', () => this.refreshCurrentView());
 
+      // Pick up edits to the data files without a reload; notices are
+      // applied one at a time, in order
+      let applying = Promise.resolve();
+      watchDataChanges(notice => {
+        applying = applying.then(() => this.applyDataChanges(notice));
+      });
+
       console.log('Dashboard initialized successfully');
     } catch (error) {
       console.error('Failed to initialize dashboard:', error);
@@ -149,6 +157,21 @@ class App {
     });
   }
 
+  async applyDataChanges(notice) {
+    try {
+      const reloaded = await this.dataLoader.reloadChanged(notice);
+      if (reloaded.length) {
+        this.state.set('data', this.dataLoader.getData());
+        this.state.set('lastUpdated', this.dataLoader.getLastUpdated());
+      }
+      // Views fetch the scanner files and API results they show as they
+      // render, so re-rendering picks up those changes too
+      await this.refreshCurrentView();
+    } catch (error) {
+      console.error('Failed to apply data changes:', error);
+    }
+  }
+
   async refreshCurrentView() {
     const route = this.router.getCurrentRoute();
     const params = this.router.getCurrentParams();
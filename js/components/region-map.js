@@ -5,18 +5,54 @@
  */
 
 import { formatCurrency } from '../utils/formatters.js';
+import { loadMapGeometry } from '../utils/map-geometry.js';
+import { topologyToGeoJson } from '../utils/topojson.js';
+
+// Longer side of the rendered SVG, before it is scaled to its container
+const RENDER_SIZE = 1200;
 
 // Cache for regional GeoJSON data
 const regionGeoJsonCache = {};
 
 /**
- * Load GeoJSON data for a specific region
+ * Load the region's quantized TopoJSON (about half the bytes of the
+ * GeoJSON) and convert it to GeoJSON
+ */
+async function loadRegionTopoJson(regionId) {
+    try {
+        const response = await fetch(`data/regions/${regionId}.topojson`);
+        if (!response.ok) return null;
+        return topologyToGeoJson(await response.json());
+    } catch (error) {
+        console.warn(`Failed to load region TopoJSON for ${regionId}, trying GeoJSON:`, error);
+        return null;
+    }
+}
+
+/**
+ * Load GeoJSON data for a specific region: the level of detail the
+ * rendered size needs when the server offers one, otherwise the
+ * full-detail static files
  */
 async function loadRegionGeoJson(regionId) {
     if (regionGeoJsonCache[regionId]) {
         return regionGeoJsonCache[regionId];
     }
 
+    // The longer side is drawn RENDER_SIZE pixels long; asking for that
+    // on both sides errs towards the finer level
+    const level = await loadMapGeometry(regionId, RENDER_SIZE, RENDER_SIZE);
+    if (level) {
+        regionGeoJsonCache[regionId] = level;
+        return level;
+    }
+
+    const topoData = await loadRegionTopoJson(regionId);
+    if (topoData) {
+        regionGeoJsonCache[regionId] = topoData;
+        return topoData;
+    }
+
     try {
         const response = await fetch(`data/regions/${regionId}.geojson`);
         if (!response.ok) {
@@ -218,7 +254,7 @@ export async function renderRegionSubdivisionMap(container, options = {}) {
     const bounds = calculateBounds(geoJson.features);
 
     // Use large fixed dimensions for rendering - map will scale to fit container
-    const baseSize = 1200;
+    const baseSize = RENDER_SIZE;
     const [minLon, minLat, maxLon, maxLat] = bounds;
     const aspectRatio = (maxLon - minLon) / (maxLat - minLat);
 
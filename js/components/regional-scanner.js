@@ -39,6 +39,9 @@ export async function loadRegionalOpportunities(regionId) {
   const dataFile = regionMapping[regionId];
   if (!dataFile) return null;
 
+  const fromApi = await loadRegionalOpportunitiesFromApi(regionId, dataFile);
+  if (fromApi) return fromApi;
+
   try {
     const response = await fetch(`data/regional-opportunities/${dataFile}.json`);
     if (!response.ok) return null;
@@ -58,6 +61,26 @@ export async function loadRegionalOpportunities(regionId) {
   }
 }
 
+/**
+ * Fetch just one region's scanner projects from the server's opportunity API.
+ * Returns null where the API is not available (static hosting) so the caller
+ * can fall back to the regional data file.
+ */
+async function loadRegionalOpportunitiesFromApi(regionId, dataFile) {
+  try {
+    const params = new URLSearchParams({ dataset: 'scanner', region: regionId, limit: '1000', meta: '1' });
+    const response = await fetch(`api/opportunities?${params}`);
+    if (!response.ok) return null;
+    const result = await response.json();
+    return {
+      ...(result.meta?.[dataFile] || {}),
+      opportunities: result.opportunities
+    };
+  } catch (err) {
+    return null;
+  }
+}
+
 export function renderRegionalScanner(container, regionData, options = {}) {
   const { regionId, sectors = [], legacyOpportunities = [], clients = [] } = options;
 
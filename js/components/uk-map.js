@@ -4,20 +4,29 @@
  */
 
 import { formatCurrency } from '../utils/formatters.js';
+import { loadMapGeometry } from '../utils/map-geometry.js';
 
-// Cache for GeoJSON data
-let geoJsonCache = null;
+// Cache for GeoJSON data, per rendered size
+const geoJsonCache = {};
 
 /**
- * Load GeoJSON data for UK regions
+ * Load GeoJSON data for UK regions, at the level of detail the
+ * rendered size needs when the server offers one
  */
-async function loadGeoJson() {
-    if (geoJsonCache) return geoJsonCache;
+async function loadGeoJson(width, height) {
+    const key = `${width}x${height}`;
+    if (geoJsonCache[key]) return geoJsonCache[key];
+
+    const level = await loadMapGeometry('uk', width, height);
+    if (level) {
+        geoJsonCache[key] = level;
+        return level;
+    }
 
     try {
-        const response = await fetch('data/uk-regions.geojson?v=2');
-        geoJsonCache = await response.json();
-        return geoJsonCache;
+        const response = await fetch('data/uk-regions.geojson?v=3');
+        geoJsonCache[key] = await response.json();
+        return geoJsonCache[key];
     } catch (error) {
         console.error('Failed to load UK regions GeoJSON:', error);
         return null;
@@ -179,7 +188,7 @@ export async function renderUKMap(container, options = {}) {
     `;
 
     // Load GeoJSON
-    const geoJson = await loadGeoJson();
+    const geoJson = await loadGeoJson(width, height);
     if (!geoJson) {
         container.innerHTML = '<p class="text-muted">Failed to load map data</p>';
         return;
@@ -3,6 +3,25 @@
  * Fetches and caches JSON data files
  */
 
+import { loadRollups, reloadRollups, rollupRows } from './utils/rollups.js';
+
+// Dataset -> data file, as bundled by /api/bootstrap
+const DATA_FILES = {
+  config: 'data/config.json',
+  regions: 'data/regions.json',
+  sectors: 'data/sectors.json',
+  disciplines: 'data/disciplines.json',
+  clients: 'data/clients.json',
+  opportunities: 'data/opportunities.json',
+  budgets: 'data/budgets.json',
+  projects: 'data/projects.json'
+};
+
+// Datasets that may be missing, and what to use instead
+const OPTIONAL_DATASETS = {
+  projects: { projects: [] }
+};
+
 export class DataLoader {
   constructor() {
     this.data = {
@@ -17,45 +36,21 @@ export class DataLoader {
       cheatsheets: {}
     };
 
+    // Precomputed totals from /api/rollups; null on static hosting
+    this.rollups = null;
+
     this.lastUpdated = null;
     this.loaded = false;
   }
 
   async loadAll() {
     try {
-      // Load all data files in parallel
-      const [
-        config,
-        regions,
-        sectors,
-        disciplines,
-        clients,
-        opportunities,
-        budgets,
-        projects
-      ] = await Promise.all([
-        this.loadJSON('data/config.json'),
-        this.loadJSON('data/regions.json'),
-        this.loadJSON('data/sectors.json'),
-        this.loadJSON('data/disciplines.json'),
-        this.loadJSON('data/clients.json'),
-        this.loadJSON('data/opportunities.json'),
-        this.loadJSON('data/budgets.json'),
-        this.loadJSON('data/projects.json').catch(() => ({ projects: [] })) // Optional
-      ]);
-
-      // Store data
-      this.data.config = config;
-      this.data.regions = regions.regions || [];
-      this.data.sectors = sectors.sectors || [];
-      this.data.disciplines = disciplines.disciplines || [];
-      this.data.clients = clients.clients || [];
-      this.data.opportunities = opportunities.opportunities || [];
-      this.data.budgets = budgets.allocations || [];
-      this.data.projects = projects.projects || [];
-
-      // Get last updated from config or most recent file
-      this.lastUpdated = config.lastUpdated || new Date().toISOString().split('T')[0];
+      // One bundled request when served by server.py; static hosting has
+      // no API, so fall back to fetching each file in parallel
+      const [bootstrap, rollups] = await Promise.all([this.loadBootstrap(), loadRollups()]);
+      const datasets = bootstrap || await this.loadDataFiles();
+      this.rollups = rollups;
+      Object.entries(datasets).forEach(([name, json]) => this.setDataset(name, json));
 
       // Load cheat sheets (optional, load on demand)
       this.data.cheatsheets = {};
@@ -68,6 +63,78 @@ export class DataLoader {
     }
   }
 
+  setDataset(name, json) {
+    switch (name) {
+      case 'config':
+        this.data.config = json;
+        // Get last updated from config or most recent file
+        this.lastUpdated = json.lastUpdated || new Date().toISOString().split('T')[0];
+        break;
+      case 'budgets':
+        this.data.budgets = json.allocations || [];
+        break;
+      default:
+        this.data[name] = json[name] || [];
+    }
+  }
+
+  /**
+   * Apply a change notice from the server (see watchDataChanges):
+   * refetch only the datasets whose files changed, and the rollups if
+   * the server rebuilt them. Returns the names of the datasets reloaded
+   */
+  async reloadChanged({ files = [], removed = [], rebuilt = [] }) {
+    const names = Object.keys(DATA_FILES).filter(name =>
+      files.includes(DATA_FILES[name]) || removed.includes(DATA_FILES[name])
+    );
+    const [datasets, rollups] = await Promise.all([
+      Promise.all(names.map(name =>
+        this.loadJSON(DATA_FILES[name]).catch(error => {
+          if (name in OPTIONAL_DATASETS) return OPTIONAL_DATASETS[name];
+          throw error;
+        })
+      )),
+      rebuilt.includes('rollups:payload') ? reloadRollups() : this.rollups
+    ]);
+    names.forEach((name, i) => this.setDataset(name, datasets[i]));
+    this.rollups = rollups;
+    return names;
+  }
+
+  async loadBootstrap() {
+    try {
+      const response = await fetch('api/bootstrap');
+      if (!response.ok) return null;
+      const bundle = await response.json();
+      return bundle.datasets;
+    } catch (error) {
+      return null;
+    }
+  }
+
+  async loadDataFiles() {
+    const [
+      config,
+      regions,
+      sectors,
+      disciplines,
+      clients,
+      opportunities,
+      budgets,
+      projects
+    ] = await Promise.all([
+      this.loadJSON(DATA_FILES.config),
+      this.loadJSON(DATA_FILES.regions),
+      this.loadJSON(DATA_FILES.sectors),
+      this.loadJSON(DATA_FILES.disciplines),
+      this.loadJSON(DATA_FILES.clients),
+      this.loadJSON(DATA_FILES.opportunities),
+      this.loadJSON(DATA_FILES.budgets),
+      this.loadJSON(DATA_FILES.projects).catch(() => OPTIONAL_DATASETS.projects) // Optional
+    ]);
+    return { config, regions, sectors, disciplines, clients, opportunities, budgets, projects };
+  }
+
   async loadJSON(path) {
     try {
       const response = await fetch(path);
@@ -107,6 +174,10 @@ export class DataLoader {
   // Calculate totals
   getTotalBudget(timeframe = '2026') {
     const key = timeframe === '10year' ? 'budget10Year' : 'budget2026';
+    if (this.rollups) {
+      const [clients] = rollupRows(this.rollups, [], { dataset: 'clients' });
+      return clients ? clients[key] : 0;
+    }
     return this.data.clients.reduce((sum, client) => sum + (client[key] || 0), 0);
   }
 
@@ -1,6 +1,10 @@
 /**
  * Bid Intelligence Utility
  * Provides scoring, recommendations, and competitive analysis for opportunities
+ *
+ * The profile, competitors, weights and bands are mirrored in
+ * dashboard/scoring.py, which scores whole datasets for /api/scores;
+ * keep the two in step
  */
 
 // Gleeds' core strengths and capabilities (configurable)
@@ -420,20 +424,21 @@ export function getAllCompetitors() {
     .sort((a, b) => b.sectors.length - a.sectors.length);
 }
 
-/**
- * Get pipeline intelligence summary
- */
-export function getPipelineIntelligence(opportunities, context = {}) {
-  const scored = scoreAllOpportunities(opportunities, context);
+// Score bands, highest first: [name, lowest score]
+const BANDS = [['strong', 80], ['pursue', 65], ['selective', 50], ['low', -Infinity]];
+
+function bandOf(totalScore) {
+  return BANDS.find(([, lowest]) => totalScore >= lowest)[0];
+}
 
-  const strongPursuits = scored.filter(o => o.intelligence.totalScore >= 80);
-  const pursuits = scored.filter(o => o.intelligence.totalScore >= 65 && o.intelligence.totalScore < 80);
-  const selective = scored.filter(o => o.intelligence.totalScore >= 50 && o.intelligence.totalScore < 65);
-  const lowPriority = scored.filter(o => o.intelligence.totalScore < 50);
+function summariseBands(scored, total) {
+  const bands = Object.fromEntries(BANDS.map(([name]) => [name, []]));
+  scored.forEach(o => bands[bandOf(o.intelligence.totalScore)].push(o));
+  const { strong: strongPursuits, pursue: pursuits, selective, low: lowPriority } = bands;
 
   return {
     summary: {
-      total: opportunities.length,
+      total,
       strongPursuits: strongPursuits.length,
       pursuits: pursuits.length,
       selective: selective.length,
@@ -449,7 +454,47 @@ export function getPipelineIntelligence(opportunities, context = {}) {
       strongPursuits: strongPursuits.length ? Math.round(strongPursuits.reduce((sum, o) => sum + o.intelligence.winProbability, 0) / strongPursuits.length) : 0,
       pursuits: pursuits.length ? Math.round(pursuits.reduce((sum, o) => sum + o.intelligence.winProbability, 0) / pursuits.length) : 0
     },
+    bands,
     topOpportunities: strongPursuits.slice(0, 5),
     opportunities: scored
   };
 }
+
+/**
+ * Get pipeline intelligence summary
+ * bands maps each band (strong, pursue, selective, low) to its opportunities
+ */
+export function getPipelineIntelligence(opportunities, context = {}) {
+  return summariseBands(scoreAllOpportunities(opportunities, context), opportunities.length);
+}
+
+/**
+ * Pipeline intelligence scored by the server (/api/scores), which scores
+ * the whole dataset once and caches it until the data changes
+ * Falls back to scoring in the browser when there is no API (static
+ * hosting); opportunities the server has not scored are scored here too
+ */
+export async function loadPipelineIntelligence(opportunities, context = {}) {
+  let scores = null;
+  try {
+    const response = await fetch('api/scores?dataset=pipeline');
+    scores = response.ok ? await response.json() : null;
+  } catch (e) {
+    scores = null;
+  }
+  if (!scores) {
+    return getPipelineIntelligence(opportunities, context);
+  }
+
+  const byId = new Map(scores.scores.map(score => [score.id, score]));
+  const scored = opportunities
+    .map(opp => {
+      const score = byId.get(opp.id);
+      const intelligence = score ?
+        { ...score, competitorAnalysis: scores.competitorAnalysis[opp.sector ?? ''] } :
+        calculateBidScore(opp, context);
+      return { ...opp, intelligence };
+    })
+    .sort((a, b) => b.intelligence.totalScore - a.intelligence.totalScore);
+  return summariseBands(scored, opportunities.length);
+}
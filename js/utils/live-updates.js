@@ -0,0 +1,26 @@
+/**
+ * Live Updates
+ * Listens to /api/events, where the server announces edits to the data
+ * files as it picks them up, so the dashboard can refetch just what
+ * changed instead of needing a full reload
+ */
+
+/**
+ * Call onChange with each change notice: { files, removed, rebuilt },
+ * the data files changed and removed and the server-side indexes rebuilt
+ * Returns the EventSource, or null where there is none. On static
+ * hosting the request fails and the browser gives up without retrying
+ */
+export function watchDataChanges(onChange) {
+  if (typeof EventSource === 'undefined') return null;
+
+  const source = new EventSource('api/events');
+  source.addEventListener('change', event => {
+    try {
+      onChange(JSON.parse(event.data));
+    } catch (error) {
+      console.error('Bad change notice:', error);
+    }
+  });
+  return source;
+}
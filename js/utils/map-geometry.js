@@ -0,0 +1,27 @@
+/**
+ * Map Geometry Loader
+ * Asks the server for the coarsest level of detail of a map that still
+ * looks exact at the size it will be drawn
+ */
+
+import { topologyToGeoJson } from './topojson.js';
+
+/**
+ * Load a map ('uk' or a region id) from /api/geometry as GeoJSON
+ * Returns null when there is no API (static hosting) or no such map,
+ * so callers can fall back to the full-detail static files
+ * @param {string} mapId - Map to load
+ * @param {number} width - Pixel width the map's bounds are drawn at
+ * @param {number} height - Pixel height the map's bounds are drawn at
+ */
+export async function loadMapGeometry(mapId, width, height) {
+  try {
+    const params = new URLSearchParams({ map: mapId, width, height });
+    const response = await fetch(`api/geometry?${params}`);
+    if (!response.ok) return null;
+    const level = await response.json();
+    return level.format === 'topojson' ? topologyToGeoJson(level.data) : level.data;
+  } catch (error) {
+    return null;
+  }
+}
@@ -0,0 +1,51 @@
+/**
+ * Rollups
+ * Reads the totals /api/rollups precomputes for every combination of
+ * dataset, region, sector, discipline and status, so views do not sum
+ * clients and opportunities on every render
+ */
+
+let rollupsPromise = null;
+
+/**
+ * Load the rollup cube once per page
+ * Returns null when there is no API (static hosting), so callers can
+ * fall back to totalling the raw data themselves
+ */
+export function loadRollups() {
+  if (!rollupsPromise) {
+    rollupsPromise = fetch('api/rollups')
+      .then(response => (response.ok ? response.json() : null))
+      .catch(() => null);
+  }
+  return rollupsPromise;
+}
+
+/**
+ * Forget the loaded cube, for when the server reports it rebuilt
+ */
+export function reloadRollups() {
+  rollupsPromise = null;
+  return loadRollups();
+}
+
+/**
+ * Totals grouped by some dimensions, as objects with the dimension values
+ * and the measures (count, value, budget2026, budget10Year)
+ * @param {Object} rollups - Cube from loadRollups
+ * @param {string[]} by - Dimensions to group by, in any order
+ * @param {Object} filters - Dimension -> the one value to keep, e.g. { dataset: 'clients' }
+ */
+export function rollupRows(rollups, by, filters = {}) {
+  const wanted = new Set([...by, ...Object.keys(filters)]);
+  const dims = rollups.dimensions.filter(dim => wanted.has(dim));
+  const rows = rollups.groups[dims.join(',')] || [];
+  return rows
+    .map(row => {
+      const result = {};
+      dims.forEach((dim, i) => { result[dim] = row[i]; });
+      rollups.measures.forEach((measure, i) => { result[measure] = row[dims.length + i]; });
+      return result;
+    })
+    .filter(row => Object.entries(filters).every(([dim, value]) => row[dim] === value));
+}
@@ -0,0 +1,25 @@
+/**
+ * Search
+ * Full-text search through /api/search, which keeps an inverted index of
+ * opportunities, clients and sector trends on the server
+ */
+
+/**
+ * Ids of the documents matching a query, best first
+ * Returns null when there is no API (static hosting), so callers can
+ * fall back to matching the text themselves
+ * @param {string} query - Words to search for; each may be the start of a word
+ * @param {Object} filters - kind, dataset, region, sector, e.g. { kind: 'opportunity' }
+ * @param {number} limit - Most ids to return
+ */
+export async function searchIds(query, filters = {}, limit = 200) {
+  const params = new URLSearchParams({ q: query, limit: String(limit), ...filters });
+  try {
+    const response = await fetch(`api/search?${params}`);
+    if (!response.ok) return null;
+    const result = await response.json();
+    return result.hits.map(hit => hit.id);
+  } catch (e) {
+    return null;
+  }
+}
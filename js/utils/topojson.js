@@ -0,0 +1,76 @@
+/**
+ * TopoJSON Utilities
+ * Converts the quantized, delta-encoded TopoJSON written by the geo tools
+ * into GeoJSON features the map components can render
+ */
+
+/**
+ * Decode every arc of a topology to absolute [lon, lat] positions
+ * @param {Object} topology - TopoJSON Topology object
+ */
+function decodeArcs(topology) {
+  if (!topology.transform) return topology.arcs;
+
+  const [sx, sy] = topology.transform.scale;
+  const [tx, ty] = topology.transform.translate;
+  return topology.arcs.map(arc => {
+    let x = 0;
+    let y = 0;
+    return arc.map(([dx, dy]) => {
+      x += dx;
+      y += dy;
+      return [x * sx + tx, y * sy + ty];
+    });
+  });
+}
+
+/**
+ * Join arcs into a ring; negative indices are reversed arcs (~index)
+ */
+function decodeRing(indices, arcs) {
+  const points = [];
+  indices.forEach((index, i) => {
+    const arc = index < 0 ? arcs[~index].slice().reverse() : arcs[index];
+    // Consecutive arcs share their junction point
+    for (let k = i > 0 ? 1 : 0; k < arc.length; k++) {
+      points.push(arc[k]);
+    }
+  });
+  return points;
+}
+
+function decodeGeometry(geometry, arcs) {
+  if (geometry.type === 'Polygon') {
+    return {
+      type: 'Polygon',
+      coordinates: geometry.arcs.map(ring => decodeRing(ring, arcs))
+    };
+  }
+  if (geometry.type === 'MultiPolygon') {
+    return {
+      type: 'MultiPolygon',
+      coordinates: geometry.arcs.map(polygon => polygon.map(ring => decodeRing(ring, arcs)))
+    };
+  }
+  return null;
+}
+
+/**
+ * Convert one object of a topology to a GeoJSON FeatureCollection
+ * @param {Object} topology - TopoJSON Topology object
+ * @param {string} objectName - Object to convert (defaults to the first one)
+ */
+export function topologyToGeoJson(topology, objectName = null) {
+  const name = objectName || Object.keys(topology.objects)[0];
+  const arcs = decodeArcs(topology);
+
+  const features = topology.objects[name].geometries
+    .map(geometry => ({
+      type: 'Feature',
+      properties: geometry.properties || {},
+      geometry: decodeGeometry(geometry, arcs)
+    }))
+    .filter(feature => feature.geometry);
+
+  return { type: 'FeatureCollection', features };
+}
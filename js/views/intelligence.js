@@ -7,14 +7,14 @@ import { formatCurrency } from '../utils/formatters.js';
 import {
   calculateBidScore,
   scoreAllOpportunities,
-  getPipelineIntelligence,
+  loadPipelineIntelligence,
   getSectorStrengths,
   getAllCompetitors
 } from '../utils/intelligence.js';
 import { openExplorer } from '../components/opportunity-explorer.js';
 import { getInfoButtonHTML, setupInfoPopup, buildSourcesFromClients } from '../components/data-info.js';
 
-export function renderIntelligenceView(container, { data, allData, filters }) {
+export async function renderIntelligenceView(container, { data, allData, filters }) {
   const opportunities = allData.opportunities || [];
   const clients = allData.clients || [];
 
@@ -22,7 +22,7 @@ export function renderIntelligenceView(container, { data, allData, filters }) {
   const existingClients = clients.map(c => c.name);
 
   // Get intelligence analysis
-  const intelligence = getPipelineIntelligence(opportunities, { existingClients });
+  const intelligence = await loadPipelineIntelligence(opportunities, { existingClients });
   const sectorStrengths = getSectorStrengths();
   const competitors = getAllCompetitors();
 
@@ -334,28 +334,7 @@ function setupIntelligenceListeners(container, intelligence) {
   if (filterSelect && tableContainer) {
     filterSelect.addEventListener('change', () => {
       const filter = filterSelect.value;
-      let filtered = intelligence.opportunities;
-
-      switch (filter) {
-        case 'strong':
-          filtered = intelligence.opportunities.filter(o => o.intelligence.totalScore >= 80);
-          break;
-        case 'pursue':
-          filtered = intelligence.opportunities.filter(o =>
-            o.intelligence.totalScore >= 65 && o.intelligence.totalScore < 80
-          );
-          break;
-        case 'selective':
-          filtered = intelligence.opportunities.filter(o =>
-            o.intelligence.totalScore >= 50 && o.intelligence.totalScore < 65
-          );
-          break;
-        case 'low':
-          filtered = intelligence.opportunities.filter(o => o.intelligence.totalScore < 50);
-          break;
-        default:
-          filtered = intelligence.opportunities;
-      }
+      const filtered = intelligence.bands[filter] || intelligence.opportunities;
 
       tableContainer.innerHTML = renderIntelligenceTable(filtered);
       // Re-attach explore button listeners after re-render
@@ -7,6 +7,7 @@ import { formatCurrency, formatDate, getSectorColor } from '../utils/formatters.
 import { renderAnalysisToolbar, setupAnalysisToolbar, applyFilters, sortData } from '../components/analysis-toolbar.js';
 import { exportToCSV, exportToExcel, getOpportunityColumns } from '../utils/export.js';
 import { openExplorer } from '../components/opportunity-explorer.js';
+import { searchIds } from '../utils/search.js';
 import { getInfoButtonHTML, setupInfoPopup, buildSourcesFromClients } from '../components/data-info.js';
 
 // Status definitions with colors and order
@@ -927,6 +928,9 @@ function setupEventListeners(container, opportunities, allData) {
   };
   let currentSort = { column: 'bidDeadline', direction: 'asc' };
   let filteredData = [...opportunities];
+  // Ids /api/search matched for the search text, or null to match it locally
+  let searchMatches = null;
+  let searchRequest = 0;
 
   // Function to apply all filters and update the table
   function updateTableWithFilters() {
@@ -934,7 +938,12 @@ function setupEventListeners(container, opportunities, allData) {
     let filtered = [...opportunities];
 
     // Apply analysis toolbar filters (search, value range, date range)
-    filtered = applyFilters(filtered, currentFilters);
+    if (searchMatches) {
+      filtered = filtered.filter(o => searchMatches.has(o.id));
+      filtered = applyFilters(filtered, { ...currentFilters, search: '' });
+    } else {
+      filtered = applyFilters(filtered, currentFilters);
+    }
 
     // Apply status filter
     if (currentFilters.status !== 'all') {
@@ -997,8 +1006,15 @@ function setupEventListeners(container, opportunities, allData) {
   // Setup analysis toolbar
   const toolbarController = setupAnalysisToolbar(container, {
     id: 'opp-toolbar',
-    onFilterChange: (filters) => {
+    onFilterChange: async (filters) => {
       currentFilters = { ...currentFilters, ...filters };
+      const request = ++searchRequest;
+      const ids = currentFilters.search ?
+        await searchIds(currentFilters.search, { kind: 'opportunity', dataset: 'pipeline' }) :
+        null;
+      // A later keystroke has already started its own search
+      if (request !== searchRequest) return;
+      searchMatches = ids && new Set(ids);
       updateTableWithFilters();
     },
     getData: () => filteredData,
@@ -6,6 +6,7 @@
 
 import { formatCurrency } from '../utils/formatters.js';
 import { SOURCE_LINKS } from '../components/data-info.js';
+import { loadRollups, rollupRows } from '../utils/rollups.js';
 
 // Scanner region files mapping
 const SCANNER_REGION_FILES = [
@@ -22,6 +23,57 @@ const SCANNER_REGION_FILES = [
   { file: 'northern-ireland', regions: ['northern-ireland'] }
 ];
 
+/**
+ * Count, total value and number of sectors of scanner projects per region.
+ * Read from the rollups when the server provides them, then from one summary
+ * request to the opportunity API, falling back to fetching every regional
+ * file where there is no API (static hosting).
+ */
+async function loadScannerSummary(rollups) {
+  if (rollups) {
+    const summary = {};
+    rollupRows(rollups, ['region'], { dataset: 'scanner' }).forEach(row => {
+      summary[row.region] = { count: row.count, value: row.value, sectors: 0 };
+    });
+    rollupRows(rollups, ['region', 'sector'], { dataset: 'scanner' }).forEach(row => {
+      summary[row.region].sectors++;
+    });
+    return summary;
+  }
+
+  try {
+    const resp = await fetch('api/opportunities/summary?dataset=scanner&groupBy=region&distinct=sector');
+    if (resp.ok) {
+      const { groups = {} } = await resp.json();
+      const summary = {};
+      for (const [regionId, group] of Object.entries(groups)) {
+        summary[regionId] = { count: group.count, value: group.totalValue, sectors: group.distinct.sector };
+      }
+      return summary;
+    }
+  } catch (e) { /* fall back to the static files */ }
+
+  const summary = {};
+  await Promise.all(SCANNER_REGION_FILES.map(async ({ file, regions: regionIds }) => {
+    try {
+      const resp = await fetch(`data/regional-opportunities/${file}.json`);
+      if (!resp.ok) return;
+      const data = await resp.json();
+      const opps = data.opportunities || [];
+      // Split by region
+      for (const regionId of regionIds) {
+        const regionOpps = opps.filter(o => o.region === regionId);
+        summary[regionId] = {
+          count: regionOpps.length,
+          value: regionOpps.reduce((sum, o) => sum + (o.value || 0), 0),
+          sectors: new Set(regionOpps.map(o => o.sector).filter(Boolean)).size
+        };
+      }
+    } catch (e) { /* skip missing files */ }
+  }));
+  return summary;
+}
+
 export async function renderSourcesView(container, { data, allData }) {
   const clients = allData.clients || [];
   const opportunities = allData.opportunities || [];
@@ -47,45 +99,45 @@ export async function renderSourcesView(container, { data, allData }) {
     });
   });
 
-  const sectorOrder = Object.keys(sourcesBySector).sort((a, b) => {
-    const totalA = sourcesBySector[a].reduce((sum, c) => sum + c.budget10Year, 0);
-    const totalB = sourcesBySector[b].reduce((sum, c) => sum + c.budget10Year, 0);
-    return totalB - totalA;
-  });
+  // Totals precomputed by the server, or summed here once each
+  const rollups = await loadRollups();
+  const sectorTotals = {};
+  if (rollups) {
+    rollupRows(rollups, ['sector'], { dataset: 'clients' }).forEach(row => {
+      sectorTotals[row.sector === 'unknown' ? 'other' : row.sector] = row.budget10Year;
+    });
+  } else {
+    Object.entries(sourcesBySector).forEach(([sector, sectorClients]) => {
+      sectorTotals[sector] = sectorClients.reduce((sum, c) => sum + c.budget10Year, 0);
+    });
+  }
+  const sectorOrder = Object.keys(sourcesBySector)
+    .sort((a, b) => (sectorTotals[b] || 0) - (sectorTotals[a] || 0));
 
   // Use canonical source links from data-info component
   const sourceLinks = SOURCE_LINKS;
 
-  // Load all scanner data
-  const scannerByRegion = {};
-  let totalScannerOpps = 0;
-  let totalScannerValue = 0;
-
-  await Promise.all(SCANNER_REGION_FILES.map(async ({ file, regions: regionIds }) => {
-    try {
-      const resp = await fetch(`data/regional-opportunities/${file}.json`);
-      if (!resp.ok) return;
-      const data = await resp.json();
-      const opps = data.opportunities || [];
-      // Split by region
-      for (const regionId of regionIds) {
-        const regionOpps = opps.filter(o => o.region === regionId);
-        scannerByRegion[regionId] = regionOpps;
-        totalScannerOpps += regionOpps.length;
-        totalScannerValue += regionOpps.reduce((sum, o) => sum + (o.value || 0), 0);
-      }
-    } catch (e) { /* skip missing files */ }
-  }));
+  // Scanner totals per region
+  const scannerByRegion = await loadScannerSummary(rollups);
+  const scannerRegions = Object.values(scannerByRegion);
+  const totalScannerOpps = scannerRegions.reduce((sum, r) => sum + r.count, 0);
+  const totalScannerValue = scannerRegions.reduce((sum, r) => sum + r.value, 0);
 
   // Pipeline stats
-  const pipelineValue = opportunities.reduce((sum, o) => sum + (o.value || 0), 0);
   const pipelineByStatus = {};
-  opportunities.forEach(o => {
-    const status = o.status || 'unknown';
-    if (!pipelineByStatus[status]) pipelineByStatus[status] = { count: 0, value: 0 };
-    pipelineByStatus[status].count++;
-    pipelineByStatus[status].value += o.value || 0;
-  });
+  if (rollups) {
+    rollupRows(rollups, ['status'], { dataset: 'pipeline' }).forEach(row => {
+      pipelineByStatus[row.status] = { count: row.count, value: row.value };
+    });
+  } else {
+    opportunities.forEach(o => {
+      const status = o.status || 'unknown';
+      if (!pipelineByStatus[status]) pipelineByStatus[status] = { count: 0, value: 0 };
+      pipelineByStatus[status].count++;
+      pipelineByStatus[status].value += o.value || 0;
+    });
+  }
+  const pipelineValue = Object.values(pipelineByStatus).reduce((sum, s) => sum + s.value, 0);
 
   const statusLabels = {
     'planning': 'Planning',
@@ -103,7 +155,7 @@ export async function renderSourcesView(container, { data, allData }) {
   };
 
   // Totals
-  const totalClientBudget = clients.reduce((sum, c) => sum + (c.budget10Year || 0), 0);
+  const totalClientBudget = Object.values(sectorTotals).reduce((sum, total) => sum + total, 0);
   const totalDataPoints = clients.length + totalScannerOpps + opportunities.length;
   const dataFiles = 3 + Object.keys(scannerByRegion).length; // clients + opps + sectors + scanner files
   const lastUpdated = allData.lastUpdated || '2026-01-17';
@@ -182,19 +234,17 @@ export async function renderSourcesView(container, { data, allData }) {
       <p class="text-muted mb-md">${totalScannerOpps.toLocaleString()} scanned projects worth ${formatCurrency(totalScannerValue)} across ${Object.keys(scannerByRegion).length} regions</p>
       <div class="scanner-region-grid">
         ${Object.entries(scannerByRegion)
-          .sort((a, b) => b[1].reduce((s, o) => s + (o.value || 0), 0) - a[1].reduce((s, o) => s + (o.value || 0), 0))
-          .map(([regionId, opps]) => {
-            const regionValue = opps.reduce((sum, o) => sum + (o.value || 0), 0);
-            const regionSectors = new Set(opps.map(o => o.sector).filter(Boolean));
+          .sort((a, b) => b[1].value - a[1].value)
+          .map(([regionId, summary]) => {
             return `
               <div class="scanner-region-card card">
                 <h4>${regionNames[regionId] || capitalise(regionId)}</h4>
                 <div class="scanner-region-stats">
-                  <span><strong>${opps.length}</strong> projects</span>
-                  <span><strong>${formatCurrency(regionValue)}</strong></span>
+                  <span><strong>${summary.count}</strong> projects</span>
+                  <span><strong>${formatCurrency(summary.value)}</strong></span>
                 </div>
                 <div class="scanner-region-stats" style="margin-top: 4px;">
-                  <span>${regionSectors.size} sectors</span>
+                  <span>${summary.sectors} sectors</span>
                 </div>
               </div>
             `;
@@ -226,7 +276,7 @@ export async function renderSourcesView(container, { data, allData }) {
         ${sectorOrder.map(sectorId => {
           const sectorClients = sourcesBySector[sectorId];
           const sectorName = sectorNames[sectorId] || capitalise(sectorId);
-          const sectorTotal = sectorClients.reduce((sum, c) => sum + c.budget10Year, 0);
+          const sectorTotal = sectorTotals[sectorId] || 0;
 
           const bySource = {};
           sectorClients.forEach(c => {
@@ -1,17 +1,111 @@
 #!/usr/bin/env python3
-"""Simple HTTP server with no caching for development"""
-import http.server
-import socketserver
+"""HTTP server for the dashboard.
 
+Run without arguments for a single-threaded server. Pass ``--production`` to
+serve requests concurrently from a bounded worker pool with HTTP/1.1
+keep-alive. Files are served with ETags so browsers revalidate instead of
+downloading again; ``--no-cache`` restores the old never-cache behaviour for
+development. Edits to data/ are picked up while the server runs and pushed
+to open dashboards over /api/events. Request counts, latencies and sizes
+are served in the Prometheus format at /metrics.
+"""
+import argparse
+import functools
+import os
+import signal
+import time
+
+from dashboard import search
+from dashboard.handler import DashboardHandler, KeepAliveHandler
+from dashboard.serving import DashboardServer, ThreadPoolHTTPServer
+from dashboard.watcher import POLL_INTERVAL, DataWatcher
+
+HOST = ''
 PORT = 3000
+WORKERS = 16
+KEEP_ALIVE_TIMEOUT = 5.0
+CACHE_MB = 64
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default=HOST, help='interface to bind (default: all)')
+    parser.add_argument('--port', type=int, default=PORT, help=f'port to listen on (default: {PORT})')
+    parser.add_argument('--production', action='store_true',
+                        help='serve concurrently from a worker pool with keep-alive')
+    parser.add_argument('--workers', type=int, default=WORKERS,
+                        help=f'worker threads in production mode (default: {WORKERS})')
+    parser.add_argument('--keep-alive', type=float, default=KEEP_ALIVE_TIMEOUT,
+                        help=f'idle keep-alive timeout in seconds (default: {KEEP_ALIVE_TIMEOUT})')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='tell browsers never to cache anything (development)')
+    parser.add_argument('--cache-size', type=float, default=CACHE_MB, metavar='MB',
+                        help=f'in-memory response cache size, 0 to disable (default: {CACHE_MB})')
+    parser.add_argument('--no-sendfile', action='store_true',
+                        help='copy file bodies in user space instead of using sendfile()')
+    parser.add_argument('--watch-interval', type=float, default=POLL_INTERVAL, metavar='SECONDS',
+                        help='seconds between checks of data/ for edits, 0 to not watch '
+                             f'(default: {POLL_INTERVAL})')
+    parser.add_argument('--slow-ms', type=float, default=None, metavar='MS',
+                        help='log requests that take at least this many milliseconds')
+    parser.add_argument('--quiet', action='store_true', help='do not log each request')
+    return parser.parse_args(argv)
+
+
+def create_server(args):
+    cache_bytes = int(args.cache_size * 1024 * 1024)
+    if args.production:
+        handler = functools.partial(KeepAliveHandler, directory=ROOT)
+        server = ThreadPoolHTTPServer((args.host, args.port), handler, ROOT,
+                                      workers=args.workers, keep_alive_timeout=args.keep_alive,
+                                      cache_bytes=cache_bytes)
+    else:
+        handler = functools.partial(DashboardHandler, directory=ROOT)
+        server = DashboardServer((args.host, args.port), handler, ROOT, cache_bytes=cache_bytes)
+    server.no_cache = args.no_cache
+    server.use_sendfile = not args.no_sendfile
+    server.quiet = args.quiet
+    server.slow_request_ms = args.slow_ms
+    return server
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # Let `kill` shut the server down as cleanly as Ctrl-C does
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    with create_server(args) as httpd:
+        mode = f'production, {args.workers} workers' if args.production else 'single-threaded'
+        if args.no_cache:
+            mode += ', no-cache'
+        print(f"Serving at http://{args.host or 'localhost'}:{args.port} ({mode})", flush=True)
+
+        # Build the search index now rather than on the first query
+        started = time.perf_counter()
+        index = search.get_index(httpd.data)
+        if not args.quiet:
+            print(f'Search index: {len(index)} documents, {len(index.vocabulary)} terms '
+                  f'({(time.perf_counter() - started) * 1000:.0f} ms)', flush=True)
+
+        watcher = None
+        if args.watch_interval > 0:
+            watcher = DataWatcher(httpd.data, httpd.events, args.watch_interval, quiet=args.quiet)
+            watcher.start()
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        if watcher is not None:
+            watcher.stop()
+        if httpd.response_cache is not None and not args.quiet:
+            stats = httpd.response_cache.stats()
+            print(f"Response cache: {stats['hits']} hits, {stats['misses']} misses, "
+                  f"{stats['evictions']} evictions, {stats['invalidations']} invalidations, "
+                  f"{stats['bytes'] / 1024:.0f} KB in {stats['entries']} entries")
 
-class NoCacheHandler(http.server.SimpleHTTPRequestHandler):
-    def end_headers(self):
-        self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate, max-age=0')
-        self.send_header('Pragma', 'no-cache')
-        self.send_header('Expires', '0')
-        super().end_headers()
 
-with socketserver.TCPServer(("", PORT), NoCacheHandler) as httpd:
-    print(f"Serving at http://localhost:{PORT}")
-    httpd.serve_forever()
+if __name__ == '__main__':
+    main()
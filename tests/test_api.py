@@ -0,0 +1,29 @@
+"""Tests of the query parameter helpers shared by the API routes."""
+
+import unittest
+from http import HTTPStatus
+
+from dashboard.api import ApiError, param_number
+
+
+class ParamNumberTest(unittest.TestCase):
+
+    def test_parses_and_clamps(self):
+        self.assertEqual(param_number({'minValue': ['2.5']}, 'minValue'), 2.5)
+        self.assertEqual(param_number({'limit': ['500']}, 'limit', cast=int, maximum=200), 200)
+        self.assertEqual(param_number({}, 'limit', 20, int), 20)
+
+    def test_rejects_non_finite(self):
+        for value in ('nan', 'NaN', 'inf', '-inf', 'Infinity'):
+            with self.subTest(value=value):
+                with self.assertRaises(ApiError) as raised:
+                    param_number({'minValue': [value]}, 'minValue')
+                self.assertEqual(raised.exception.status, HTTPStatus.BAD_REQUEST)
+
+    def test_rejects_text(self):
+        with self.assertRaises(ApiError):
+            param_number({'limit': ['ten']}, 'limit', cast=int)
+
+
+if __name__ == '__main__':
+    unittest.main()
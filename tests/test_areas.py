@@ -0,0 +1,30 @@
+"""Tests of the /api/areas parameter parsing."""
+
+import unittest
+from http import HTTPStatus
+
+from dashboard.api import ApiError
+from dashboard.areas import parse_numbers, parse_points
+
+
+class ParseNumbersTest(unittest.TestCase):
+
+    def test_parses_box(self):
+        self.assertEqual(parse_numbers('-3.2,51.4,-3.1,51.5', 'bbox'), [-3.2, 51.4, -3.1, 51.5])
+
+    def test_rejects_non_finite(self):
+        for text in ('nan,nan,nan,nan', '-3,51,inf,52', '-inf,51,-3,52'):
+            with self.subTest(text=text):
+                with self.assertRaises(ApiError) as raised:
+                    parse_numbers(text, 'bbox')
+                self.assertEqual(raised.exception.status, HTTPStatus.BAD_REQUEST)
+
+    def test_rejects_point_with_nan(self):
+        with self.assertRaises(ApiError):
+            parse_points({'point': ['inf,nan']})
+        self.assertEqual(parse_points({'points': ['-3.18,51.48;-0.12,51.5']}),
+                         [[-3.18, 51.48], [-0.12, 51.5]])
+
+
+if __name__ == '__main__':
+    unittest.main()
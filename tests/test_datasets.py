@@ -0,0 +1,54 @@
+"""Tests of DataStore's handling of files that change under it."""
+
+import json
+import os
+import tempfile
+import unittest
+from http import HTTPStatus
+
+from dashboard.api import ApiError
+from dashboard.datasets import DataStore
+
+
+class DataStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        os.mkdir(os.path.join(self.root.name, 'data'))
+        self.store = DataStore(self.root.name)
+
+    def tearDown(self):
+        self.root.cleanup()
+
+    def write(self, relpath, text):
+        with open(self.store.path(relpath), 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def test_reloads_changed_file(self):
+        self.write('data/a.json', json.dumps({'n': 1}))
+        self.assertEqual(self.store.load('data/a.json'), {'n': 1})
+        self.write('data/a.json', json.dumps({'n': 22}))
+        self.assertEqual(self.store.load('data/a.json'), {'n': 22})
+
+    def test_half_written_file_keeps_last_good_contents(self):
+        self.write('data/a.json', json.dumps({'n': 1}))
+        self.assertEqual(self.store.load('data/a.json'), {'n': 1})
+        self.write('data/a.json', '{"n": 1, "more": [')
+        self.assertEqual(self.store.load('data/a.json'), {'n': 1})
+        with self.assertRaises(ValueError):
+            self.store.reload('data/a.json')
+        self.write('data/a.json', json.dumps({'n': 1, 'more': []}))
+        self.assertEqual(self.store.load('data/a.json'), {'n': 1, 'more': []})
+
+    def test_half_written_file_never_loaded_is_unavailable(self):
+        self.write('data/a.json', '{"n": ')
+        with self.assertRaises(ApiError) as raised:
+            self.store.load('data/a.json')
+        self.assertEqual(raised.exception.status, HTTPStatus.SERVICE_UNAVAILABLE)
+
+    def test_missing_file_gives_default(self):
+        self.assertEqual(self.store.load('data/none.json', default={}), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
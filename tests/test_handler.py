@@ -0,0 +1,78 @@
+"""Tests of the server's own paths, answered outside the static files and the API."""
+
+import functools
+import http.client
+import os
+import threading
+import unittest
+
+from dashboard.events import EVENTS_PATH
+from dashboard.handler import CACHE_STATS_PATH, DashboardHandler
+from dashboard.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from dashboard.metrics import METRICS_PATH
+from dashboard.serving import DashboardServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ServerPathTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        handler = functools.partial(DashboardHandler, directory=ROOT)
+        cls.server = DashboardServer(('127.0.0.1', 0), handler, ROOT, cache_bytes=1024 * 1024)
+        cls.server.quiet = True
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.thread.join()
+
+    def request(self, method, path):
+        connection = http.client.HTTPConnection(*self.server.server_address, timeout=5)
+        try:
+            connection.request(method, path)
+            response = connection.getresponse()
+            return response, response.read()
+        finally:
+            connection.close()
+
+    def test_head_metrics(self):
+        get, body = self.request('GET', METRICS_PATH)
+        head, head_body = self.request('HEAD', METRICS_PATH)
+        self.assertEqual(head.status, 200)
+        self.assertEqual(head.getheader('Content-Type'), METRICS_CONTENT_TYPE)
+        self.assertEqual(head_body, b'')
+        self.assertTrue(body.startswith(b'# HELP'))
+
+    def test_head_cache_stats(self):
+        head, head_body = self.request('HEAD', CACHE_STATS_PATH)
+        self.assertEqual(head.status, 200)
+        self.assertEqual(head.getheader('Content-Type'), 'application/json')
+        self.assertEqual(head_body, b'')
+
+    def test_head_events(self):
+        head, head_body = self.request('HEAD', EVENTS_PATH)
+        self.assertEqual(head.status, 200)
+        self.assertEqual(head.getheader('Content-Type'), 'text/event-stream; charset=utf-8')
+        self.assertEqual(head_body, b'')
+        self.assertEqual(len(self.server.events), 0)
+
+    def test_static_routes_are_normalized(self):
+        for path in ('/data/clients.json', '/data/./clients.json', '/js/../data/clients.json',
+                     '/data//clients.json'):
+            response, _ = self.request('GET', path)
+            self.assertEqual(response.status, 200)
+        _, body = self.request('GET', METRICS_PATH)
+        routes = {line.split('route="')[1].split('"')[0] for line in body.decode().splitlines()
+                  if line.startswith('dashboard_http_request_duration_seconds_count')}
+        self.assertIn('/data/clients.json', routes)
+        self.assertFalse([route for route in routes if 'clients' in route
+                          and route != '/data/clients.json'])
+
+
+if __name__ == '__main__':
+    unittest.main()
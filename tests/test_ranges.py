@@ -0,0 +1,157 @@
+"""Tests of Range request parsing, If-Range and multipart/byteranges framing."""
+
+import functools
+import http.client
+import os
+import tempfile
+import threading
+import unittest
+
+from dashboard.handler import DashboardHandler
+from dashboard.ranges import (MAX_RANGES, RangeNotSatisfiable, if_range_matches,
+                              multipart_segments, parse_range, segments_length)
+from dashboard.serving import DashboardServer
+
+LAST_MODIFIED = 'Wed, 21 Oct 2015 07:28:00 GMT'
+
+
+class ParseRangeTest(unittest.TestCase):
+
+    def test_single_ranges(self):
+        self.assertEqual(parse_range('bytes=0-99', 1000), [(0, 100)])
+        self.assertEqual(parse_range('bytes=500-', 1000), [(500, 500)])
+        # A last byte past the end is cut to the end
+        self.assertEqual(parse_range('bytes=900-2000', 1000), [(900, 100)])
+
+    def test_suffix_ranges(self):
+        self.assertEqual(parse_range('bytes=-100', 1000), [(900, 100)])
+        # A suffix longer than the representation is all of it
+        self.assertEqual(parse_range('bytes=-5000', 1000), [(0, 1000)])
+
+    def test_overlapping_and_adjacent_ranges_coalesce(self):
+        self.assertEqual(parse_range('bytes=0-99,50-149', 1000), [(0, 150)])
+        self.assertEqual(parse_range('bytes=0-99,100-199', 1000), [(0, 200)])
+        self.assertEqual(parse_range('bytes=500-599,0-9,-10', 1000),
+                         [(0, 10), (500, 100), (990, 10)])
+        self.assertEqual(parse_range('bytes=0-,100-199', 1000), [(0, 1000)])
+
+    def test_ignored_headers(self):
+        for header in (None, '', 'items=0-9', 'bytes=', 'bytes=abc', 'bytes=9-0', 'bytes=5',
+                       'bytes=' + ','.join(['0-0'] * (MAX_RANGES + 1))):
+            with self.subTest(header=header):
+                self.assertIsNone(parse_range(header, 1000))
+
+    def test_unsatisfiable(self):
+        for header, size in (('bytes=1000-', 1000), ('bytes=2000-3000', 1000),
+                             ('bytes=0-', 0), ('bytes=-10', 0), ('bytes=-0', 1000)):
+            with self.subTest(header=header, size=size):
+                with self.assertRaises(RangeNotSatisfiable):
+                    parse_range(header, size)
+
+    def test_satisfiable_range_among_unsatisfiable(self):
+        self.assertEqual(parse_range('bytes=2000-,0-9', 1000), [(0, 10)])
+
+
+class IfRangeTest(unittest.TestCase):
+
+    def test_no_validator(self):
+        self.assertTrue(if_range_matches(None, '"abc"', LAST_MODIFIED))
+
+    def test_strong_etag(self):
+        self.assertTrue(if_range_matches('"abc"', '"abc"', LAST_MODIFIED))
+        self.assertFalse(if_range_matches('"abd"', '"abc"', LAST_MODIFIED))
+
+    def test_weak_etag_never_matches(self):
+        self.assertFalse(if_range_matches('W/"abc"', '"abc"', LAST_MODIFIED))
+        self.assertFalse(if_range_matches('W/"abc"', 'W/"abc"', LAST_MODIFIED))
+
+    def test_date(self):
+        self.assertTrue(if_range_matches(LAST_MODIFIED, '"abc"', LAST_MODIFIED))
+        self.assertFalse(if_range_matches('Wed, 21 Oct 2015 07:28:01 GMT', '"abc"',
+                                          LAST_MODIFIED))
+        self.assertFalse(if_range_matches('not a date', '"abc"', LAST_MODIFIED))
+
+
+class MultipartTest(unittest.TestCase):
+
+    def test_framing(self):
+        data = bytes(range(256)) * 4
+        boundary, segments = multipart_segments([(0, 10), (500, 20)], len(data), 'text/plain')
+        body = b''.join(s if isinstance(s, bytes) else data[s[0]:s[0] + s[1]] for s in segments)
+        self.assertEqual(segments_length(segments), len(body))
+        parts = body.split(f'--{boundary}'.encode())
+        self.assertEqual(parts[0], b'')
+        self.assertEqual(parts[-1], b'--\r\n')
+        self.assertIn(b'Content-Range: bytes 500-519/1024\r\n\r\n' + data[500:520] + b'\r\n',
+                      parts[2])
+
+
+class RangeRequestTest(unittest.TestCase):
+    """Range requests against a server of a directory holding a small and an empty file."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.root = tempfile.TemporaryDirectory()
+        cls.body = bytes(range(256)) * 8
+        with open(os.path.join(cls.root.name, 'small.bin'), 'wb') as f:
+            f.write(cls.body)
+        open(os.path.join(cls.root.name, 'empty.bin'), 'wb').close()
+        handler = functools.partial(DashboardHandler, directory=cls.root.name)
+        cls.server = DashboardServer(('127.0.0.1', 0), handler, cls.root.name)
+        cls.server.quiet = True
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.thread.join()
+        cls.root.cleanup()
+
+    def request(self, path, **headers):
+        connection = http.client.HTTPConnection(*self.server.server_address, timeout=5)
+        try:
+            connection.request('GET', path, headers=headers)
+            response = connection.getresponse()
+            return response, response.read()
+        finally:
+            connection.close()
+
+    def test_partial_content(self):
+        response, body = self.request('/small.bin', Range='bytes=-16')
+        self.assertEqual(response.status, 206)
+        self.assertEqual(response.getheader('Content-Range'), f'bytes 2032-2047/{len(self.body)}')
+        self.assertEqual(body, self.body[-16:])
+
+    def test_multiple_ranges(self):
+        response, body = self.request('/small.bin', Range='bytes=0-3,100-103')
+        self.assertEqual(response.status, 206)
+        self.assertTrue(response.getheader('Content-Type').startswith('multipart/byteranges'))
+        self.assertEqual(int(response.getheader('Content-Length')), len(body))
+        self.assertIn(self.body[100:104], body)
+
+    def test_not_satisfiable(self):
+        for path, header in (('/small.bin', 'bytes=4096-'), ('/empty.bin', 'bytes=0-')):
+            with self.subTest(path=path):
+                response, body = self.request(path, Range=header)
+                self.assertEqual(response.status, 416)
+                size = len(self.body) if path == '/small.bin' else 0
+                self.assertEqual(response.getheader('Content-Range'), f'bytes */{size}')
+                self.assertEqual(body, b'')
+
+    def test_if_range(self):
+        full, _ = self.request('/small.bin')
+        etag = full.getheader('ETag')
+        response, body = self.request('/small.bin', Range='bytes=0-9', **{'If-Range': etag})
+        self.assertEqual((response.status, body), (206, self.body[:10]))
+        response, body = self.request('/small.bin', Range='bytes=0-9',
+                                      **{'If-Range': '"stale"'})
+        self.assertEqual((response.status, body), (200, self.body))
+        response, _ = self.request('/small.bin', Range='bytes=0-9',
+                                   **{'If-Range': full.getheader('Last-Modified')})
+        self.assertEqual(response.status, 206)
+
+
+if __name__ == '__main__':
+    unittest.main()
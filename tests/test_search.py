@@ -0,0 +1,131 @@
+"""Tests of search tokenization, ranking and the /api/search filters."""
+
+import unittest
+from types import SimpleNamespace
+
+from dashboard.api import ApiError
+from dashboard.search import FIELD_BITS, PREFIX_WEIGHT, SearchIndex, api_search, tokenize
+
+
+def document(doc_id, kind='opportunity', region='wales', sector='Water', **fields):
+    return {'kind': kind, 'dataset': 'pipeline', 'id': doc_id, 'title': doc_id,
+            'regions': [region], 'sector': sector, 'value': 0, 'fields': fields}
+
+
+def build(*documents):
+    return SearchIndex(list(documents))
+
+
+class IndexStore:
+    """Stands in for a DataStore whose search index is already built."""
+
+    def __init__(self, index):
+        self.index = index
+
+    def derive(self, name, sources, build, version=None):
+        return self.index
+
+
+class TokenizeTest(unittest.TestCase):
+
+    def test_words(self):
+        self.assertEqual(tokenize('Flood-risk Scheme (Phase 2)'),
+                         ['flood', 'risk', 'scheme', 'phase', '2'])
+
+    def test_accents_and_case(self):
+        self.assertEqual(tokenize('Ynys Môn CAFÉ'), ['ynys', 'mon', 'cafe'])
+
+    def test_nothing_to_index(self):
+        self.assertEqual(tokenize(' -- / '), [])
+
+
+class RankingTest(unittest.TestCase):
+
+    def ranked(self, index, query):
+        scores, _ = index.match(tokenize(query))
+        return [index.documents[p]['id'] for p in sorted(scores, key=lambda p: -scores[p])]
+
+    def test_title_outranks_description(self):
+        index = build(document('described', title='Bridge', description='reservoir works'),
+                      document('titled', title='Reservoir', description='bridge works'))
+        self.assertEqual(self.ranked(index, 'reservoir'), ['titled', 'described'])
+
+    def test_every_word_must_match(self):
+        index = build(document('both', title='coastal flood defence'),
+                      document('one', title='coastal path'))
+        self.assertEqual(self.ranked(index, 'coastal flood'), ['both'])
+        self.assertEqual(self.ranked(index, 'coastal tunnel'), [])
+
+    def test_prefix_counts_less_than_whole_word(self):
+        index = build(document('prefix', title='hospitals'), document('whole', title='hospital'))
+        self.assertEqual(self.ranked(index, 'hospital'), ['whole', 'prefix'])
+        scores, _ = index.match(['hospital'])
+        self.assertAlmostEqual(scores[0] / scores[1], PREFIX_WEIGHT, places=1)
+
+    def test_short_words_match_whole_words_only(self):
+        index = build(document('a4', title='a4 road'), document('airport', title='airport'))
+        self.assertEqual(self.ranked(index, 'a'), [])
+        self.assertEqual(self.ranked(index, 'a4'), ['a4'])
+
+    def test_prefix_counts_once_per_document(self):
+        index = build(document('many', title='schools schooling scholar'),
+                      document('one', title='school'))
+        self.assertEqual(self.ranked(index, 'school'), ['one', 'many'])
+
+    def test_rare_words_weigh_more(self):
+        index = build(document('rare', title='viaduct works'), document('common1', title='works'),
+                      document('common2', title='works'))
+        scores, _ = index.match(['viaduct'])
+        rare, = scores.values()
+        common = index.match(['works'])[0][0]
+        self.assertGreater(rare, common)
+
+    def test_matched_fields(self):
+        index = build(document('doc', title='rail', details='rail Wales'))
+        _, matched = index.match(['rail'])
+        self.assertEqual(matched[0], FIELD_BITS['title'] | FIELD_BITS['details'])
+
+
+class ApiSearchTest(unittest.TestCase):
+
+    def setUp(self):
+        index = build(
+            document('w1', region='wales', sector='Water', title='water treatment'),
+            document('w2', region='wales', sector='Rail', title='water rail depot'),
+            document('s1', region='scotland', sector='Water', title='water main'),
+            document('c1', kind='client', region='scotland', sector='Water',
+                     title='Water board'),
+        )
+        self.server = SimpleNamespace(data=IndexStore(index))
+
+    def search(self, **params):
+        return api_search(self.server, {key: [value] for key, value in params.items()})
+
+    def test_filters_and_facets(self):
+        result = self.search(q='water', region='wales')
+        self.assertEqual(result['total'], 2)
+        self.assertEqual({hit['id'] for hit in result['hits']}, {'w1', 'w2'})
+        # The region facet ignores the region filter; the others apply
+        self.assertEqual(result['facets']['region'], {'scotland': 2, 'wales': 2})
+        self.assertEqual(result['facets']['sector'], {'Rail': 1, 'Water': 1})
+
+    def test_kind_filter(self):
+        self.assertEqual([hit['id'] for hit in self.search(q='water', kind='client')['hits']],
+                         ['c1'])
+        with self.assertRaises(ApiError):
+            self.search(q='water', kind='project')
+
+    def test_paging(self):
+        everything = [hit['id'] for hit in self.search(q='water')['hits']]
+        self.assertEqual(len(everything), 4)
+        page = self.search(q='water', offset='1', limit='2')
+        self.assertEqual([hit['id'] for hit in page['hits']], everything[1:3])
+        self.assertEqual(page['total'], 4)
+
+    def test_empty_query(self):
+        with self.assertRaises(ApiError):
+            self.search(q=' -- ')
+
+
+if __name__ == '__main__':
+    unittest.main()
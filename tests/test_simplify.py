@@ -0,0 +1,109 @@
+"""Tests of arc simplification: endpoints, shared borders and closed arcs survive."""
+
+import math
+import unittest
+
+from dashboard.geo.simplify import METHODS, point_weights, simplify, simplify_arcs
+from dashboard.geo.topology import decode_arcs, have_numpy
+
+# Tolerance per method that removes the 0.01-high wiggles below but keeps the 1.0 corner
+TOLERANCE = {'dp': 0.05, 'vw': 0.01}
+
+
+def wiggle(x0, y0, x1, y1, steps=20, height=0.01):
+    """A line from (x0, y0) to (x1, y1) with a small zigzag across it."""
+    points = []
+    for n in range(steps + 1):
+        t = n / steps
+        offset = height if 0 < n < steps and n % 2 else 0.0
+        points.append([x0 + (x1 - x0) * t + offset, y0 + (y1 - y0) * t + offset])
+    return points
+
+
+def two_squares():
+    """Two unit squares sharing a wiggly border (arc 0), and a closed island (arc 3)."""
+    return {
+        'type': 'Topology',
+        'arcs': [
+            wiggle(1, 0, 1, 1),
+            [[1, 1], *wiggle(0, 1, 0, 0), [1, 0]],
+            [[1, 0], *wiggle(2, 0, 2, 1), [1, 1]],
+            [*wiggle(5, 5, 6, 5), [6, 6], [5, 6], [5, 5]],
+        ],
+        'objects': {'areas': {'type': 'GeometryCollection', 'geometries': [
+            {'type': 'Polygon', 'arcs': [[0, 1]]},
+            {'type': 'Polygon', 'arcs': [[~0, 2]]},
+            {'type': 'Polygon', 'arcs': [[3]]},
+        ]}},
+    }
+
+
+def backends():
+    return (False, True) if have_numpy() else (False,)
+
+
+class SimplifyTest(unittest.TestCase):
+
+    def simplified(self, method, use_numpy, **kwargs):
+        table = decode_arcs(two_squares(), use_numpy=use_numpy)
+        return table, simplify(table, method, **kwargs)
+
+    def each(self):
+        for method in METHODS:
+            for use_numpy in backends():
+                with self.subTest(method=method, use_numpy=use_numpy):
+                    yield method, use_numpy
+
+    def test_removes_wiggles(self):
+        for method, use_numpy in self.each():
+            table, simple = self.simplified(method, use_numpy, tolerance=TOLERANCE[method])
+            self.assertLess(simple.point_count, table.point_count / 2)
+            # The straight shared border is down to its endpoints
+            self.assertEqual(simple.arc(0), [[1.0, 0.0], [1.0, 1.0]])
+
+    def test_keeps_arc_endpoints(self):
+        for method, use_numpy in self.each():
+            table, simple = self.simplified(method, use_numpy, tolerance=1e9)
+            self.assertEqual(len(simple), len(table))
+            for idx in range(len(table)):
+                self.assertEqual(simple.endpoints(idx), table.endpoints(idx))
+
+    def test_shared_border_identical_on_both_sides(self):
+        for method, use_numpy in self.each():
+            _, simple = self.simplified(method, use_numpy, tolerance=TOLERANCE[method])
+            left = simple.ring([0, 1]).coordinates()
+            right = simple.ring([~0, 2]).coordinates()
+            border = simple.arc(0)
+            self.assertEqual(left[:len(border)], border)
+            self.assertEqual(right[:len(border)], border[::-1])
+
+    def test_closed_arc_keeps_a_triangle(self):
+        for method, use_numpy in self.each():
+            _, simple = self.simplified(method, use_numpy, tolerance=1e9)
+            island = simple.arc(3)
+            self.assertEqual(island[0], island[-1])
+            self.assertGreaterEqual(len(island), 4)
+
+    def test_weights(self):
+        for method, use_numpy in self.each():
+            table = decode_arcs(two_squares(), use_numpy=use_numpy)
+            weights = list(point_weights(table, method))
+            self.assertEqual(len(weights), table.point_count)
+            for start, stop in zip(table.offsets, table.offsets[1:]):
+                self.assertEqual((weights[start], weights[stop - 1]), (math.inf, math.inf))
+
+    def test_vertex_target(self):
+        for method, use_numpy in self.each():
+            table = decode_arcs(two_squares(), use_numpy=use_numpy)
+            weights = point_weights(table, method)
+            simple = simplify_arcs(table, weights, vertices=30)
+            self.assertLessEqual(abs(simple.point_count - 30), 4)
+            self.assertIs(simplify_arcs(table, weights), table)
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            point_weights(decode_arcs(two_squares()), 'bezier')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,813 @@
+#!/usr/bin/env python3
+"""
+Benchmark the geometry code in dashboard.geo and the geo build tools, and
+catch regressions.
+
+Every section but formats runs on each TopoJSON input of the build and on
+a synthetic topology made by tiling one input 10 times (--scale 100 adds a
+100x one), so a change that only hurts at scale shows up before the real
+data grows. Sections:
+
+    decode  decode_arcs with the pure-Python and, when it is installed,
+            the NumPy backend, checking that both produce identical
+            coordinates
+    memory  peak traced memory of decoding every arc and building every
+            ring as an ArcTable, against arcs as lists of [lon, lat] lists
+            (how the geo tools used to hold them)
+    simplify
+            build_levels with Douglas-Peucker and Visvalingam-Whyatt
+            weighting: point weights and every level of detail, and the
+            vertices kept at a few tolerances
+    convert simplify_topology (process-geojson.py): every level's arcs and
+            the geometries drawn from them
+    encode  write_features: every level streamed as compact GeoJSON, each
+            feature formatted straight from the arcs
+    dissolve
+            dissolve and drop_specks of all of an input's areas into one
+            outline, as the overview does for the devolved nations
+    write   writing each input's simplified areas as one compact GeoJSON
+            FeatureCollection with FeatureWriter, against building every
+            feature dict first
+    partition
+            splitting England's LADs into regions with a RegionIndex,
+            against the per-region substring matching it replaced; counts
+            the LADs each puts in no region or in several, and those the
+            index placed by name because data/lad-regions.json lacks them
+    spatial building an AreaIndex of each input's areas, and point-in-area
+            lookups and bounding box queries on it against a scan of
+            every polygon, checking that both give the same answers
+    formats size and parse time of the per-region map files in
+            data/regions, quantized TopoJSON against compact GeoJSON
+            (browser-side decoding is timed with node when it is installed)
+
+Each section prints a table and records, per input, the best wall time of
+--repeats runs, the peak traced memory of one more, the vertices going in
+and coming out and the bytes written, as it measures them. Timings of the
+reference implementations are recorded alongside but never fail a run.
+--output saves the results as JSON. --baseline compares them with an
+earlier file and exits with status 1 when anything got slower, hungrier
+or bigger than the thresholds allow. Identical input files (the overview's
+*-topo.json inputs are copies of some regions-geo/ files) are run once. A
+default run takes a few minutes; the 100x topology adds over ten more.
+
+Example:
+    python tools/bench-geo.py --output before.json
+    python tools/bench-geo.py --baseline before.json --max-slowdown 0.2
+    python tools/bench-geo.py --section memory data/regions-geo/england_lad.json
+    python tools/bench-geo.py --scale 10 --scale 100 --section decode --section simplify
+"""
+
+import argparse
+import contextlib
+import datetime
+import glob
+import gzip
+import hashlib
+import importlib.util
+import io
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchlib import ROOT, best_time, peak_memory
+
+sys.path.insert(0, ROOT)
+
+from dashboard.geo import (  # noqa: E402
+    dissolve, encode, lod, regions, simplify, spatial, topology)
+
+DEFAULT_INPUTS = (
+    os.path.join(ROOT, 'data', 'regions-geo', '*.json'),
+    os.path.join(ROOT, 'data', '*-topo.json'),
+)
+# Input tiled into the synthetic topologies, and how many copies of it
+SYNTHETIC_BASE = os.path.join(ROOT, 'data', 'regions-geo', 'wales_lad.json')
+DEFAULT_SCALES = (10,)
+
+REGION_MAPS = os.path.join(ROOT, 'data', 'regions')
+LAD_REGIONS = os.path.join(ROOT, *regions.LAD_REGIONS_FILE.split('/'))
+
+SECTIONS = ('decode', 'memory', 'simplify', 'convert', 'encode', 'dissolve', 'write',
+            'partition', 'spatial', 'formats')
+
+# Simplification of the convert, encode and dissolve sections, as
+# process-geojson.py builds the overview
+METHOD = 'dp'
+PRECISION = 4
+
+# Times JSON.parse of both files and the TopoJSON-to-GeoJSON conversion
+# region-map.js does; prints one JSON object of best times in ms
+NODE_PARSE_SCRIPT = '''
+import { readFileSync } from 'node:fs';
+import { pathToFileURL } from 'node:url';
+const [utils, topoPath, geoPath, repeats] = process.argv.slice(1);
+const { topologyToGeoJson } = await import(pathToFileURL(utils));
+const best = func => {
+  let min = Infinity;
+  for (let i = 0; i < Number(repeats); i++) {
+    const start = performance.now();
+    func();
+    min = Math.min(min, performance.now() - start);
+  }
+  return min;
+};
+const topoText = readFileSync(topoPath, 'utf8');
+const geoText = readFileSync(geoPath, 'utf8');
+console.log(JSON.stringify({
+  topojson: best(() => topologyToGeoJson(JSON.parse(topoText))),
+  geojson: best(() => JSON.parse(geoText)),
+}));
+'''
+
+# Simplification and GeoJSON precision of the write section, as
+# create-region-geojson.py uses them
+WRITE_TOLERANCE = 0.001
+WRITE_PRECISION = 4
+
+# Queries timed per input by the spatial section, and the side in degrees
+# of its query boxes
+SPATIAL_POINTS = 2000
+SPATIAL_BOXES = 500
+SPATIAL_BOX_SIZE = 0.25
+
+# Tolerances the simplify section reports the vertices kept at, per method
+SIMPLIFY_TOLERANCES = {
+    'dp': (0.0005, 0.001, 0.01),
+    'vw': (1e-7, 2e-6, 1e-4),
+}
+
+# Default regression thresholds, as fractions of the baseline
+MAX_SLOWDOWN = 0.25
+MAX_MEMORY_GROWTH = 0.25
+MAX_OUTPUT_GROWTH = 0.01
+
+# Results faster than this are too noisy to fail on their times
+MIN_TIMED_SECONDS = 0.005
+
+# Result fields compared with the baseline, and the threshold argument for each
+CHECKS = (
+    ('seconds', 'max_slowdown'),
+    ('peak_bytes', 'max_memory_growth'),
+    ('vertices_out', 'max_output_growth'),
+    ('output_bytes', 'max_output_growth'),
+)
+
+
+def load_tool(name):
+    """Import tools/<name>.py, whose name is not a valid module name."""
+    spec = importlib.util.spec_from_file_location(name.replace('-', '_'),
+                                                  os.path.join(ROOT, 'tools', f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+process_geojson = load_tool('process-geojson')
+
+
+def map_arcs(arcs, offset):
+    """Arc references in ``arcs`` (nested lists of ints) moved up by ``offset``."""
+    if isinstance(arcs, int):
+        return arcs + offset if arcs >= 0 else ~(~arcs + offset)
+    return [map_arcs(item, offset) for item in arcs]
+
+
+def arc_extent(topo):
+    """Width and height of every arc's points, in the arcs' own units."""
+    quantized = 'transform' in topo
+    xs, ys = [], []
+    for arc in topo['arcs']:
+        x = y = 0
+        for point in arc:
+            if quantized:
+                x, y = x + point[0], y + point[1]
+            else:
+                x, y = point[0], point[1]
+            xs.append(x)
+            ys.append(y)
+    return max(xs) - min(xs), max(ys) - min(ys)
+
+
+def tile_topology(topo, copies):
+    """``topo`` repeated ``copies`` times on a grid, as one topology.
+
+    Each copy keeps its own arcs and geometries, so the result has
+    ``copies`` times the arcs, points and areas of ``topo`` with the same
+    detail per area.
+    """
+    quantized = 'transform' in topo
+    width, height = arc_extent(topo)
+    columns = math.ceil(math.sqrt(copies))
+    arc_count = len(topo['arcs'])
+    arcs = []
+    objects = {name: {**obj, 'geometries': []} for name, obj in topo['objects'].items()}
+    for copy in range(copies):
+        dx = (copy % columns) * width * 1.1
+        dy = (copy // columns) * height * 1.1
+        if quantized:
+            dx, dy = round(dx), round(dy)
+        for arc in topo['arcs']:
+            if quantized:
+                # Delta-encoded: only the first point is absolute
+                arcs.append([[arc[0][0] + dx, arc[0][1] + dy], *arc[1:]])
+            else:
+                arcs.append([[x + dx, y + dy] for x, y in arc])
+        for name, obj in topo['objects'].items():
+            for geom in obj.get('geometries', []):
+                tiled = dict(geom)
+                if 'arcs' in geom:
+                    tiled['arcs'] = map_arcs(geom['arcs'], copy * arc_count)
+                objects[name]['geometries'].append(tiled)
+    tiled = {key: value for key, value in topo.items() if key != 'bbox'}
+    tiled.update(arcs=arcs, objects=objects)
+    return tiled
+
+
+def load_inputs(patterns, synthetic_base, scales):
+    """``(name, scale, topology, file size)`` of each distinct input, then the tiled ones."""
+    seen = set()
+    paths = sorted(path for pattern in patterns for path in glob.glob(pattern))
+    for path in paths:
+        with open(path, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        if digest in seen:
+            continue
+        seen.add(digest)
+        yield os.path.basename(path), 1, json.loads(data), len(data)
+    if synthetic_base and scales:
+        with open(synthetic_base) as f:
+            base = json.load(f)
+        for scale in scales:
+            yield os.path.basename(synthetic_base), scale, tile_topology(base, scale), None
+
+
+def areas(topo):
+    """Name and geometries of the topology's first object (each input has one)."""
+    name, obj = next(iter(topo['objects'].items()))
+    return name, obj.get('geometries', [])
+
+
+def polygon_geometries(topo):
+    return [geom for obj in topo.get('objects', {}).values()
+            for geom in obj.get('geometries', [])
+            if geom.get('type') in ('Polygon', 'MultiPolygon')]
+
+
+def quiet(func):
+    """``func`` with what it prints thrown away."""
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func()
+    return run
+
+
+def record(results, section, name, scale, variant=None, **values):
+    """Add one result, keyed by section, input, scale and variant, and return it."""
+    result = {'section': section, 'input': name, 'scale': scale}
+    if variant is not None:
+        result['variant'] = variant
+    result.update(values)
+    results.append(result)
+    return result
+
+
+def measure_work(work, measure, repeats):
+    """Best time and peak memory of ``work``, and the stats ``measure`` gives of its output."""
+    # The first timed run's output gives the counts; 100x inputs are slow to redo
+    started = time.perf_counter()
+    output = work()
+    seconds = time.perf_counter() - started
+    if repeats > 1:
+        seconds = min(seconds, best_time(work, repeats - 1))
+    stats = measure(output)
+    del output
+    return {'seconds': round(seconds, 6), 'peak_bytes': peak_memory(work), **stats}
+
+
+def ring_arc_lists(topo):
+    """Arc index lists of every ring of every geometry in ``topo``."""
+    for obj in topo.get('objects', {}).values():
+        for geom in obj.get('geometries', []):
+            if geom.get('type') == 'Polygon':
+                yield from geom.get('arcs', [])
+            elif geom.get('type') == 'MultiPolygon':
+                for polygon in geom.get('arcs', []):
+                    yield from polygon
+
+
+def rings_as_lists(topo):
+    """Reference: arcs as lists of lists, every ring built as a list up front."""
+    (sx, sy), (tx, ty) = topology.get_transform(topo)
+    decoded_arcs = []
+    for arc in topo['arcs']:
+        decoded_arc = []
+        x, y = 0, 0
+        for point in arc:
+            x += point[0]
+            y += point[1]
+            decoded_arc.append([x * sx + tx, y * sy + ty])
+        decoded_arcs.append(decoded_arc)
+
+    rings = []
+    for arc_indices in ring_arc_lists(topo):
+        coords = []
+        for idx in arc_indices:
+            arc = list(reversed(decoded_arcs[~idx])) if idx < 0 else decoded_arcs[idx]
+            coords.extend(arc[1 if coords else 0:])
+        rings.append(coords)
+    return rings
+
+
+def rings_from_table(topo, use_numpy):
+    """Arcs in an ArcTable, rings kept as ranges and built one at a time."""
+    table = topology.decode_arcs(topo, use_numpy=use_numpy)
+    rings = [table.ring(arc_indices) for arc_indices in ring_arc_lists(topo)]
+    for ring in rings:
+        ring.coordinates()
+    return rings
+
+
+def backends():
+    """``(name, use_numpy)`` of every installed decoding backend."""
+    return [('python', False)] + ([('numpy', True)] if topology.have_numpy() else [])
+
+
+def bench_decode(inputs, args, results):
+    names = [name for name, _ in backends()]
+    print(f"{'input':<22} {'scale':>5} {'arcs':>7} {'points':>9} "
+          + ''.join(f" {name + ' ms':>10} {name + ' MB':>10}" for name in names)
+          + (f" {'identical':>9}" if len(names) > 1 else ''))
+    for name, scale, topo, _ in inputs:
+        raw_points = sum(len(arc) for arc in topo['arcs'])
+        row = f'{name:<22} {scale:>5} {len(topo["arcs"]):>7} {raw_points:>9}'
+        tables = []
+        for variant, use_numpy in backends():
+            result = record(results, 'decode', name, scale, variant, **measure_work(
+                lambda: topology.decode_arcs(topo, PRECISION, use_numpy=use_numpy),
+                lambda table: {'vertices_in': raw_points, 'vertices_out': table.point_count},
+                args.repeats))
+            tables.append(topology.decode_arcs(topo, PRECISION, use_numpy=use_numpy))
+            row += f" {result['seconds'] * 1000:>10.1f} {result['peak_bytes'] / 1e6:>10.1f}"
+        if len(tables) > 1:
+            py_table, np_table = tables
+            identical = (np_table.coords.ravel().tolist() == py_table.coords.tolist() and
+                         np_table.offsets == py_table.offsets)
+            row += f' {"yes" if identical else "NO":>9}'
+            if not identical:
+                sys.exit(f'{name} x{scale}: the NumPy and Python backends disagree')
+        print(row, flush=True)
+
+
+def bench_memory(inputs, args, results):
+    names = [name for name, _ in backends()]
+    print(f"{'input':<22} {'scale':>5} {'input MB':>9} {'lists MB':>9}"
+          + ''.join(f" {'table/' + name + ' MB':>16}" for name in names))
+    for name, scale, topo, size in inputs:
+        lists_peak = peak_memory(lambda: rings_as_lists(topo))
+        size_mb = f'{size / 1e6:.1f}' if size is not None else '-'
+        row = f'{name:<22} {scale:>5} {size_mb:>9} {lists_peak / 1e6:>9.1f}'
+        for variant, use_numpy in backends():
+            peak = peak_memory(lambda: rings_from_table(topo, use_numpy))
+            record(results, 'memory', name, scale, variant, peak_bytes=peak,
+                   reference_peak_bytes=lists_peak)
+            row += f' {peak / 1e6:>16.1f}'
+        print(row, flush=True)
+
+
+def bench_simplify(inputs, args, results):
+    print(f"{'input':<22} {'scale':>5} {'method':>6} {'ms':>9} {'peak MB':>8} "
+          f"{'points':>9} {'levels':>22}  vertices kept at tolerance")
+    factors = process_geojson.DEFAULT_LOD_FACTORS
+    for name, scale, topo, _ in inputs:
+        table = topology.decode_arcs(topo, PRECISION)
+        for method, tolerances in SIMPLIFY_TOLERANCES.items():
+            tolerance = process_geojson.DEFAULT_TOLERANCE[method]
+            weights = simplify.point_weights(table, method)
+            kept = {f'{tol:g}': simplify.simplify_arcs(table, weights, tol).point_count
+                    for tol in tolerances}
+            del weights
+            result = record(results, 'simplify', name, scale, method, **measure_work(
+                lambda: lod.build_levels(table, method, tolerance, None, factors),
+                lambda levels: {'vertices_in': table.point_count,
+                                'vertices_out': levels[-1][1].point_count,
+                                'levels': [arcs.point_count for _, arcs in levels]},
+                args.repeats), kept=kept)
+            levels = ' '.join(map(str, result['levels']))
+            print(f"{name:<22} {scale:>5} {method:>6} {result['seconds'] * 1000:>9.1f} "
+                  f"{result['peak_bytes'] / 1e6:>8.1f} {table.point_count:>9} {levels:>22}  "
+                  + '  '.join(f'{tol}: {count}' for tol, count in kept.items()), flush=True)
+
+
+def level_features(arcs, geometries):
+    """``(properties, type, rings)`` of each geometry of a level, as write_features takes them."""
+    for geom in geometries:
+        rings = process_geojson.geometry_rings(geom, arcs)
+        if rings is not None:
+            yield geom.get('properties', {}), geom['type'], rings
+
+
+def level_positions(arcs, geometries):
+    total = 0
+    for _, geometry_type, rings in level_features(arcs, geometries):
+        polygons = [rings] if geometry_type == 'Polygon' else rings
+        total += sum(len(ring) for polygon in polygons for ring in polygon)
+    return total
+
+
+def build_stage(stage, topo):
+    """``(work, measure)`` for a build stage: the function timed, and one computing its output stats."""
+    object_name, geometries = areas(topo)
+    tolerance = process_geojson.DEFAULT_TOLERANCE[METHOD]
+    factors = process_geojson.DEFAULT_LOD_FACTORS
+    raw_points = sum(len(arc) for arc in topo['arcs'])
+
+    if stage == 'convert':
+        def work():
+            return process_geojson.simplify_topology(topo, object_name, METHOD, factors=factors)
+
+        def measure(levels):
+            counts = [level_positions(arcs, geometries) for _, arcs, geometries in levels]
+            return {'vertices_in': raw_points, 'vertices_out': counts[-1], 'levels': counts}
+        return quiet(work), measure
+
+    if stage == 'encode':
+        levels = quiet(lambda: process_geojson.simplify_topology(
+            topo, object_name, METHOD, factors=factors))()
+
+        def write(f, arcs, geometries):
+            return process_geojson.write_features(f, level_features(arcs, geometries))
+
+        def work():
+            stats = []
+            for _, arcs, geometries in levels:
+                with tempfile.TemporaryFile('w+', encoding='utf-8') as f:
+                    stats.append(write(f, arcs, geometries))
+            return stats
+
+        def measure(stats):
+            texts = []
+            for _, arcs, geometries in levels:
+                buffer = io.StringIO()
+                write(buffer, arcs, geometries)
+                texts.append(buffer.getvalue().encode('utf-8'))
+            positions = sum(feature['vertices'] for feature in stats[-1])
+            return {'vertices_in': positions, 'vertices_out': positions,
+                    'output_bytes': sum(len(text) for text in texts),
+                    'gzip_bytes': sum(len(gzip.compress(text, 6, mtime=0)) for text in texts)}
+        return work, measure
+
+    if stage == 'dissolve':
+        table = topology.decode_arcs(topo, precision=PRECISION)
+        full_detail = lod.build_levels(table, METHOD, tolerance, None, ())[-1][1]
+        min_area = lod.resolution(METHOD, tolerance) ** 2
+
+        def work():
+            polygons = dissolve.dissolve(table, geometries)
+            return dissolve.drop_specks(full_detail, polygons, min_area)
+
+        def measure(polygons):
+            rings = [ring for polygon in polygons for ring in polygon]
+            return {'vertices_in': table.point_count,
+                    'vertices_out': sum(len(full_detail.ring(ring)) for ring in rings),
+                    'polygons': len(polygons), 'holes': len(rings) - len(polygons)}
+        return work, measure
+
+    raise ValueError(f'unknown stage {stage}')
+
+
+def bench_build_stage(stage, inputs, args, results):
+    print(f"{'input':<22} {'scale':>5} {'ms':>9} {'peak MB':>8} "
+          f"{'vertices in':>12} {'out':>10} {'bytes':>10}")
+    for name, scale, topo, _ in inputs:
+        result = record(results, stage, name, scale,
+                        **measure_work(*build_stage(stage, topo), args.repeats))
+        output_bytes = result.get('output_bytes')
+        print(f"{name:<22} {scale:>5} {result['seconds'] * 1000:>9.1f} "
+              f"{result['peak_bytes'] / 1e6:>8.1f} {result['vertices_in']:>12} "
+              f"{result['vertices_out']:>10} "
+              f"{output_bytes if output_bytes is not None else '':>10}", flush=True)
+
+
+def bench_convert(inputs, args, results):
+    bench_build_stage('convert', inputs, args, results)
+
+
+def bench_encode(inputs, args, results):
+    bench_build_stage('encode', inputs, args, results)
+
+
+def bench_dissolve(inputs, args, results):
+    bench_build_stage('dissolve', inputs, args, results)
+
+
+def geometry_rings(geom, table):
+    if geom.get('type') == 'Polygon':
+        return [table.ring(ring) for ring in geom['arcs']]
+    if geom.get('type') == 'MultiPolygon':
+        return [[table.ring(ring) for ring in polygon] for polygon in geom['arcs']]
+    return None
+
+
+def write_dicts(geometries, table, f):
+    """Reference: round the table, build every feature dict, then dump them."""
+    rounded = table.rounded(WRITE_PRECISION)
+
+    def coordinates(rings):
+        if isinstance(rings, topology.Ring):
+            return rings.coordinates()
+        return [coordinates(part) for part in rings]
+
+    features = [{'type': 'Feature', 'properties': geom.get('properties', {}),
+                 'geometry': {'type': geom['type'],
+                              'coordinates': coordinates(geometry_rings(geom, rounded))}}
+                for geom in geometries]
+    encode.dump_compact({'type': 'FeatureCollection', 'features': features}, f)
+
+
+def write_streaming(geometries, table, f):
+    with encode.FeatureWriter(f, WRITE_PRECISION) as writer:
+        for geom in geometries:
+            writer.write(geom.get('properties', {}), geom['type'], geometry_rings(geom, table))
+
+
+def bench_write(inputs, args, results):
+    print(f"{'input':<22} {'scale':>5} {'areas':>6} {'points':>8} {'dicts MB':>9} "
+          f"{'stream MB':>10} {'dicts ms':>9} {'stream ms':>10}")
+    for name, scale, topo, _ in inputs:
+        table = simplify.simplify(topology.decode_arcs(topo), 'dp', WRITE_TOLERANCE)
+        geometries = polygon_geometries(topo)
+        with open(os.devnull, 'w', encoding='utf-8') as f:
+            reference_peak = peak_memory(lambda: write_dicts(geometries, table, f))
+            reference_seconds = best_time(lambda: write_dicts(geometries, table, f), args.repeats)
+            result = record(results, 'write', name, scale, **measure_work(
+                lambda: write_streaming(geometries, table, f),
+                lambda _: {'vertices_in': table.point_count},
+                args.repeats), reference_seconds=round(reference_seconds, 6),
+                reference_peak_bytes=reference_peak)
+        print(f"{name:<22} {scale:>5} {len(geometries):>6} {table.point_count:>8} "
+              f"{reference_peak / 1e6:>9.2f} {result['peak_bytes'] / 1e6:>10.2f} "
+              f"{reference_seconds * 1000:>9.1f} {result['seconds'] * 1000:>10.1f}", flush=True)
+
+
+def is_in_region_substring(feature, region_id):
+    """Reference: how create-region-geojson.py used to match one LAD to one region."""
+    props = feature.get('properties', {})
+    code = props.get('LAD13CD', props.get('LGD14CD', ''))
+    name = props.get('LAD13NM', props.get('LGD14NM', props.get('LAD21NM', ''))).lower()
+
+    if region_id == 'london':
+        return code.startswith(regions.LONDON_CODES_PREFIX)
+
+    if region_id in regions.REGION_LAD_MAPPING:
+        for lad in regions.REGION_LAD_MAPPING[region_id]:
+            if lad in name or name in lad:
+                return True
+    return False
+
+
+def partition_substring(geometries):
+    """Reference: one pass over every LAD per region."""
+    return {region_id: [geom for geom in geometries if is_in_region_substring(geom, region_id)]
+            for region_id in regions.ENGLISH_REGIONS}
+
+
+def partition_index(geometries, codes):
+    """Build the index and split every LAD in one pass."""
+    return regions.RegionIndex(codes=codes).partition(geometries, ('LAD13CD',), ('LAD13NM',))
+
+
+def bench_partition(inputs, args, results):
+    print(f"{'input':<22} {'scale':>5} {'LADs':>5} {'substring ms':>13} {'index ms':>9} "
+          f"{'speedup':>8} {'unmatched':>17} {'in several':>17} {'by name':>8}")
+    codes = regions.load_lad_regions(LAD_REGIONS)
+    for name, scale, topo, _ in inputs:
+        geometries = [geom for obj in topo.get('objects', {}).values()
+                      for geom in obj.get('geometries', [])
+                      if 'LAD13CD' in geom.get('properties', {})]
+        if not geometries or not geometries[0]['properties']['LAD13CD'].startswith('E'):
+            continue
+        old_best = best_time(lambda: partition_substring(geometries), args.repeats)
+
+        counts = {}
+        for region_id, members in partition_substring(geometries).items():
+            for geom in members:
+                counts[id(geom)] = counts.get(id(geom), 0) + 1
+        old_unmatched = sum(1 for geom in geometries if id(geom) not in counts)
+        old_several = sum(1 for n in counts.values() if n > 1)
+
+        result = record(results, 'partition', name, scale, **measure_work(
+            lambda: partition_index(geometries, codes),
+            lambda partition: {'lads': len(geometries), 'unmatched': len(partition.unmatched),
+                               'ambiguous': len(partition.ambiguous),
+                               'by_name': len(partition.by_name)},
+            args.repeats), reference_seconds=round(old_best, 6),
+            reference_unmatched=old_unmatched, reference_ambiguous=old_several)
+
+        print(f"{name:<22} {scale:>5} {len(geometries):>5} {old_best * 1000:>13.2f} "
+              f"{result['seconds'] * 1000:>9.2f} {old_best / result['seconds']:>7.1f}x "
+              f"{old_unmatched:>8} -> {result['unmatched']:<5} "
+              f"{old_several:>8} -> {result['ambiguous']:<5} "
+              f"{result['by_name']:>8}", flush=True)
+
+
+def locate_scan(polygons, lon, lat):
+    """Reference: ray-cast every ring of every polygon whose box holds the point."""
+    for owner, bbox, polygon in polygons:
+        west, south, east, north = bbox
+        if west <= lon <= east and south <= lat <= north and \
+                spatial.ring_contains(polygon[0], lon, lat) and \
+                not any(spatial.ring_contains(hole, lon, lat) for hole in polygon[1:]):
+            return owner
+    return None
+
+
+def overlapping_scan(polygons, bbox):
+    """Reference: check the box of every polygon."""
+    return sorted({owner for owner, polygon_bbox, _ in polygons
+                   if spatial.intersects(polygon_bbox, bbox)})
+
+
+def bench_spatial(inputs, args, results):
+    print(f"{'input':<22} {'scale':>5} {'areas':>6} {'polygons':>9} {'build ms':>9} "
+          f"{'located':>8} {'scan us/pt':>11} {'tree us/pt':>11} {'scan us/box':>12} "
+          f"{'tree us/box':>12}")
+    for name, scale, topo, _ in inputs:
+        areas = list(spatial.topology_areas(topo))
+        build = record(results, 'spatial', name, scale, 'build', **measure_work(
+            lambda: spatial.AreaIndex(areas), lambda index: {'areas': len(index)},
+            args.repeats))
+        index = spatial.AreaIndex(areas)
+        polygons = [(owner, spatial.points_bbox(polygon[0]), polygon)
+                    for owner, (_, area_polygons) in enumerate(areas)
+                    for polygon in area_polygons if polygon and len(polygon[0]) >= 3]
+        # Seeded per input, so every run queries the same points
+        rng = random.Random(0)
+        west, south, east, north = spatial.union_bbox(index.bboxes)
+        points = [(rng.uniform(west, east), rng.uniform(south, north))
+                  for _ in range(SPATIAL_POINTS)]
+        boxes = []
+        for _ in range(SPATIAL_BOXES):
+            lon, lat = rng.uniform(west, east), rng.uniform(south, north)
+            boxes.append((lon, lat, lon + SPATIAL_BOX_SIZE, lat + SPATIAL_BOX_SIZE))
+
+        located = [index.locate(lon, lat) for lon, lat in points]
+        if located != [locate_scan(polygons, lon, lat) for lon, lat in points] or \
+                [index.overlapping(box) for box in boxes] != \
+                [overlapping_scan(polygons, box) for box in boxes]:
+            sys.exit(f'{name} x{scale}: the R-tree and the scan disagree')
+
+        row = (f"{name:<22} {scale:>5} {len(index):>6} {len(index.polygons):>9} "
+               f"{build['seconds'] * 1000:>9.1f} {sum(area is not None for area in located):>8}")
+        queries = (
+            ('locate', SPATIAL_POINTS, lambda: [locate_scan(polygons, *point) for point in points],
+             lambda: [index.locate(*point) for point in points], 11),
+            ('overlapping', SPATIAL_BOXES, lambda: [overlapping_scan(polygons, box) for box in boxes],
+             lambda: [index.overlapping(box) for box in boxes], 12),
+        )
+        for variant, count, scan, query, width in queries:
+            scan_best = best_time(scan, args.repeats)
+            query_best = best_time(query, args.repeats)
+            record(results, 'spatial', name, scale, variant, seconds=round(query_best, 6),
+                   reference_seconds=round(scan_best, 6), queries=count)
+            row += f' {scan_best * 1e6 / count:>{width}.1f} {query_best * 1e6 / count:>{width}.1f}'
+        print(row, flush=True)
+
+
+def node_parse_times(topo_path, geo_path, repeats):
+    node = shutil.which('node')
+    if node is None:
+        return None
+    output = subprocess.check_output(
+        [node, '--input-type=module', '-e', NODE_PARSE_SCRIPT, '--',
+         os.path.join(ROOT, 'js', 'utils', 'topojson.js'), topo_path, geo_path, str(repeats)])
+    return json.loads(output)
+
+
+def bench_formats(inputs, args, results):
+    """Compare the .topojson and .geojson file of every region in data/regions."""
+    print(f"{'region':<22} {'topo KB':>8} {'geo KB':>8} {'topo gz':>8} {'geo gz':>8} "
+          f"{'py topo ms':>11} {'py geo ms':>10} {'js topo ms':>11} {'js geo ms':>10}")
+    for topo_path in sorted(glob.glob(os.path.join(REGION_MAPS, '*.topojson'))):
+        geo_path = topo_path[:-len('.topojson')] + '.geojson'
+        if not os.path.exists(geo_path):
+            continue
+        region = os.path.basename(topo_path)[:-len('.topojson')]
+        texts = []
+        for path in (topo_path, geo_path):
+            with open(path, 'rb') as f:
+                texts.append(f.read())
+        gzipped = [len(gzip.compress(text, 6, mtime=0)) for text in texts]
+        topo_seconds, geo_seconds = (best_time(lambda: json.loads(text), args.repeats)
+                                     for text in texts)
+        result = record(results, 'formats', region, 1, seconds=round(topo_seconds, 6),
+                        output_bytes=len(texts[0]), gzip_bytes=gzipped[0],
+                        geojson_seconds=round(geo_seconds, 6), geojson_bytes=len(texts[1]),
+                        geojson_gzip_bytes=gzipped[1])
+        row = region.ljust(22)
+        row += ''.join(f' {len(text) / 1024:>8.1f}' for text in texts)
+        row += ''.join(f' {size / 1024:>8.1f}' for size in gzipped)
+        row += f' {topo_seconds * 1000:>11.2f} {geo_seconds * 1000:>10.2f}'
+        js = node_parse_times(topo_path, geo_path, args.repeats)
+        if js is not None:
+            result.update(js_seconds=round(js['topojson'] / 1000, 6),
+                          js_geojson_seconds=round(js['geojson'] / 1000, 6))
+            row += f" {js['topojson']:>11.2f} {js['geojson']:>10.2f}"
+        print(row, flush=True)
+
+
+def result_key(result):
+    return result['section'], result['input'], result['scale'], result.get('variant')
+
+
+def regressions(results, baseline, args):
+    """``(key, field, before, after, change)`` of every result past its threshold."""
+    before = {result_key(result): result for result in baseline['results']}
+    found = []
+    for result in results:
+        old = before.get(result_key(result))
+        if old is None:
+            continue
+        for field, threshold in CHECKS:
+            if result.get(field) is None or not old.get(field):
+                continue
+            if field == 'seconds' and old[field] < MIN_TIMED_SECONDS:
+                continue
+            change = result[field] / old[field] - 1
+            if change > getattr(args, threshold):
+                found.append((result_key(result), field, old[field], result[field], change))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the dashboard.geo geometry code and the geo build stages.')
+    parser.add_argument('inputs', nargs='*',
+                        help=f"TopoJSON files (default: {', '.join(DEFAULT_INPUTS)})")
+    parser.add_argument('--section', action='append', choices=SECTIONS,
+                        help='section to run; repeat for several (default: all)')
+    parser.add_argument('--repeats', type=int, default=3, help='timed runs per measurement')
+    parser.add_argument('--scale', type=int, action='append',
+                        help=f'copies of {os.path.basename(SYNTHETIC_BASE)} in a synthetic '
+                             'topology; repeat for several, 0 for none (default: '
+                             f"{', '.join(map(str, DEFAULT_SCALES))}; --scale 100 is opt-in "
+                             'as it takes over ten minutes)')
+    parser.add_argument('--synthetic-base', default=SYNTHETIC_BASE,
+                        help='input the synthetic topologies are tiled from')
+    parser.add_argument('--output', metavar='FILE', help='write the results as JSON')
+    parser.add_argument('--baseline', metavar='FILE',
+                        help='results of an earlier run; exit with status 1 on a regression')
+    parser.add_argument('--max-slowdown', type=float, default=MAX_SLOWDOWN,
+                        help=f'fraction a result may get slower (default: {MAX_SLOWDOWN})')
+    parser.add_argument('--max-memory-growth', type=float, default=MAX_MEMORY_GROWTH,
+                        help=f'fraction peak memory may grow (default: {MAX_MEMORY_GROWTH})')
+    parser.add_argument('--max-output-growth', type=float, default=MAX_OUTPUT_GROWTH,
+                        help='fraction vertex counts and output bytes may grow '
+                             f'(default: {MAX_OUTPUT_GROWTH})')
+    args = parser.parse_args()
+
+    scales = [scale for scale in (args.scale or DEFAULT_SCALES) if scale > 0]
+    results = []
+    for n, section in enumerate(args.section or SECTIONS):
+        if n:
+            print()
+        # Read afresh per section, so only one input is held at a time
+        inputs = load_inputs(args.inputs or DEFAULT_INPUTS, args.synthetic_base, scales)
+        globals()[f'bench_{section}'](inputs, args, results)
+
+    report = {
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': topology.have_numpy(),
+        'repeats': args.repeats,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+        print(f'\nWrote {len(results)} results to {args.output}')
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        found = regressions(results, baseline, args)
+        if not found:
+            print(f'\nNo regressions against {args.baseline}')
+            return
+        print(f'\n{len(found)} regressions against {args.baseline}:')
+        for (section, name, scale, variant), field, old, new, change in found:
+            label = f'{section}/{variant}' if variant else section
+            print(f'  {label} {name} x{scale}: {field} {old:g} -> {new:g} ({change:+.0%})')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
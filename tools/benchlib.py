@@ -0,0 +1,76 @@
+"""Helpers shared by the benchmark and load-test scripts in this directory."""
+
+import gc
+import os
+import socket
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER = os.path.join(ROOT, 'server.py')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(extra_args=()):
+    """Launch server.py on a free port and wait until it accepts connections."""
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, SERVER, '--host', '127.0.0.1', '--port', str(port), '--quiet', *extra_args],
+        cwd=ROOT, stdout=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return proc, port
+        except OSError:
+            if proc.poll() is not None:
+                break
+            time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError(f'server.py {" ".join(extra_args)} did not start')
+
+
+def stop_server(proc):
+    """Stop the server and return the CPU seconds it used."""
+    proc.terminate()
+    try:
+        _, _, usage = os.wait4(proc.pid, 0)
+    except ChildProcessError:
+        return None
+    proc.returncode = 0
+    return usage.ru_utime + usage.ru_stime
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return float('nan')
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def best_time(func, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def peak_memory(func):
+    """Peak bytes traced while ``func`` runs (NumPy buffers included)."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Rebuild the dashboard's map geometry, skipping what is already up to date.
+
+The per-region maps (create-region-geojson.py) and the UK overview
+(process-geojson.py) are rebuilt only where an input file, a tool
+argument or the code that builds them changed since the last build, or
+where one of their output files was edited or removed. Each build is
+recorded in data/geo-manifest.json with the hashes of its inputs and
+outputs.
+
+England's regions are keyed on the LADs each one is assigned rather than
+on the LAD lists as a whole, so editing one region's list rebuilds only
+the regions whose membership changed.
+
+Example:
+    python tools/build-geo.py              # rebuild what changed
+    python tools/build-geo.py --dry-run    # list what would be rebuilt
+    python tools/build-geo.py --force      # rebuild everything
+"""
+
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dashboard.geo.manifest import BuildManifest, file_digest, value_digest  # noqa: E402
+from dashboard.geo.parallel import default_workers  # noqa: E402
+from dashboard.geo.regions import (ENGLISH_REGIONS, LAD_REGIONS_FILE, RegionIndex,  # noqa: E402
+                                   load_lad_regions)
+from dashboard.geo.simplify import METHODS  # noqa: E402
+
+MANIFEST = 'data/geo-manifest.json'
+
+REGION_TOOL = 'tools/create-region-geojson.py'
+OVERVIEW_TOOL = 'tools/process-geojson.py'
+
+# Modules whose code shapes the outputs. regions.py is left out: England
+# regions are keyed on the LADs it assigns them instead
+GEO_MODULES = (
+    'dashboard/geo/dissolve.py',
+    'dashboard/geo/encode.py',
+    'dashboard/geo/lod.py',
+    'dashboard/geo/simplify.py',
+    'dashboard/geo/spatial.py',
+    'dashboard/geo/topology.py',
+)
+
+# Inputs as create-region-geojson.py and process-geojson.py read them
+ENGLAND_INPUT = 'data/regions-geo/england_lad.json'
+DEVOLVED_INPUTS = {
+    'scotland': 'data/regions-geo/scotland_lad.json',
+    'wales': 'data/regions-geo/wales_lad.json',
+    'northern-ireland': 'data/regions-geo/ni_lgd.json',
+}
+OVERVIEW_INPUTS = (
+    'data/england-regions-topo.json',
+    'data/scotland-topo.json',
+    'data/wales-topo.json',
+    'data/ni-topo.json',
+)
+OVERVIEW_TARGET = 'uk'
+
+
+def abspath(relpath):
+    return os.path.join(ROOT, *relpath.split('/'))
+
+
+def digests(relpaths):
+    return {relpath: file_digest(abspath(relpath)) for relpath in relpaths}
+
+
+def code_digest(tool):
+    return value_digest(digests([tool, *GEO_MODULES]))
+
+
+def england_members():
+    """LAD codes of each English region, as RegionIndex assigns them."""
+    with open(abspath(ENGLAND_INPUT), 'r') as f:
+        topo = json.load(f)
+    geometries = next(iter(topo['objects'].values()))['geometries']
+    index = RegionIndex(codes=load_lad_regions(abspath(LAD_REGIONS_FILE)))
+    partition = index.partition(geometries, ('LAD13CD',), ('LAD13NM',))
+    return {region_id: [geom['properties']['LAD13CD'] for geom in partition.regions[region_id]]
+            for region_id in ENGLISH_REGIONS}
+
+
+def existing(patterns):
+    """Relative paths of the files matching ``patterns``."""
+    matches = set()
+    for pattern in patterns:
+        matches.update(glob.glob(abspath(pattern)))
+    return sorted(os.path.relpath(path, ROOT).replace(os.sep, '/') for path in matches)
+
+
+def region_outputs(region_id):
+    return existing([f'data/regions/{region_id}.topojson', f'data/regions/{region_id}.geojson',
+                     f'data/lod/{region_id}.json', f'data/lod/{region_id}-[0-9]*.topojson'])
+
+
+def overview_outputs():
+    return existing(['data/uk-regions.geojson', f'data/lod/{OVERVIEW_TARGET}.json',
+                     f'data/lod/{OVERVIEW_TARGET}-[0-9]*.geojson'])
+
+
+def tool_args(method, tolerance):
+    args = ['--method', method]
+    if tolerance is not None:
+        args += ['--tolerance', repr(tolerance)]
+    return args
+
+
+def target_states(args):
+    """The state of every target: what it would be built from now."""
+    region_args = tool_args(args.method, args.tolerance)
+    region_code = code_digest(REGION_TOOL)
+    states = {}
+
+    england_input = digests([ENGLAND_INPUT])
+    for region_id, members in england_members().items():
+        states[region_id] = {'inputs': england_input, 'members': members,
+                             'args': region_args, 'code': region_code}
+    for region_id, relpath in DEVOLVED_INPUTS.items():
+        states[region_id] = {'inputs': digests([relpath]), 'args': region_args,
+                             'code': region_code}
+
+    states[OVERVIEW_TARGET] = {'inputs': digests(OVERVIEW_INPUTS),
+                               'args': tool_args(args.method, args.overview_tolerance),
+                               'code': code_digest(OVERVIEW_TOOL)}
+    return states
+
+
+def run_tool(tool, args):
+    command = [sys.executable, abspath(tool), *args]
+    print(f"\n$ {' '.join([os.path.basename(sys.executable), tool, *args])}", flush=True)
+    result = subprocess.run(command, cwd=ROOT)
+    if result.returncode != 0:
+        sys.exit(f'{tool} failed with exit status {result.returncode}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild the map geometry that changed.')
+    parser.add_argument('--method', choices=METHODS, default='dp',
+                        help='dp (Douglas-Peucker) or vw (Visvalingam-Whyatt); default dp')
+    parser.add_argument('--tolerance', type=float,
+                        help='per-region simplification tolerance (default: the tool default)')
+    parser.add_argument('--overview-tolerance', type=float,
+                        help='UK overview simplification tolerance (default: the tool default)')
+    parser.add_argument('--workers', type=int, default=default_workers(),
+                        help='processes each tool builds with (default: one per CPU)')
+    parser.add_argument('--force', action='store_true', help='rebuild every target')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='list what would be rebuilt without building it')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    manifest = BuildManifest(abspath(MANIFEST), ROOT)
+    states = target_states(args)
+    stale = {}
+    for target, state in states.items():
+        reasons = ['forced'] if args.force else manifest.stale_reasons(target, state)
+        if reasons:
+            stale[target] = reasons
+        status = f"rebuild ({', '.join(reasons)})" if reasons else 'up to date'
+        print(f"  {target:<18} {status}")
+
+    if args.dry_run or not stale:
+        print(f"\n{len(stale)} of {len(states)} targets to rebuild "
+              f"({time.perf_counter() - start:.2f}s)")
+        return
+
+    regions = [target for target in states if target in stale and target != OVERVIEW_TARGET]
+    workers = ['--workers', str(args.workers)]
+    if regions:
+        region_args = [arg for region_id in regions for arg in ('--region', region_id)]
+        run_tool(REGION_TOOL, [*states[regions[0]]['args'], *region_args, *workers])
+        for region_id in regions:
+            manifest.record(region_id, states[region_id], region_outputs(region_id))
+        manifest.save()
+    if OVERVIEW_TARGET in stale:
+        run_tool(OVERVIEW_TOOL, [*states[OVERVIEW_TARGET]['args'], *workers])
+        manifest.record(OVERVIEW_TARGET, states[OVERVIEW_TARGET], overview_outputs())
+        manifest.save()
+
+    print(f"\nRebuilt {len(stale)} of {len(states)} targets in "
+          f"{time.perf_counter() - start:.1f}s; recorded in {MANIFEST}")
+
+
+if __name__ == '__main__':
+    main()
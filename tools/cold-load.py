@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Compare a cold dashboard data load over a throttled connection:
+DataLoader's eight parallel fetches vs the single /api/bootstrap bundle.
+
+server.py is started in production mode behind a local TCP proxy that adds
+round-trip latency and caps the shared downstream bandwidth, using the
+network presets from browser developer tools. Each run opens fresh
+connections (at most six, like a browser) with nothing cached.
+
+Example:
+    python tools/cold-load.py --profile fast-3g --runs 3
+"""
+
+import argparse
+import asyncio
+import http.client
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchlib import ROOT, percentile, start_server, stop_server
+
+# name -> (downstream bytes/sec, round-trip seconds)
+PROFILES = {
+    'slow-3g': (400_000 / 8, 2.0),
+    'fast-3g': (1_600_000 / 8, 0.5625),
+    '4g': (9_000_000 / 8, 0.170),
+}
+
+FAN_OUT_PATHS = [
+    '/data/config.json',
+    '/data/regions.json',
+    '/data/sectors.json',
+    '/data/disciplines.json',
+    '/data/clients.json',
+    '/data/opportunities.json',
+    '/data/budgets.json',
+    '/data/projects.json',
+]
+
+BOOTSTRAP_PATHS = ['/api/bootstrap']
+
+# Browsers open at most this many HTTP/1.1 connections per host
+BROWSER_CONNECTIONS = 6
+
+CHUNK = 16 * 1024
+
+
+class ThrottlingProxy:
+    """Local TCP proxy adding latency in both directions and a shared bandwidth cap downstream."""
+
+    def __init__(self, upstream_port, bandwidth, rtt):
+        self.upstream_port = upstream_port
+        self.bandwidth = bandwidth
+        self.rtt = rtt
+        self.port = None
+        self._loop = asyncio.new_event_loop()
+        self._link_free_at = 0.0
+
+    def start(self):
+        ready = threading.Event()
+
+        async def serve():
+            server = await asyncio.start_server(self._handle, '127.0.0.1', 0)
+            self.port = server.sockets[0].getsockname()[1]
+            ready.set()
+            async with server:
+                await server.serve_forever()
+
+        threading.Thread(target=self._loop.run_until_complete, args=(serve(),), daemon=True).start()
+        ready.wait()
+        return self.port
+
+    async def _transmit(self, size):
+        """Wait until ``size`` bytes have crossed the shared downstream link."""
+        now = self._loop.time()
+        start = max(now, self._link_free_at)
+        self._link_free_at = start + size / self.bandwidth
+        await asyncio.sleep(self._link_free_at - now)
+
+    async def _pipe(self, reader, writer, throttle):
+        queue = asyncio.Queue()
+
+        async def deliver():
+            while True:
+                due, data = await queue.get()
+                delay = due - self._loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if not data:
+                    break
+                writer.write(data)
+                await writer.drain()
+            if writer.can_write_eof():
+                writer.write_eof()
+
+        delivery = asyncio.ensure_future(deliver())
+        try:
+            while True:
+                data = await reader.read(CHUNK)
+                if data and throttle:
+                    await self._transmit(len(data))
+                queue.put_nowait((self._loop.time() + self.rtt / 2, data))
+                if not data:
+                    break
+            await delivery
+        except (ConnectionError, OSError):
+            delivery.cancel()
+
+    async def _handle(self, client_reader, client_writer):
+        # Connection setup costs a round trip
+        await asyncio.sleep(self.rtt)
+        try:
+            upstream_reader, upstream_writer = await asyncio.open_connection(
+                '127.0.0.1', self.upstream_port)
+        except OSError:
+            client_writer.close()
+            return
+        await asyncio.gather(
+            self._pipe(client_reader, upstream_writer, throttle=False),
+            self._pipe(upstream_reader, client_writer, throttle=True),
+        )
+        upstream_writer.close()
+        client_writer.close()
+
+
+def cold_load(port, paths):
+    """Fetch ``paths`` like a browser would; return (seconds, bytes on the wire)."""
+    local = threading.local()
+    connections = []
+    lock = threading.Lock()
+
+    def fetch(path):
+        if not hasattr(local, 'conn'):
+            local.conn = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+            with lock:
+                connections.append(local.conn)
+        local.conn.request('GET', path, headers={'Accept-Encoding': 'gzip'})
+        response = local.conn.getresponse()
+        body = response.read()
+        if response.status >= 400:
+            raise RuntimeError(f'{path}: HTTP {response.status}')
+        return len(body)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=min(BROWSER_CONNECTIONS, len(paths))) as pool:
+        sizes = list(pool.map(fetch, paths))
+    elapsed = time.perf_counter() - start
+    for conn in connections:
+        conn.close()
+    return elapsed, sum(sizes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cold-load time: 8 fetches vs /api/bootstrap.')
+    parser.add_argument('--profile', action='append', choices=sorted(PROFILES),
+                        help='network profile; repeat for several (default: all)')
+    parser.add_argument('--runs', type=int, default=3, help='cold loads per strategy and profile')
+    args = parser.parse_args()
+    profiles = args.profile or list(PROFILES)
+
+    precompressed = os.path.exists(os.path.join(ROOT, 'data', 'clients.json.gz'))
+    print('Static files are ' + ('precompressed' if precompressed else
+                                 'NOT precompressed (run tools/compress-assets.py first)'))
+
+    proc, port = start_server(['--production'])
+    try:
+        print(f"\n{'profile':<9} {'strategy':<10} {'requests':>8} {'bytes':>9} {'median s':>9} {'min s':>7}")
+        for profile in profiles:
+            bandwidth, rtt = PROFILES[profile]
+            proxy = ThrottlingProxy(port, bandwidth, rtt)
+            proxy_port = proxy.start()
+            for strategy, paths in (('fan-out', FAN_OUT_PATHS), ('bootstrap', BOOTSTRAP_PATHS)):
+                results = [cold_load(proxy_port, paths) for _ in range(args.runs)]
+                times = sorted(t for t, _ in results)
+                print(f'{profile:<9} {strategy:<10} {len(paths):>8} {results[0][1]:>9} '
+                      f'{percentile(times, 50):>9.2f} {times[0]:>7.2f}', flush=True)
+    finally:
+        stop_server(proc)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Write precompressed siblings for the dashboard's text assets.
+
+For every data/**/*.json|geojson|topojson, js/**/*.js and css/**/*.css file this
+writes <file>.gz at maximum level, plus <file>.br and <file>.zst when the
+optional brotli and zstandard packages are installed. server.py serves the
+best sibling the browser accepts. Files whose siblings are already newer
+than the source are skipped unless --force is given.
+
+Prints the bytes saved per file. With --ttfb it also starts server.py and
+compares time-to-first-byte and full download time, compressed vs raw.
+"""
+
+import argparse
+import http.client
+import os
+import sys
+import time
+
+from benchlib import ROOT, percentile, start_server, stop_server
+
+sys.path.insert(0, ROOT)
+
+from dashboard.compression import available_encodings  # noqa: E402
+
+ASSET_GLOBS = [
+    ('data', ('.json', '.geojson', '.topojson')),
+    ('js', ('.js',)),
+    ('css', ('.css',)),
+]
+
+
+def find_assets(root):
+    """Yield every asset to compress, relative to ``root``, in a stable order."""
+    for directory, extensions in ASSET_GLOBS:
+        for dirpath, dirnames, filenames in os.walk(os.path.join(root, directory)):
+            dirnames.sort()
+            for name in sorted(filenames):
+                if name.endswith(extensions):
+                    yield os.path.relpath(os.path.join(dirpath, name), root)
+
+
+def compress_asset(path, encodings, force=False):
+    """Write the compressed siblings of ``path``; return {encoding: size}."""
+    st = os.stat(path)
+    data = None
+    sizes = {}
+    for encoding in encodings:
+        target = path + encoding.suffix
+        try:
+            target_st = os.stat(target)
+        except OSError:
+            target_st = None
+        if not force and target_st is not None and target_st.st_mtime_ns >= st.st_mtime_ns:
+            sizes[encoding.name] = target_st.st_size
+            continue
+
+        if data is None:
+            with open(path, 'rb') as f:
+                data = f.read()
+        compressed = encoding.compress(data)
+        if len(compressed) >= len(data):
+            # Not worth serving; make sure no stale sibling is left behind
+            if target_st is not None:
+                os.remove(target)
+            continue
+        tmp = target + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(compressed)
+        os.replace(tmp, target)
+        sizes[encoding.name] = len(compressed)
+    return sizes
+
+
+def timed_get(conn, path, accept_encoding):
+    """Return (ttfb, total, bytes) for one GET over ``conn``."""
+    headers = {'Accept-Encoding': accept_encoding} if accept_encoding else {}
+    start = time.perf_counter()
+    conn.request('GET', '/' + path.replace(os.sep, '/'), headers=headers)
+    response = conn.getresponse()
+    first = response.read(1)
+    ttfb = time.perf_counter() - start
+    rest = response.read()
+    return ttfb, time.perf_counter() - start, len(first) + len(rest)
+
+
+def measure_ttfb(assets, accept_encoding, repeats):
+    proc, port = start_server(['--production'])
+    results = {}
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        for path in assets:
+            raw = sorted(timed_get(conn, path, None)[:2] for _ in range(repeats))
+            packed = sorted(timed_get(conn, path, accept_encoding)[:2] for _ in range(repeats))
+            results[path] = (
+                percentile([t for t, _ in raw], 50), percentile([t for _, t in raw], 50),
+                percentile([t for t, _ in packed], 50), percentile([t for _, t in packed], 50),
+            )
+        conn.close()
+    finally:
+        stop_server(proc)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompress dashboard assets.')
+    parser.add_argument('--root', default=ROOT, help='dashboard root directory')
+    parser.add_argument('--force', action='store_true', help='recompress even if up to date')
+    parser.add_argument('--ttfb', action='store_true',
+                        help='measure time-to-first-byte against server.py afterwards')
+    parser.add_argument('--repeats', type=int, default=20, help='requests per file for --ttfb')
+    args = parser.parse_args()
+
+    encodings = available_encodings()
+    names = [e.name for e in encodings]
+    print(f"Encodings: {', '.join(names)}")
+
+    assets = list(find_assets(args.root))
+    total_raw = 0
+    total_best = 0
+    print(f"\n{'file':<52} {'raw':>10} " + ' '.join(f'{n:>10}' for n in names) + f" {'saved':>7}")
+    for rel in assets:
+        path = os.path.join(args.root, rel)
+        sizes = compress_asset(path, encodings, force=args.force)
+        raw = os.path.getsize(path)
+        best = min(sizes.values(), default=raw)
+        total_raw += raw
+        total_best += best
+        cells = ' '.join(f'{sizes[n]:>10}' if n in sizes else f"{'-':>10}" for n in names)
+        print(f'{rel:<52} {raw:>10} {cells} {100 * (1 - best / raw) if raw else 0:>6.1f}%')
+
+    saved = total_raw - total_best
+    print(f'\n{len(assets)} files: {total_raw / 1024:.1f} KB raw, {total_best / 1024:.1f} KB best, '
+          f'{saved / 1024:.1f} KB saved ({100 * saved / total_raw if total_raw else 0:.1f}%)')
+
+    if args.ttfb:
+        if os.path.abspath(args.root) != ROOT:
+            parser.error('--ttfb measures server.py, which serves the repository root')
+        accept = ', '.join(names)
+        print(f'\nMedian of {args.repeats} requests, raw vs Accept-Encoding: {accept} (ms)')
+        print(f"{'file':<52} {'ttfb raw':>9} {'ttfb enc':>9} {'total raw':>10} {'total enc':>10}")
+        for rel, (ttfb_raw, total_raw_t, ttfb_enc, total_enc) in measure_ttfb(
+                assets, accept, args.repeats).items():
+            print(f'{rel:<52} {ttfb_raw * 1000:>9.2f} {ttfb_enc * 1000:>9.2f} '
+                  f'{total_raw_t * 1000:>10.2f} {total_enc * 1000:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,343 +1,386 @@
 #!/usr/bin/env python3
 """
-Create individual GeoJSON files for each UK region's subdivisions.
+Create individual map files for each UK region's subdivisions, as
+quantized TopoJSON and compact GeoJSON, plus coarser levels of detail
+for /api/geometry.
 Uses TopoJSON from martinjc/UK-GeoJSON repository.
 """
 
+import argparse
 import json
 import os
-
-# Mapping of LAD codes to regions (prefix-based for London)
-LONDON_CODES_PREFIX = 'E09'
-
-# Region to LAD name mapping
-NORTH_WEST_LADS = [
-    'bolton', 'bury', 'manchester', 'oldham', 'rochdale', 'salford', 'stockport',
-    'tameside', 'trafford', 'wigan',  # Greater Manchester
-    'knowsley', 'liverpool', 'st. helens', 'sefton', 'wirral',  # Merseyside
-    'halton', 'warrington',
-    'cheshire east', 'cheshire west and chester',
-    'blackburn with darwen', 'blackpool',
-    'burnley', 'chorley', 'fylde', 'hyndburn', 'lancaster', 'pendle',
-    'preston', 'ribble valley', 'rossendale', 'south ribble', 'west lancashire', 'wyre',
-    'allerdale', 'barrow-in-furness', 'carlisle', 'copeland', 'eden', 'south lakeland',
-    'cumberland', 'westmorland and furness'
-]
-
-NORTH_EAST_LADS = [
-    'hartlepool', 'middlesbrough', 'redcar and cleveland', 'stockton-on-tees',
-    'darlington', 'county durham', 'durham',
-    'gateshead', 'newcastle upon tyne', 'north tyneside', 'south tyneside', 'sunderland',
-    'northumberland'
-]
-
-YORKSHIRE_LADS = [
-    'kingston upon hull', 'east riding of yorkshire', 'north east lincolnshire',
-    'north lincolnshire', 'york',
-    'barnsley', 'doncaster', 'rotherham', 'sheffield',
-    'bradford', 'calderdale', 'kirklees', 'leeds', 'wakefield',
-    'craven', 'hambleton', 'harrogate', 'richmondshire', 'ryedale', 'scarborough', 'selby',
-    'north yorkshire'
-]
-
-EAST_MIDLANDS_LADS = [
-    'derby', 'leicester', 'nottingham', 'rutland',
-    'amber valley', 'bolsover', 'chesterfield', 'derbyshire dales', 'erewash',
-    'high peak', 'north east derbyshire', 'south derbyshire',
-    'blaby', 'charnwood', 'harborough', 'hinckley and bosworth', 'melton',
-    'north west leicestershire', 'oadby and wigston',
-    'boston', 'east lindsey', 'lincoln', 'north kesteven', 'south holland',
-    'south kesteven', 'west lindsey',
-    'corby', 'daventry', 'east northamptonshire', 'kettering', 'northampton',
-    'south northamptonshire', 'wellingborough',
-    'north northamptonshire', 'west northamptonshire',
-    'ashfield', 'bassetlaw', 'broxtowe', 'gedling', 'mansfield', 'newark and sherwood',
-    'rushcliffe'
-]
-
-WEST_MIDLANDS_LADS = [
-    'birmingham', 'coventry', 'dudley', 'sandwell', 'solihull', 'walsall', 'wolverhampton',
-    'herefordshire', 'shropshire', 'stoke-on-trent', 'telford and wrekin',
-    'bromsgrove', 'malvern hills', 'redditch', 'worcester', 'wychavon', 'wyre forest',
-    'cannock chase', 'east staffordshire', 'lichfield', 'newcastle-under-lyme',
-    'south staffordshire', 'stafford', 'staffordshire moorlands', 'tamworth',
-    'north warwickshire', 'nuneaton and bedworth', 'rugby', 'stratford-on-avon', 'warwick'
-]
-
-EASTERN_LADS = [
-    'bedford', 'central bedfordshire', 'luton',
-    'peterborough', 'cambridge', 'east cambridgeshire', 'fenland', 'huntingdonshire',
-    'south cambridgeshire',
-    'basildon', 'braintree', 'brentwood', 'castle point', 'chelmsford', 'colchester',
-    'epping forest', 'harlow', 'maldon', 'rochford', 'southend-on-sea', 'tendring',
-    'thurrock', 'uttlesford',
-    'broxbourne', 'dacorum', 'east hertfordshire', 'hertsmere', 'north hertfordshire',
-    'st albans', 'stevenage', 'three rivers', 'watford', 'welwyn hatfield',
-    'breckland', 'broadland', 'great yarmouth', "king's lynn and west norfolk",
-    'north norfolk', 'norwich', 'south norfolk',
-    'babergh', 'ipswich', 'mid suffolk', 'east suffolk', 'west suffolk'
-]
-
-SOUTH_EAST_LADS = [
-    'bracknell forest', 'west berkshire', 'reading', 'slough', 'windsor and maidenhead',
-    'wokingham', 'milton keynes', 'brighton and hove', 'portsmouth', 'southampton',
-    'isle of wight', 'medway',
-    'aylesbury vale', 'chiltern', 'south bucks', 'wycombe', 'buckinghamshire',
-    'eastbourne', 'hastings', 'lewes', 'rother', 'wealden',
-    'basingstoke and deane', 'east hampshire', 'eastleigh', 'fareham', 'gosport',
-    'hart', 'havant', 'new forest', 'rushmoor', 'test valley', 'winchester',
-    'ashford', 'canterbury', 'dartford', 'dover', 'gravesham', 'maidstone',
-    'sevenoaks', 'folkestone and hythe', 'shepway', 'swale', 'thanet', 'tonbridge and malling',
-    'tunbridge wells',
-    'cherwell', 'oxford', 'south oxfordshire', 'vale of white horse', 'west oxfordshire',
-    'elmbridge', 'epsom and ewell', 'guildford', 'mole valley', 'reigate and banstead',
-    'runnymede', 'spelthorne', 'surrey heath', 'tandridge', 'waverley', 'woking',
-    'adur', 'arun', 'chichester', 'crawley', 'horsham', 'mid sussex', 'worthing'
-]
-
-SOUTH_WEST_LADS = [
-    'bath and north east somerset', 'bristol', 'north somerset',
-    'south gloucestershire', 'plymouth', 'torbay', 'bournemouth', 'poole',
-    'swindon', 'cornwall', 'isles of scilly', 'wiltshire',
-    'bournemouth, christchurch and poole', 'dorset',
-    'christchurch', 'east dorset', 'north dorset', 'purbeck', 'west dorset',
-    'weymouth and portland',
-    'cheltenham', 'cotswold', 'forest of dean', 'gloucester', 'stroud', 'tewkesbury',
-    'mendip', 'sedgemoor', 'south somerset', 'somerset west and taunton',
-    'east devon', 'exeter', 'mid devon', 'north devon', 'south hams', 'teignbridge',
-    'torridge', 'west devon'
-]
-
-REGION_LAD_MAPPING = {
-    'north-east': NORTH_EAST_LADS,
-    'north-west': NORTH_WEST_LADS,
-    'yorkshire-humber': YORKSHIRE_LADS,
-    'east-midlands': EAST_MIDLANDS_LADS,
-    'midlands': WEST_MIDLANDS_LADS,
-    'eastern': EASTERN_LADS,
-    'south-east': SOUTH_EAST_LADS,
-    'south-west': SOUTH_WEST_LADS,
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dashboard.geo.encode import (DEFAULT_QUANTIZATION, FeatureWriter, dump_compact,  # noqa: E402
+                                  quantize_topology)
+from dashboard.geo.lod import DEFAULT_FACTORS, build_levels, geometry_bbox, lod_index  # noqa: E402
+from dashboard.geo.parallel import TaskPool, default_workers  # noqa: E402
+from dashboard.geo.regions import (ENGLISH_REGIONS, LAD_REGIONS_FILE, RegionIndex,  # noqa: E402
+                                   load_lad_regions)
+from dashboard.geo.simplify import METHODS  # noqa: E402
+from dashboard.geo.topology import decode_arcs  # noqa: E402
+
+# Default simplification tolerance per method: a distance in degrees for
+# Douglas-Peucker, a triangle area in square degrees for Visvalingam-Whyatt
+DEFAULT_TOLERANCE = {'dp': 0.001, 'vw': 2e-6}
+
+# Each region is written as quantized TopoJSON, which region-map.js loads,
+# and as GeoJSON, its fallback
+OUTPUT_FORMATS = ('topojson', 'geojson')
+
+# GeoJSON decimal places: 0.0001 degrees is about 10 m
+DEFAULT_PRECISION = 4
+
+# Property keys holding each area's code and name, in order of preference;
+# Northern Ireland's LGD boundaries use LGDCode and LGDNAME
+DEVOLVED_CODE_KEYS = ('LAD13CD', 'LGDCode', 'LGD14CD', 'LAD21CD')
+DEVOLVED_NAME_KEYS = ('LAD13NM', 'LGDNAME', 'LGD14NM', 'LAD21NM')
+
+# Input file of each devolved nation in data/regions-geo
+DEVOLVED_INPUTS = {
+    'scotland': 'scotland_lad.json',
+    'wales': 'wales_lad.json',
+    'northern-ireland': 'ni_lgd.json',
 }
 
+# Property keys of England's LAD boundaries, which RegionIndex matches on
+ENGLAND_CODE_KEYS = ('LAD13CD',)
+ENGLAND_NAME_KEYS = ('LAD13NM',)
+
+# Region of each English LAD code
+LAD_REGIONS_PATH = os.path.join(ROOT, *LAD_REGIONS_FILE.split('/'))
+
 
-def decode_topojson(topo_data):
-    """Properly decode TopoJSON to GeoJSON with delta decoding."""
-    if topo_data.get('type') != 'Topology':
-        return topo_data
+def load_topology(topo_file, method='dp', tolerance=None, vertices=None, factors=()):
+    """Load a TopoJSON file and simplify its arcs at every level of detail.
+
+    Returns the geometries of its first object and ``(tolerance, arcs)``
+    per level, coarsest first and full detail last; ``factors`` are the
+    coarser levels' multiples of the full-detail tolerance. Arcs are
+    simplified before rings are built, so borders shared by two LADs are
+    simplified once and stay identical on both sides.
+    """
+    with open(topo_file, 'r') as f:
+        topo_data = json.load(f)
 
     obj_key = list(topo_data['objects'].keys())[0]
     geometries = topo_data['objects'][obj_key]['geometries']
-    arcs = topo_data['arcs']
-    transform = topo_data.get('transform', {})
-
-    scale = transform.get('scale', [1, 1])
-    translate = transform.get('translate', [0, 0])
-
-    # First, decode all arcs from delta encoding to absolute coordinates
-    decoded_arcs = []
-    for arc in arcs:
-        decoded_arc = []
-        x, y = 0, 0
-        for point in arc:
-            x += point[0]
-            y += point[1]
-            # Apply transform
-            lon = x * scale[0] + translate[0]
-            lat = y * scale[1] + translate[1]
-            decoded_arc.append([lon, lat])
-        decoded_arcs.append(decoded_arc)
-
-    features = []
-    for geom in geometries:
-        coords = decode_geometry(geom, decoded_arcs)
-        if coords:
-            feature = {
-                'type': 'Feature',
-                'properties': geom.get('properties', {}),
-                'geometry': {
-                    'type': geom['type'],
-                    'coordinates': coords
-                }
-            }
-            features.append(feature)
-
-    return {
-        'type': 'FeatureCollection',
-        'features': features
-    }
-
-
-def decode_geometry(geom, decoded_arcs):
-    """Decode geometry arcs to coordinates."""
-    geom_type = geom['type']
-
-    if geom_type == 'Polygon':
-        rings = []
-        for arc_indices in geom.get('arcs', []):
-            ring = decode_ring(arc_indices, decoded_arcs)
-            if ring:
-                rings.append(ring)
-        return rings if rings else None
-
-    elif geom_type == 'MultiPolygon':
-        polygons = []
-        for polygon_arcs in geom.get('arcs', []):
-            rings = []
-            for arc_indices in polygon_arcs:
-                ring = decode_ring(arc_indices, decoded_arcs)
-                if ring:
-                    rings.append(ring)
-            if rings:
-                polygons.append(rings)
-        return polygons if polygons else None
+    # Decode all arcs from delta encoding into one flat coordinate buffer;
+    # rings stay ranges into it until they are written out
+    decoded_arcs = decode_arcs(topo_data)
+    original_count = decoded_arcs.point_count
+    levels = build_levels(decoded_arcs, method, tolerance, vertices, factors)
+    counts = ', '.join(str(arcs.point_count) for _, arcs in levels)
+    print(f"  Simplified arcs ({method}): {original_count} -> {counts} vertices")
+    return geometries, levels
+
+
+def clean_geometry(geom, decoded_arcs):
+    """``geom`` without rings simplified down to a line, or None if nothing is left."""
+    def keep(arc_indices):
+        # Points shared by consecutive arcs count once; a ring needs four positions
+        return len(decoded_arcs.ring(arc_indices)) >= 4
+
+    if geom['type'] == 'Polygon':
+        rings = [ring for ring in geom.get('arcs', []) if keep(ring)]
+        return {**geom, 'arcs': rings} if rings else None
+
+    elif geom['type'] == 'MultiPolygon':
+        polygons = [[ring for ring in polygon if keep(ring)] for polygon in geom.get('arcs', [])]
+        polygons = [polygon for polygon in polygons if polygon]
+        return {**geom, 'arcs': polygons} if polygons else None
 
     return None
 
 
-def decode_ring(arc_indices, decoded_arcs):
-    """Decode a ring from arc indices."""
-    coords = []
-    for idx in arc_indices:
-        if idx < 0:
-            # Negative index: reverse the arc
-            arc = list(reversed(decoded_arcs[~idx]))
-        else:
-            arc = decoded_arcs[idx]
-
-        # Add arc points, skipping first point if we already have coords
-        # (to avoid duplicates at arc junctions)
-        start = 1 if coords else 0
-        coords.extend(arc[start:])
-
-    return coords if len(coords) >= 3 else None
-
-
-def simplify_coordinates(coords, tolerance=0.001):
-    """Simple coordinate simplification."""
-    if len(coords) <= 4:
-        return coords
-
-    simplified = [coords[0]]
-    for i in range(1, len(coords) - 1):
-        prev = simplified[-1]
-        curr = coords[i]
-        dist = ((curr[0] - prev[0])**2 + (curr[1] - prev[1])**2)**0.5
-        if dist >= tolerance:
-            simplified.append(curr)
-    simplified.append(coords[-1])
-    return simplified
-
-
-def simplify_geometry(geometry, tolerance=0.001):
-    """Simplify geometry coordinates."""
-    coords = geometry['coordinates']
-    geom_type = geometry['type']
-
-    if geom_type == 'Polygon':
-        geometry['coordinates'] = [simplify_coordinates(ring, tolerance) for ring in coords]
-    elif geom_type == 'MultiPolygon':
-        geometry['coordinates'] = [
-            [simplify_coordinates(ring, tolerance) for ring in polygon]
-            for polygon in coords
-        ]
-    return geometry
-
-
-def is_in_region(feature, region_id):
-    """Check if a feature belongs to a region."""
-    props = feature.get('properties', {})
-    code = props.get('LAD13CD', props.get('LGD14CD', ''))
-    name = props.get('LAD13NM', props.get('LGD14NM', props.get('LAD21NM', ''))).lower()
-
-    if region_id == 'london':
-        return code.startswith(LONDON_CODES_PREFIX)
-
-    if region_id in REGION_LAD_MAPPING:
-        lad_names = REGION_LAD_MAPPING[region_id]
-        for lad in lad_names:
-            if lad in name or name in lad:
-                return True
-
-    return False
-
-
-def process_england(topo_file, output_dir):
-    """Process England LAD file and split by region."""
-    print("Loading England TopoJSON...")
-    with open(topo_file, 'r') as f:
-        topo_data = json.load(f)
+def geometry_rings(geom, decoded_arcs):
+    """Rings of a TopoJSON Polygon or MultiPolygon, nested like GeoJSON coordinates."""
+    if geom['type'] == 'Polygon':
+        return [decoded_arcs.ring(ring) for ring in geom['arcs']]
+    return [[decoded_arcs.ring(ring) for ring in polygon] for polygon in geom['arcs']]
 
-    print("Decoding TopoJSON...")
-    geojson = decode_topojson(topo_data)
 
-    english_regions = [
-        'london', 'north-east', 'north-west', 'yorkshire-humber',
-        'east-midlands', 'midlands', 'eastern', 'south-east', 'south-west'
-    ]
+def count_vertices(geom, decoded_arcs):
+    """Number of GeoJSON positions in a TopoJSON Polygon or MultiPolygon."""
+    polygons = geom['arcs']
+    if geom['type'] == 'Polygon':
+        polygons = [polygons]
+    return sum(len(decoded_arcs.ring(ring)) for polygon in polygons for ring in polygon)
 
-    for region_id in english_regions:
-        print(f"Processing {region_id}...")
 
-        filtered = [f for f in geojson['features'] if is_in_region(f, region_id)]
+def clean_geometries(geometries, decoded_arcs):
+    """``geometries`` run through clean_geometry, dropping those left empty."""
+    cleaned = (clean_geometry(geom, decoded_arcs) for geom in geometries)
+    return [geom for geom in cleaned if geom]
 
-        # Simplify and clean up
-        for feature in filtered:
-            feature['geometry'] = simplify_geometry(feature['geometry'], 0.0005)
-            props = feature['properties']
-            props['id'] = props.get('LAD13CD', props.get('LAD13NM', 'unknown'))
-            props['name'] = props.get('LAD13NM', 'Unknown')
 
-        output = {
-            'type': 'FeatureCollection',
-            'features': filtered
-        }
+def site_path(path):
+    """``path`` relative to the site root, as the server and browser address it."""
+    return os.path.relpath(path, ROOT).replace(os.sep, '/')
 
-        output_file = os.path.join(output_dir, f'{region_id}.geojson')
-        with open(output_file, 'w') as f:
-            json.dump(output, f)
 
-        print(f"  Created {region_id}.geojson with {len(filtered)} features")
+def write_region(output_dir, region_id, geometries, decoded_arcs, output):
+    """Write a region's LADs in each requested format and report the sizes.
 
+    ``output`` holds the formats, the GeoJSON coordinate precision and the
+    TopoJSON quantization. Returns the files written by format, the
+    vertex count and the bounding box.
+    """
+    sizes = []
+    files = {}
+    bbox = None
+    if 'topojson' in output['formats']:
+        topology = quantize_topology(decoded_arcs, geometries, output['quantization'])
+        bbox = topology['bbox']
+        output_file = os.path.join(output_dir, f'{region_id}.topojson')
+        with open(output_file, 'w', encoding='utf-8') as f:
+            dump_compact(topology, f)
+        files['topojson'] = output_file
+        sizes.append(f"{os.path.getsize(output_file) / 1024:.1f} KB topojson")
 
-def process_devolved(topo_file, region_id, output_dir):
-    """Process Scotland, Wales, or Northern Ireland."""
-    print(f"Processing {region_id}...")
-
+    if 'geojson' in output['formats']:
+        # Features are formatted straight from the arc buffer as they are
+        # written, one at a time
+        output_file = os.path.join(output_dir, f'{region_id}.geojson')
+        with open(output_file, 'w', encoding='utf-8') as f:
+            with FeatureWriter(f, output['precision']) as writer:
+                for geom in geometries:
+                    writer.write(geom['properties'], geom['type'],
+                                 geometry_rings(geom, decoded_arcs))
+        files['geojson'] = output_file
+        if bbox is None:
+            for geom in geometries:
+                rings = geometry_rings(geom, decoded_arcs)
+                if geom['type'] == 'MultiPolygon':
+                    rings = [ring for polygon in rings for ring in polygon]
+                for ring in rings:
+                    bbox = geometry_bbox(list(ring.points()), bbox)
+        sizes.append(f"{os.path.getsize(output_file) / 1024:.1f} KB geojson")
+
+    vertices = sum(count_vertices(geom, decoded_arcs) for geom in geometries)
+    print(f"  Created {region_id} with {len(geometries)} features, {vertices} vertices: "
+          f"{', '.join(sizes)}")
+    return files, vertices, bbox
+
+
+def write_levels(output_dir, region_id, geometries, levels, output):
+    """Write a region's full-detail files and, with ``output['lod_dir']``,
+    its coarser levels of detail and their index.
+
+    ``levels`` come from load_topology. Coarse levels are written as
+    TopoJSON only; the index points at the full-detail TopoJSON (or
+    GeoJSON) as the finest level.
+    """
+    *coarse, (tolerance, decoded_arcs) = levels
+    files, vertices, bbox = write_region(
+        output_dir, region_id, clean_geometries(geometries, decoded_arcs), decoded_arcs, output)
+    lod_dir = output['lod_dir']
+    if lod_dir is None:
+        return
+
+    index_levels = []
+    for n, (level_tolerance, level_arcs) in enumerate(coarse):
+        cleaned = clean_geometries(geometries, level_arcs)
+        topology = quantize_topology(level_arcs, cleaned, output['quantization'])
+        output_file = os.path.join(lod_dir, f'{region_id}-{n}.topojson')
+        with open(output_file, 'w', encoding='utf-8') as f:
+            dump_compact(topology, f)
+        index_levels.append({
+            'tolerance': level_tolerance,
+            'file': site_path(output_file),
+            'format': 'topojson',
+            'vertices': sum(count_vertices(geom, level_arcs) for geom in cleaned),
+            'bytes': os.path.getsize(output_file),
+        })
+        print(f"    level {n}: tolerance {level_tolerance:g}, "
+              f"{index_levels[-1]['vertices']} vertices, {index_levels[-1]['bytes'] / 1024:.1f} KB")
+
+    file_format = 'topojson' if 'topojson' in files else 'geojson'
+    index_levels.append({
+        'tolerance': tolerance,
+        'file': site_path(files[file_format]),
+        'format': file_format,
+        'vertices': vertices,
+        'bytes': os.path.getsize(files[file_format]),
+    })
+    index = lod_index(region_id, output['method'], bbox, index_levels)
+    with open(os.path.join(lod_dir, f'{region_id}.json'), 'w', encoding='utf-8') as f:
+        dump_compact(index, f)
+
+
+def report_partition(partition, by_name=True):
+    """Print the LADs that matched no region or more than one, and with ``by_name``
+    those matched only by name."""
+    def describe(geom):
+        props = geom.get('properties', {})
+        return f"{props.get('LAD13CD', '?')} {props.get('LAD13NM', '?')}"
+
+    for geom, region_id in partition.by_name if by_name else ():
+        print(f"  Note: {describe(geom)} is not in {LAD_REGIONS_FILE}; matched {region_id} by name "
+              f"(--update-lad-regions adds it)")
+    for geom in partition.unmatched:
+        print(f"  Warning: {describe(geom)} is in no region; it is left out")
+    for geom, regions in partition.ambiguous:
+        print(f"  Warning: {describe(geom)} matches {', '.join(regions)}; it is left out")
+
+
+def output_options(method, formats=OUTPUT_FORMATS, precision=DEFAULT_PRECISION,
+                   quantization=DEFAULT_QUANTIZATION, lod_dir=None):
+    """Options for write_levels."""
+    return {'formats': formats, 'quantization': quantization, 'precision': precision,
+            'method': method, 'lod_dir': lod_dir}
+
+
+def load_england(topo_file, method='dp', tolerance=None, vertices=None,
+                 factors=DEFAULT_FACTORS, **output):
+    """Load and simplify the England LAD file and split it by region.
+
+    Returns the renamed geometries of each region, the levels of detail
+    and the options for write_levels.
+    """
+    if tolerance is None and vertices is None:
+        tolerance = DEFAULT_TOLERANCE[method]
+
+    print("Loading and simplifying England TopoJSON...")
+    geometries, levels = load_topology(topo_file, method, tolerance, vertices, factors)
+    output = output_options(method, **output)
+
+    index = RegionIndex(codes=load_lad_regions(LAD_REGIONS_PATH))
+    partition = index.partition(geometries, ENGLAND_CODE_KEYS, ENGLAND_NAME_KEYS)
+    report_partition(partition)
+
+    regions = {}
+    for region_id in ENGLISH_REGIONS:
+        regions[region_id] = []
+        for geom in partition.regions[region_id]:
+            props = geom.get('properties', {})
+            regions[region_id].append({**geom, 'properties': {
+                'id': props.get('LAD13CD', props.get('LAD13NM', 'unknown')),
+                'name': props.get('LAD13NM', 'Unknown'),
+            }})
+    return regions, levels, output
+
+
+def update_lad_regions(topo_file, path=LAD_REGIONS_PATH):
+    """Rewrite the LAD code table with the region every LAD in ``topo_file`` matches now.
+
+    LADs already in the table keep their region; the others are added
+    with the region their name matches. LADs matching no region, or
+    several, are reported and left out.
+    """
     with open(topo_file, 'r') as f:
         topo_data = json.load(f)
+    geometries = next(iter(topo_data['objects'].values()))['geometries']
+    codes = load_lad_regions(path) if os.path.exists(path) else {}
+    partition = RegionIndex(codes=codes).partition(geometries, ENGLAND_CODE_KEYS,
+                                                   ENGLAND_NAME_KEYS)
+    report_partition(partition, by_name=False)
+    table = {region_id: sorted(geom['properties'][ENGLAND_CODE_KEYS[0]] for geom in members)
+             for region_id, members in partition.regions.items()}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(table, f, indent=2)
+        f.write('\n')
+    print(f"Wrote {sum(map(len, table.values()))} LAD codes to {site_path(path)}, "
+          f"{len(partition.by_name)} of them new")
+
+
+def write_england_region(output_dir, region_id, geometries, levels, output):
+    print(f"Processing {region_id}...")
+    write_levels(output_dir, region_id, geometries, levels, output)
 
-    geojson = decode_topojson(topo_data)
-
-    for feature in geojson['features']:
-        feature['geometry'] = simplify_geometry(feature['geometry'], 0.001)
-        props = feature['properties']
-        code = props.get('LAD13CD', props.get('LGD14CD', props.get('LAD21CD', 'unknown')))
-        name = props.get('LAD13NM', props.get('LGD14NM', props.get('LAD21NM', 'Unknown')))
-        props['id'] = code
-        props['name'] = name
 
-    output_file = os.path.join(output_dir, f'{region_id}.geojson')
-    with open(output_file, 'w') as f:
-        json.dump(geojson, f)
+def process_devolved(topo_file, region_id, output_dir, method='dp', tolerance=None,
+                     vertices=None, factors=DEFAULT_FACTORS, **output):
+    """Process Scotland, Wales, or Northern Ireland."""
+    print(f"Processing {region_id}...")
 
-    print(f"  Created {region_id}.geojson with {len(geojson['features'])} features")
+    if tolerance is None and vertices is None:
+        tolerance = DEFAULT_TOLERANCE[method]
 
+    geometries, levels = load_topology(topo_file, method, tolerance, vertices, factors)
+    output = output_options(method, **output)
 
-def main():
-    input_dir = '/Users/adamgriffith/Documents/infrastructure-dashboard-v3/data/regions-geo'
-    output_dir = '/Users/adamgriffith/Documents/infrastructure-dashboard-v3/data/regions'
+    renamed = []
+    for geom in geometries:
+        props = geom.get('properties', {})
+        code = next((props[key] for key in DEVOLVED_CODE_KEYS if key in props), 'unknown')
+        name = next((props[key] for key in DEVOLVED_NAME_KEYS if key in props), 'Unknown')
+        renamed.append({**geom, 'properties': {'id': code, 'name': name}})
 
-    os.makedirs(output_dir, exist_ok=True)
+    write_levels(output_dir, region_id, renamed, levels, output)
 
-    # Process English regions
-    england_file = os.path.join(input_dir, 'england_lad.json')
-    process_england(england_file, output_dir)
 
-    # Process devolved nations
-    process_devolved(os.path.join(input_dir, 'scotland_lad.json'), 'scotland', output_dir)
-    process_devolved(os.path.join(input_dir, 'wales_lad.json'), 'wales', output_dir)
-    process_devolved(os.path.join(input_dir, 'ni_lgd.json'), 'northern-ireland', output_dir)
+def main():
+    parser = argparse.ArgumentParser(description="Create per-region maps of LAD boundaries.")
+    parser.add_argument('--method', choices=METHODS, default='dp',
+                        help='dp (Douglas-Peucker) or vw (Visvalingam-Whyatt); default dp')
+    parser.add_argument('--tolerance', type=float,
+                        help='simplification tolerance: degrees for dp, square degrees for vw '
+                             '(default: %(dp)g for dp, %(vw)g for vw)' % DEFAULT_TOLERANCE)
+    parser.add_argument('--vertices', type=int,
+                        help='instead of a tolerance, keep about this many vertices per input file')
+    parser.add_argument('--format', action='append', choices=OUTPUT_FORMATS,
+                        help='output format; repeat for several (default: all)')
+    parser.add_argument('--precision', type=int, default=DEFAULT_PRECISION,
+                        help=f'GeoJSON coordinate decimal places (default {DEFAULT_PRECISION})')
+    parser.add_argument('--quantization', type=int, default=DEFAULT_QUANTIZATION,
+                        help=f'TopoJSON grid steps across each region (default {DEFAULT_QUANTIZATION})')
+    parser.add_argument('--lod-factors', type=float, nargs='*', default=DEFAULT_FACTORS,
+                        help='coarser levels of detail, as multiples of the full-detail '
+                             'tolerance (default: %s)' % ' '.join(map(str, DEFAULT_FACTORS)))
+    parser.add_argument('--no-lod', action='store_true',
+                        help='write only the full-detail files, no levels of detail')
+    parser.add_argument('--region', action='append', choices=[*ENGLISH_REGIONS, *DEVOLVED_INPUTS],
+                        help='region to build; repeat for several (default: all)')
+    parser.add_argument('--workers', type=int, default=default_workers(),
+                        help='processes to build with, 1 to build in this one '
+                             '(default: one per CPU, %(default)s here)')
+    parser.add_argument('--update-lad-regions', action='store_true',
+                        help=f'add the LADs matched only by name to {LAD_REGIONS_FILE} '
+                             'and exit, building nothing')
+    args = parser.parse_args()
+
+    input_dir = os.path.join(ROOT, 'data', 'regions-geo')
+    if args.update_lad_regions:
+        update_lad_regions(os.path.join(input_dir, 'england_lad.json'))
+        return
+    output_dir = os.path.join(ROOT, 'data', 'regions')
+    lod_dir = None if args.no_lod else os.path.join(ROOT, 'data', 'lod')
+
+    options = {'method': args.method, 'tolerance': args.tolerance, 'vertices': args.vertices,
+               'factors': () if args.no_lod else tuple(args.lod_factors),
+               'formats': tuple(args.format or OUTPUT_FORMATS), 'precision': args.precision,
+               'quantization': args.quantization, 'lod_dir': lod_dir}
 
+    os.makedirs(output_dir, exist_ok=True)
+    if lod_dir is not None:
+        os.makedirs(lod_dir, exist_ok=True)
+
+    selected = set(args.region or [*ENGLISH_REGIONS, *DEVOLVED_INPUTS])
+
+    with TaskPool(args.workers) as pool:
+        # England is loaded once and then split into a task per region;
+        # the devolved nations load and write meanwhile
+        england = None
+        if selected.intersection(ENGLISH_REGIONS):
+            england = pool.submit('england', load_england,
+                                  os.path.join(input_dir, 'england_lad.json'), **options)
+        for region_id, filename in DEVOLVED_INPUTS.items():
+            if region_id in selected:
+                pool.submit(region_id, process_devolved, os.path.join(input_dir, filename),
+                            region_id, output_dir, **options)
+
+        if england is not None:
+            regions, levels, output = pool.result(england)
+            for region_id, geometries in regions.items():
+                if region_id in selected:
+                    pool.submit(region_id, write_england_region, output_dir, region_id,
+                                geometries, levels, output)
+
+    pool.report()
     print("\nDone!")
 
 
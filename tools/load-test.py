@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Load-test harness for server.py.
+
+Starts the server once per scenario on a free local port, replays the
+dashboard's page-load requests from concurrent clients and reports
+requests/sec plus p50/p99 latency for each scenario side by side.
+
+Examples:
+    python tools/load-test.py --duration 10 --concurrency 16 --slow-clients 2
+
+    # sendfile() vs user-space copies on the large map files
+    python tools/load-test.py --scenario production-no-memory-cache \
+        --scenario production-no-sendfile \
+        --path /data/regions/south-west.geojson --path /data/regions-geo/scotland_lad.json
+"""
+
+import argparse
+import http.client
+import json
+import threading
+import time
+
+from benchlib import percentile, start_server, stop_server
+
+# Extra server.py arguments for each scenario
+SCENARIOS = {
+    'single-threaded': [],
+    'production': ['--production'],
+    'production-no-sendfile': ['--production', '--no-sendfile', '--cache-size', '0'],
+    'production-no-memory-cache': ['--production', '--cache-size', '0'],
+}
+
+# What DataLoader.loadAll fetches on every page view, plus the map files
+PAGE_LOAD_PATHS = [
+    '/data/config.json',
+    '/data/regions.json',
+    '/data/sectors.json',
+    '/data/disciplines.json',
+    '/data/clients.json',
+    '/data/opportunities.json',
+    '/data/budgets.json',
+    '/data/projects.json',
+    '/data/uk-regions.geojson?v=3',
+]
+
+SLOW_CLIENT_PATH = '/data/regions/south-west.geojson'
+
+
+def client_loop(port, paths, deadline, headers, latencies, errors):
+    """Request ``paths`` round-robin over one connection until the deadline."""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    i = 0
+    while time.monotonic() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            conn.request('GET', path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors.append(response.status)
+            else:
+                latencies.append(time.perf_counter() - start)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    conn.close()
+
+
+def slow_client_loop(port, deadline, rate):
+    """Download the largest region file at ``rate`` bytes/sec, over and over."""
+    chunk = max(1, rate // 10)
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            conn.request('GET', SLOW_CLIENT_PATH)
+            response = conn.getresponse()
+            while time.monotonic() < deadline and response.read(chunk):
+                time.sleep(0.1)
+            conn.close()
+        except (OSError, http.client.HTTPException):
+            time.sleep(0.1)
+
+
+def run_scenario(name, args):
+    proc, port = start_server(SCENARIOS[name])
+    latencies, errors = [], []
+    headers = dict((k.strip(), v.strip()) for k, v in (h.split(':', 1) for h in args.header))
+    try:
+        deadline = time.monotonic() + args.duration
+        threads = [
+            threading.Thread(target=slow_client_loop, args=(port, deadline, args.slow_rate), daemon=True)
+            for _ in range(args.slow_clients)
+        ]
+        # Give slow clients a head start so they are holding connections
+        for t in threads:
+            t.start()
+        time.sleep(0.2 if args.slow_clients else 0)
+
+        start = time.monotonic()
+        workers = [
+            threading.Thread(target=client_loop,
+                             args=(port, args.paths, deadline, headers, latencies, errors))
+            for _ in range(args.concurrency)
+        ]
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        elapsed = time.monotonic() - start
+    finally:
+        cpu = stop_server(proc)
+
+    latencies.sort()
+    count = len(latencies)
+    return {
+        'scenario': name,
+        'requests': count,
+        'errors': len(errors),
+        'requests_per_sec': count / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'server_cpu_ms_per_request': cpu * 1000 / count if cpu is not None and count else None,
+    }
+
+
+def print_table(results):
+    print(f"\n{'scenario':<24} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'cpu ms/req':>11}")
+    for r in results:
+        cpu = r['server_cpu_ms_per_request']
+        cpu_text = f'{cpu:.3f}' if cpu is not None else '-'
+        print(f"{r['scenario']:<24} {r['requests']:>9} {r['errors']:>7} {r['requests_per_sec']:>9.1f} "
+              f"{r['p50_ms']:>9.2f} {r['p99_ms']:>9.2f} {cpu_text:>11}")
+
+    baseline = results[0]
+    for r in results[1:]:
+        if baseline['requests_per_sec']:
+            ratio = r['requests_per_sec'] / baseline['requests_per_sec']
+            print(f"{r['scenario']}: {ratio:.2f}x the throughput of {baseline['scenario']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test server.py scenarios side by side.')
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help='scenario to run; repeat to compare (default: all)')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per scenario')
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent clients')
+    parser.add_argument('--slow-clients', type=int, default=0,
+                        help=f'clients downloading {SLOW_CLIENT_PATH} slowly in the background')
+    parser.add_argument('--slow-rate', type=int, default=64 * 1024, help='slow client bytes/sec')
+    parser.add_argument('--path', dest='paths', action='append',
+                        help='request path; repeat for several (default: a page load)')
+    parser.add_argument('--header', action='append', default=[],
+                        help="extra request header, e.g. 'Accept-Encoding: gzip'")
+    parser.add_argument('--json', metavar='FILE', help='also write results as JSON')
+    args = parser.parse_args()
+    args.paths = args.paths or PAGE_LOAD_PATHS
+    scenarios = args.scenario or list(SCENARIOS)
+
+    results = []
+    for name in scenarios:
+        print(f'Running {name} for {args.duration:.0f}s...', flush=True)
+        results.append(run_scenario(name, args))
+
+    print_table(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
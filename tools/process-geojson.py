@@ -1,257 +1,276 @@
 #!/usr/bin/env python3
 """
-Process UK TopoJSON files and create simplified GeoJSON for the dashboard.
+Process UK TopoJSON files and create simplified GeoJSON for the dashboard,
+plus coarser levels of detail for /api/geometry.
 """
 
+import argparse
 import json
 import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dashboard.geo.dissolve import dissolve, drop_specks  # noqa: E402
+from dashboard.geo.encode import FeatureWriter, dump_compact  # noqa: E402
+from dashboard.geo.lod import build_levels, geometry_bbox, lod_index, resolution  # noqa: E402
+from dashboard.geo.parallel import TaskPool, default_workers  # noqa: E402
+from dashboard.geo.simplify import METHODS  # noqa: E402
+from dashboard.geo.topology import decode_arcs  # noqa: E402
+
+# Default simplification tolerance per method: a distance in degrees for
+# Douglas-Peucker, a triangle area in square degrees for Visvalingam-Whyatt
+DEFAULT_TOLERANCE = {'dp': 0.01, 'vw': 1e-4}
+
+# Coarser levels of the overview, as multiples of the full-detail
+# tolerance, sized for the mini map (250x320) and the main map (450x600)
+DEFAULT_LOD_FACTORS = (3, 1.5)
+
+# Input files in data/, the TopoJSON object holding their areas and, for
+# the devolved nations, the id and name of the one feature their council
+# areas are dissolved into; in the order overview_features takes them
+TOPO_INPUTS = (
+    ('England regions', 'england-regions-topo.json', 'eer', None),
+    ('Scotland', 'scotland-topo.json', 'lad', ('scotland', 'Scotland')),
+    ('Wales', 'wales-topo.json', 'lad', ('wales', 'Wales')),
+    ('Northern Ireland', 'ni-topo.json', 'lgd', ('northern-ireland', 'Northern Ireland')),
+)
+
+# Map id of the overview in data/lod/ and /api/geometry
+LOD_MAP_ID = 'uk'
+
+# England's regions by their names in the EER13NM property
+ENGLAND_REGION_IDS = {
+    'North East': 'north-east',
+    'North West': 'north-west',
+    'Yorkshire and The Humber': 'yorkshire-humber',
+    'East Midlands': 'east-midlands',
+    'West Midlands': 'midlands',
+    'Eastern': 'eastern',
+    'London': 'london',
+    'South East': 'south-east',
+    'South West': 'south-west',
+}
+
+
+def simplify_topology(topo_data, object_name, method='dp', tolerance=None, vertices=None,
+                      factors=(), merge=None):
+    """Simplify a topology's arcs at every level of detail.
+
+    Arcs are simplified before rings are built, so shared borders stay
+    identical on both sides. Returns ``(tolerance, arcs, geometries)`` per
+    level, coarsest first and full detail last: the level's simplified
+    ArcTable and the TopoJSON geometries to draw from it. ``factors`` are
+    the coarser levels' multiples of the full-detail tolerance. With
+    ``merge``, an ``(id, name)``, the areas are dissolved into that one
+    MultiPolygon, and each level leaves out the islands and holes too small
+    to draw at its resolution. No GeoJSON is built here; write_overview
+    formats each feature straight from the arcs.
+    """
+    # Decode all arcs, rounded to 4 decimal places
+    decoded_arcs = decode_arcs(topo_data, precision=4)
+    if tolerance is None and vertices is None:
+        tolerance = DEFAULT_TOLERANCE[method]
+    original_count = decoded_arcs.point_count
+    levels = build_levels(decoded_arcs, method, tolerance, vertices, factors)
+    counts = ', '.join(str(arcs.point_count) for _, arcs in levels)
+    print(f"  Simplified arcs ({method}): {original_count} -> {counts} vertices")
 
-def decode_arc(arc, scale, translate):
-    """Decode a TopoJSON arc to coordinates."""
-    coords = []
-    x, y = 0, 0
-    for point in arc:
-        x += point[0]
-        y += point[1]
-        lon = x * scale[0] + translate[0]
-        lat = y * scale[1] + translate[1]
-        coords.append([round(lon, 4), round(lat, 4)])
-    return coords
-
-def simplify_coords(coords, tolerance=0.01):
-    """Simplify coordinates by keeping every nth point."""
-    if len(coords) <= 10:
-        return coords
-
-    # Keep every nth point based on total count
-    step = max(1, len(coords) // 80)  # Keep ~80 points per ring
-    simplified = [coords[i] for i in range(0, len(coords), step)]
-
-    # Ensure ring is closed
-    if simplified[0] != simplified[-1]:
-        simplified.append(simplified[0])
-
-    return simplified
-
-def polygon_area(coords):
-    """Calculate approximate area of a polygon using shoelace formula."""
-    n = len(coords)
-    if n < 3:
-        return 0
-    area = 0
-    for i in range(n):
-        j = (i + 1) % n
-        area += coords[i][0] * coords[j][1]
-        area -= coords[j][0] * coords[i][1]
-    return abs(area) / 2
-
-def topojson_to_geojson(topo_data, object_name):
-    """Convert TopoJSON to GeoJSON with simplification."""
-    arcs = topo_data.get('arcs', [])
-    transform = topo_data.get('transform', {})
-    scale = transform.get('scale', [1, 1])
-    translate = transform.get('translate', [0, 0])
-
-    # Decode all arcs
-    decoded_arcs = []
-    for arc in arcs:
-        decoded_arcs.append(decode_arc(arc, scale, translate))
-
-    features = []
     geometries = topo_data['objects'][object_name]['geometries']
-
+    if merge is None:
+        return [(level_tolerance, arcs, geometries) for level_tolerance, arcs in levels]
+
+    polygons = dissolve(decoded_arcs, geometries)
+    holes = sum(len(polygon) - 1 for polygon in polygons)
+    print(f"  Dissolved {len(geometries)} areas into {len(polygons)} polygons, {holes} holes")
+    results = []
+    for level_tolerance, arcs in levels:
+        kept = drop_specks(arcs, polygons, resolution(method, level_tolerance) ** 2)
+        merged = {'type': 'MultiPolygon', 'properties': {'id': merge[0], 'name': merge[1]},
+                  'arcs': kept}
+        results.append((level_tolerance, arcs, [merged]))
+    counts = ', '.join(str(len(geometry_rings(geometries[0], arcs) or ()))
+                       for _, arcs, geometries in results)
+    print(f"  Polygons large enough to draw: {counts}")
+    return results
+
+
+def geometry_rings(geom, arcs):
+    """Rings of a TopoJSON Polygon or MultiPolygon as Rings of ``arcs``, nested
+    like GeoJSON coordinates, or None when there is nothing to draw.
+
+    A MultiPolygon leaves out rings simplified down to a line and the
+    polygons left empty.
+    """
+    if geom.get('type') == 'Polygon':
+        return [arcs.ring(ring, skip_junctions=False) for ring in geom.get('arcs', [])]
+    if geom.get('type') == 'MultiPolygon':
+        polygons = []
+        for polygon in geom.get('arcs', []):
+            rings = [arcs.ring(ring, skip_junctions=False) for ring in polygon]
+            rings = [ring for ring in rings if len(ring) > 3]
+            if rings:
+                polygons.append(rings)
+        return polygons or None
+    return None
+
+
+def load_nation(label, topo_file, object_name, merge, **simplification):
+    """Load one of TOPO_INPUTS and simplify it at every level of detail."""
+    print(f"Processing {label}...")
+    with open(topo_file, 'r') as f:
+        topo_data = json.load(f)
+    return simplify_topology(topo_data, object_name, merge=merge, **simplification)
+
+
+def overview_features(england, scotland, wales, ni):
+    """``(properties, type, rings)`` of the overview's features, one at a time.
+
+    Each nation is given as the ``(arcs, geometries)`` of one level.
+    """
+    arcs, geometries = england
     for geom in geometries:
-        props = geom.get('properties', {})
-        geom_type = geom.get('type')
-
-        if geom_type == 'Polygon':
-            rings = []
-            for ring_arcs in geom.get('arcs', []):
-                ring = []
-                for arc_idx in ring_arcs:
-                    if arc_idx >= 0:
-                        ring.extend(decoded_arcs[arc_idx])
-                    else:
-                        ring.extend(decoded_arcs[~arc_idx][::-1])
-                rings.append(simplify_coords(ring))
-
-            features.append({
-                'type': 'Feature',
-                'properties': props,
-                'geometry': {
-                    'type': 'Polygon',
-                    'coordinates': rings
-                }
+        name = geom.get('properties', {}).get('EER13NM', '')
+        rings = geometry_rings(geom, arcs)
+        if name in ENGLAND_REGION_IDS and rings is not None:
+            yield {'id': ENGLAND_REGION_IDS[name], 'name': name}, geom['type'], rings
+
+    # The devolved nations are already dissolved into one feature each
+    for arcs, geometries in (scotland, wales, ni):
+        for geom in geometries:
+            rings = geometry_rings(geom, arcs)
+            if rings is not None:
+                yield geom['properties'], geom['type'], rings
+
+
+def write_features(f, features):
+    """Write ``features`` to ``f`` as a compact GeoJSON FeatureCollection,
+    formatting each straight from its arcs.
+
+    Returns each feature's id, vertex count, bounding box and size in bytes.
+    """
+    stats = []
+    with FeatureWriter(f) as writer:
+        for properties, geometry_type, rings in features:
+            start = f.tell()
+            writer.write(properties, geometry_type, rings)
+            polygons = [rings] if geometry_type == 'Polygon' else rings
+            vertices, bbox = 0, None
+            for polygon in polygons:
+                for ring in polygon:
+                    vertices += len(ring)
+                    bbox = geometry_bbox(list(ring.points()), bbox)
+            stats.append({
+                'id': properties.get('id'),
+                'vertices': vertices,
+                'bbox': bbox,
+                'bytes': f.tell() - start,
             })
+    return stats
+
+
+def write_overview(path, features):
+    """Write ``features`` to ``path``; returns write_features' stats."""
+    with open(path, 'w', encoding='utf-8') as f:
+        return write_features(f, features)
+
+
+def write_lod(lod_dir, output_path, method, levels):
+    """Write the coarser overview levels and the index /api/geometry reads.
+
+    ``levels`` are ``(tolerance, features)``, coarsest first; the last is
+    the full-detail overview, already written to ``output_path``, as the
+    stats write_overview returned for it.
+    """
+    index_levels = []
+    for n, (tolerance, features) in enumerate(levels):
+        path = output_path
+        if n < len(levels) - 1:
+            path = os.path.join(lod_dir, f'{LOD_MAP_ID}-{n}.geojson')
+            features = write_overview(path, features)
+        index_levels.append({
+            'tolerance': tolerance,
+            'file': os.path.relpath(path, ROOT).replace(os.sep, '/'),
+            'format': 'geojson',
+            'vertices': sum(feature['vertices'] for feature in features),
+            'bytes': os.path.getsize(path),
+        })
+        print(f"  level {n}: tolerance {tolerance:g}, {index_levels[-1]['vertices']} vertices, "
+              f"{index_levels[-1]['bytes'] / 1024:.1f} KB")
+
+    bbox = None
+    for feature in levels[-1][1]:
+        bbox = geometry_bbox([feature['bbox'][:2], feature['bbox'][2:]], bbox)
+    index = lod_index(LOD_MAP_ID, method, bbox, index_levels)
+    with open(os.path.join(lod_dir, f'{LOD_MAP_ID}.json'), 'w', encoding='utf-8') as f:
+        dump_compact(index, f)
 
-        elif geom_type == 'MultiPolygon':
-            polygons = []
-            for polygon_arcs in geom.get('arcs', []):
-                rings = []
-                for ring_arcs in polygon_arcs:
-                    ring = []
-                    for arc_idx in ring_arcs:
-                        if arc_idx >= 0:
-                            ring.extend(decoded_arcs[arc_idx])
-                        else:
-                            ring.extend(decoded_arcs[~arc_idx][::-1])
-                    if len(ring) > 3:
-                        rings.append(simplify_coords(ring))
-                if rings:
-                    polygons.append(rings)
-
-            if polygons:
-                features.append({
-                    'type': 'Feature',
-                    'properties': props,
-                    'geometry': {
-                        'type': 'MultiPolygon',
-                        'coordinates': polygons
-                    }
-                })
-
-    return {
-        'type': 'FeatureCollection',
-        'features': features
-    }
-
-def merge_features_to_single(features, new_id, new_name):
-    """Merge multiple features into a single MultiPolygon, keeping largest polygons."""
-    all_polygons = []
-
-    for feature in features:
-        geom = feature['geometry']
-        if geom['type'] == 'Polygon':
-            all_polygons.append(geom['coordinates'])
-        elif geom['type'] == 'MultiPolygon':
-            all_polygons.extend(geom['coordinates'])
-
-    # Calculate area for each polygon and sort by area (largest first)
-    polygons_with_area = []
-    for poly in all_polygons:
-        # Use first ring (exterior) for area calculation
-        if poly and len(poly) > 0 and len(poly[0]) > 0:
-            area = polygon_area(poly[0])
-            polygons_with_area.append((area, poly))
-
-    # Sort by area descending
-    polygons_with_area.sort(key=lambda x: -x[0])
-
-    # Keep polygons that are at least 1% of largest, or top 20
-    if polygons_with_area:
-        max_area = polygons_with_area[0][0]
-        threshold = max_area * 0.01
-        kept_polys = [p for area, p in polygons_with_area if area >= threshold][:20]
-    else:
-        kept_polys = []
-
-    return {
-        'type': 'Feature',
-        'properties': {'id': new_id, 'name': new_name},
-        'geometry': {
-            'type': 'MultiPolygon',
-            'coordinates': kept_polys
-        }
-    }
 
 def main():
-    data_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + '/data'
-
-    combined_features = []
-
-    # Process England regions
-    print("Processing England regions...")
-    with open(os.path.join(data_dir, 'england-regions-topo.json'), 'r') as f:
-        england_topo = json.load(f)
-
-    england_geojson = topojson_to_geojson(england_topo, 'eer')
-
-    # Map region names to our IDs
-    region_mapping = {
-        'North East': 'north-east',
-        'North West': 'north-west',
-        'Yorkshire and The Humber': 'yorkshire-humber',
-        'East Midlands': 'east-midlands',
-        'West Midlands': 'midlands',
-        'Eastern': 'eastern',
-        'London': 'london',
-        'South East': 'south-east',
-        'South West': 'south-west'
-    }
-
-    for feature in england_geojson['features']:
-        name = feature['properties'].get('EER13NM', '')
-        if name in region_mapping:
-            feature['properties'] = {
-                'id': region_mapping[name],
-                'name': name
-            }
-            combined_features.append(feature)
-
-    # Process Scotland
-    print("Processing Scotland...")
-    with open(os.path.join(data_dir, 'scotland-topo.json'), 'r') as f:
-        scotland_topo = json.load(f)
-
-    scotland_geojson = topojson_to_geojson(scotland_topo, 'lad')
-    scotland_merged = merge_features_to_single(scotland_geojson['features'], 'scotland', 'Scotland')
-    combined_features.append(scotland_merged)
-
-    # Process Wales
-    print("Processing Wales...")
-    with open(os.path.join(data_dir, 'wales-topo.json'), 'r') as f:
-        wales_topo = json.load(f)
-
-    wales_geojson = topojson_to_geojson(wales_topo, 'lad')
-    wales_merged = merge_features_to_single(wales_geojson['features'], 'wales', 'Wales')
-    combined_features.append(wales_merged)
-
-    # Process Northern Ireland
-    print("Processing Northern Ireland...")
-    with open(os.path.join(data_dir, 'ni-topo.json'), 'r') as f:
-        ni_topo = json.load(f)
-
-    ni_geojson = topojson_to_geojson(ni_topo, 'lgd')
-    ni_merged = merge_features_to_single(ni_geojson['features'], 'northern-ireland', 'Northern Ireland')
-    combined_features.append(ni_merged)
-
-    # Create combined GeoJSON
-    combined = {
-        'type': 'FeatureCollection',
-        'features': combined_features
-    }
+    parser = argparse.ArgumentParser(description='Create data/uk-regions.geojson.')
+    parser.add_argument('--method', choices=METHODS, default='dp',
+                        help='dp (Douglas-Peucker) or vw (Visvalingam-Whyatt); default dp')
+    parser.add_argument('--tolerance', type=float,
+                        help='simplification tolerance: degrees for dp, square degrees for vw '
+                             '(default: %(dp)g for dp, %(vw)g for vw)' % DEFAULT_TOLERANCE)
+    parser.add_argument('--vertices', type=int,
+                        help='instead of a tolerance, keep about this many vertices per input file')
+    parser.add_argument('--lod-factors', type=float, nargs='*', default=DEFAULT_LOD_FACTORS,
+                        help='coarser levels of detail, as multiples of the full-detail '
+                             'tolerance (default: %s)' % ' '.join(map(str, DEFAULT_LOD_FACTORS)))
+    parser.add_argument('--no-lod', action='store_true',
+                        help='write only data/uk-regions.geojson, no levels of detail')
+    parser.add_argument('--workers', type=int, default=default_workers(),
+                        help='processes to build with, 1 to build in this one '
+                             '(default: one per CPU, %(default)s here)')
+    args = parser.parse_args()
+    simplification = {'method': args.method, 'tolerance': args.tolerance,
+                      'vertices': args.vertices,
+                      'factors': () if args.no_lod else tuple(args.lod_factors)}
+
+    data_dir = os.path.join(ROOT, 'data')
+
+    # The four inputs are independent: load and simplify them in parallel
+    with TaskPool(args.workers) as pool:
+        tasks = [pool.submit(label, load_nation, label, os.path.join(data_dir, filename),
+                             object_name, merge, **simplification)
+                 for label, filename, object_name, merge in TOPO_INPUTS]
+    england_levels, scotland_levels, wales_levels, ni_levels = (
+        pool.result(task) for task in tasks)
+    pool.report()
+
+    # Each level's features are formatted from its arcs and written one at a time
+    levels = [
+        (tolerance, overview_features(england, scotland, wales, ni))
+        for (tolerance, *england), (_, *scotland), (_, *wales), (_, *ni)
+        in zip(england_levels, scotland_levels, wales_levels, ni_levels)
+    ]
 
     # Save
     output_path = os.path.join(data_dir, 'uk-regions.geojson')
-    with open(output_path, 'w') as f:
-        json.dump(combined, f)
+    stats = write_overview(output_path, levels[-1][1])
+    levels[-1] = (levels[-1][0], stats)
 
     # Report file size
     size = os.path.getsize(output_path)
     print(f"Created {output_path}")
     print(f"File size: {size / 1024:.1f} KB")
-    print(f"Features: {len(combined_features)}")
+    print(f"Features: {len(stats)}")
+
+    if not args.no_lod:
+        print("\nLevels of detail:")
+        lod_dir = os.path.join(data_dir, 'lod')
+        os.makedirs(lod_dir, exist_ok=True)
+        write_lod(lod_dir, output_path, args.method, levels)
 
     # Verify bounds
-    print("\nRegion bounds:")
-    for feat in combined_features:
-        coords = feat['geometry']['coordinates']
-        min_lon, min_lat = float('inf'), float('inf')
-        max_lon, max_lat = float('-inf'), float('-inf')
-
-        def process(c):
-            nonlocal min_lon, min_lat, max_lon, max_lat
-            if isinstance(c[0], (int, float)):
-                min_lon = min(min_lon, c[0])
-                max_lon = max(max_lon, c[0])
-                min_lat = min(min_lat, c[1])
-                max_lat = max(max_lat, c[1])
-            else:
-                for item in c:
-                    process(item)
-
-        process(coords)
-        print(f"  {feat['properties']['id']}: lat {min_lat:.2f}-{max_lat:.2f}")
+    print("\nRegion bounds and vertex counts:")
+    for feature in stats:
+        min_lat, max_lat = feature['bbox'][1], feature['bbox'][3]
+        print(f"  {feature['id']}: lat {min_lat:.2f}-{max_lat:.2f}, "
+              f"{feature['vertices']} vertices, {feature['bytes'] / 1024:.1f} KB")
+
 
 if __name__ == '__main__':
     main()